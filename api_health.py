@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+
+DEFAULT_HEALTH_PATH = "api_health.json"
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_WINDOW_SECONDS = 900
+EXHAUSTED_STREAK = 5
+DEGRADED_HEADROOM = 0.8
+PRESSURE_KINDS = ("throttle", "drop")
+
+def assess_outcomes(outcomes, now=None, window_seconds=DEFAULT_WINDOW_SECONDS):
+    now = time.time() if now is None else now
+    recent = sorted((stamp, kind) for stamp, kind in outcomes if now - stamp <= window_seconds)
+    if not recent:
+        return {"status": "unknown", "headroom": None, "samples": 0, "reason": "No recent YouTube Music calls"}
+
+    counts = {}
+    for _, kind in recent:
+        counts[kind] = counts.get(kind, 0) + 1
+    last_ok = max((stamp for stamp, kind in recent if kind == "ok"), default=None)
+    last_auth = max((stamp for stamp, kind in recent if kind == "auth"), default=None)
+    if last_auth is not None and (last_ok is None or last_auth > last_ok):
+        return {"status": "auth", "headroom": 0.0, "samples": len(recent), "reason": "YouTube Music rejected the headers"}
+
+    # A run of throttles/drops with no success since means writes are being refused right now
+    streak = 0
+    for _, kind in reversed(recent):
+        if kind == "ok":
+            break
+        if kind in PRESSURE_KINDS:
+            streak += 1
+
+    pressure = sum(counts.get(kind, 0) for kind in PRESSURE_KINDS)
+    headroom = 1.0 - pressure / len(recent)
+    if streak >= EXHAUSTED_STREAK:
+        status = "exhausted"
+        reason = f"Last {streak} YouTube Music calls were throttled or dropped"
+    elif headroom < DEGRADED_HEADROOM:
+        status = "degraded"
+        reason = f"{pressure} of the last {len(recent)} YouTube Music calls were throttled or dropped"
+    else:
+        status = "ok"
+        reason = f"{counts.get('ok', 0)} of the last {len(recent)} YouTube Music calls succeeded"
+    return {"status": status, "headroom": headroom, "samples": len(recent), "reason": reason}
+
+class ApiHealth:
+    def __init__(self, outcome_source, path=DEFAULT_HEALTH_PATH, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 window_seconds=DEFAULT_WINDOW_SECONDS):
+        self.outcome_source = outcome_source
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.window_seconds = window_seconds
+        self.identity = None
+        self._cached = None
+        self._lock = threading.Lock()
+
+    def _fresh(self, assessment, now):
+        return assessment is not None and now - assessment.get("checked_at", 0) < self.ttl_seconds
+
+    def check(self, force=False):
+        now = time.time()
+        with self._lock:
+            if not force and self._fresh(self._cached, now):
+                return self._cached
+            assessment = assess_outcomes(self.outcome_source(), now=now, window_seconds=self.window_seconds)
+            assessment["checked_at"] = now
+            if assessment["status"] == "unknown":
+                persisted = self._load()
+                if not force and self._fresh(persisted, now):
+                    assessment = persisted
+            else:
+                self._save(assessment)
+            self._cached = assessment
+            return assessment
+
+    def remember(self, status, reason, headroom=None):
+        assessment = {"status": status, "headroom": headroom, "samples": 0, "reason": reason, "checked_at": time.time()}
+        with self._lock:
+            self._cached = assessment
+            self._save(assessment)
+        return assessment
+
+    def set_identity(self, identity):
+        with self._lock:
+            if identity != self.identity:
+                self.identity = identity
+                self._cached = None
+
+    def invalidate(self):
+        with self._lock:
+            self._cached = None
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    assessment = json.load(f)
+                # Verdicts recorded for other headers say nothing about the current ones
+                if assessment.get("identity") == self.identity:
+                    return assessment
+        except Exception as e:
+            print(f"Error loading API health: {e}")
+        return None
+
+    def _save(self, assessment):
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(dict(assessment, identity=self.identity), f)
+        except Exception as e:
+            print(f"Error saving API health: {e}")
@@ -0,0 +1,232 @@
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_THRESHOLD = 0.2
+BENCH_BATCH_SIZE = 20
+BENCH_SEARCH_WORKERS = 8
+BENCH_WRITE_RATE = 200.0
+BENCH_SEARCH_RATE = 500.0
+# The fake backend shows tracks immediately, so verification needs no settle time
+BENCH_VERIFICATION_DELAY = 0
+BENCH_LATENCY = {
+    "*": ["fixed", 0.005],
+    "search": ["uniform", 0.001, 0.004],
+    "get_playlist": ["fixed", 0.01]
+}
+# Direction in which each gated metric gets worse
+GATED_METRICS = {
+    "tracks_per_sec": "lower",
+    "api_calls_per_track": "higher",
+    "peak_rss_mb": "higher",
+    "wall_seconds": "higher"
+}
+
+def _scaled(count, scale):
+    return max(1, int(round(count * scale)))
+
+def scenario_backend(name, scale):
+    if name == "huge_playlist":
+        return {"playlist_sizes": [_scaled(10000, scale)]}
+    if name == "many_playlists":
+        return {"playlist_sizes": [20] * _scaled(500, scale)}
+    if name == "liked_songs":
+        return {"liked_songs": _scaled(20000, scale)}
+    if name == "resume_after_expiry":
+        # Expire roughly halfway through the searches so both halves of the resume path run
+        return {"playlist_sizes": [_scaled(3000, scale)], "expire_headers_after": _scaled(1500, scale)}
+    raise ValueError(f"Unknown scenario: {name}")
+
+SCENARIOS = ("huge_playlist", "many_playlists", "liked_songs", "resume_after_expiry")
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _transfer_playlists(copy_playlists, config, backend):
+    results = []
+    resolved = {}
+    for playlist in copy_playlists.list_spotify_playlists(show=False):
+        while True:
+            progress = copy_playlists.load_progress(playlist['name'])
+            plan = copy_playlists.plan_playlist_sync(playlist, force=bool(progress))
+            try:
+                results.append(copy_playlists.transfer_tracks_to_ytm(
+                    playlist['name'], plan["tracks"], "playlist", plan=plan,
+                    batch_size=BENCH_BATCH_SIZE, max_workers=BENCH_SEARCH_WORKERS, resolved=resolved,
+                    verification_delay=BENCH_VERIFICATION_DELAY, config_data=config
+                ))
+                break
+            except copy_playlists.HeaderExpiredError:
+                # Same as a user pasting fresh headers and resuming
+                backend.expire_headers_after = None
+                backend.renew_headers()
+                results.append({"status": "resumed", "added": 0})
+    return results
+
+def _transfer_liked_songs(copy_playlists, config, backend):
+    liked_songs = copy_playlists.get_spotify_liked_songs()
+    return [copy_playlists.transfer_tracks_to_ytm(
+        "Liked Songs from Spotify", liked_songs, "liked_songs",
+        batch_size=BENCH_BATCH_SIZE, max_workers=BENCH_SEARCH_WORKERS,
+        verification_delay=BENCH_VERIFICATION_DELAY, config_data=config
+    )]
+
+def run_scenario(name, scale):
+    import copy_playlists
+    from fake_backend import FakeBackend
+
+    os.chdir(tempfile.mkdtemp(prefix=f"s2ym-bench-{name}-"))
+    backend = FakeBackend(seed=1, latency=BENCH_LATENCY, **scenario_backend(name, scale))
+    config = {
+        "fake_backend": backend,
+        "youtube_headers": f"benchmark-{name}",
+        "search_workers": BENCH_SEARCH_WORKERS,
+        "write_rate_max": BENCH_WRITE_RATE,
+        "search_rate_max": BENCH_SEARCH_RATE,
+        "search_cache_path": "search_cache.db",
+        "sync_state_path": "sync_state.db",
+        "transfer_journal_path": "transfer_journal.db"
+    }
+    copy_playlists.configure_clients(config)
+    # Start at full speed so the AIMD ramp-up doesn't dominate short scenarios
+    copy_playlists.write_rate.configure(rate=BENCH_WRITE_RATE, burst=BENCH_BATCH_SIZE)
+    copy_playlists.search_rate.configure(rate=BENCH_SEARCH_RATE, burst=BENCH_SEARCH_WORKERS)
+
+    total_tracks = sum(len(p["tracks"]) for p in backend.spotify_playlists) + len(backend.liked_tracks)
+    expected = total_tracks - sum(
+        1 for p in backend.spotify_playlists for index in p["tracks"] if backend.catalog.is_missing(index)
+    ) - sum(1 for index in backend.liked_tracks if backend.catalog.is_missing(index))
+
+    start = time.perf_counter()
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        if backend.liked_tracks:
+            results = _transfer_liked_songs(copy_playlists, config, backend)
+        else:
+            results = _transfer_playlists(copy_playlists, config, backend)
+    wall = time.perf_counter() - start
+
+    stats = backend.stats()
+    api_calls = sum(stats["calls"].values())
+    landed = sum(stats["playlists"].values())
+    return {
+        "scenario": name,
+        "scale": scale,
+        "tracks": total_tracks,
+        "wall_seconds": round(wall, 3),
+        "tracks_per_sec": round(total_tracks / wall, 2) if wall else None,
+        "api_calls": api_calls,
+        "api_calls_per_track": round(api_calls / max(1, total_tracks), 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1) if resource else None,
+        "completeness": round(landed / max(1, expected), 4),
+        "resumes": sum(1 for result in results if result["status"] == "resumed"),
+        "calls": stats["calls"],
+        "errors": stats["errors"],
+        "metrics": copy_playlists.metrics.snapshot()
+    }
+
+def run_isolated(name, scale):
+    # One process per scenario so peak RSS and module-level state don't leak between scenarios
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name, "--scale", str(scale)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Scenario {name} crashed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def compare_to_baseline(results, baseline, threshold):
+    regressions = []
+    thresholds = baseline.get("thresholds", {})
+    for result in results:
+        previous = baseline.get("scenarios", {}).get(result["scenario"])
+        if not previous or previous.get("scale") != result["scale"]:
+            continue
+        for metric, worse in GATED_METRICS.items():
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if worse == "lower":
+                change = -change
+            limit = thresholds.get(metric, threshold)
+            if change > limit:
+                regressions.append(
+                    f"{result['scenario']}: {metric} {old} -> {new} ({change * 100:.1f}% worse, limit {limit * 100:.0f}%)"
+                )
+    return regressions
+
+def print_report(results):
+    print(f"{'scenario':<22}{'tracks':>8}{'wall s':>10}{'tracks/s':>10}{'calls/track':>13}{'peak MB':>10}{'complete':>10}")
+    for result in results:
+        rss = result["peak_rss_mb"] if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{result['scenario']:<22}{result['tracks']:>8}{result['wall_seconds']:>10}{result['tracks_per_sec']:>10}"
+              f"{result['api_calls_per_track']:>13}{rss:>10}{result['completeness'] * 100:>9.1f}%")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="benchmark.py",
+        description="Benchmark transfers end to end against the local fake backend.",
+        epilog="Exit codes: 0 ok, 1 regression or incomplete transfer, 2 usage error."
+    )
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply scenario sizes, e.g. 0.1 for a quick run")
+    parser.add_argument("--baseline", help="baseline JSON to gate against")
+    parser.add_argument("--save-baseline", help="write the results as a new baseline JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative regression per metric (default: 0.2 = 20%%)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON instead of a table")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args.scale)))
+        return 0
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        print(f"Running {name} (scale {args.scale})...", file=sys.stderr)
+        results.append(run_isolated(name, args.scale))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    failures = [
+        f"{result['scenario']}: only {result['completeness'] * 100:.1f}% of the findable tracks reached YouTube Music"
+        for result in results if result["completeness"] < 1
+    ]
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            failures.extend(compare_to_baseline(results, json.load(f), args.threshold))
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"scenarios": {result["scenario"]: result for result in results}}, f, indent=2)
+
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+import argparse
+import contextlib
+import json
+import sys
+
+import copy_playlists
+from profiling import DEFAULT_REPORT_PATH as DEFAULT_PROFILE_REPORT
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+EXIT_CONFIG = 4
+EXIT_HEADERS_EXPIRED = 5
+EXIT_QUOTA = 6
+EXIT_INTERRUPTED = 130
+
+LIKED_SONGS_PLAYLIST_NAME = "Liked Songs from Spotify"
+
+class UsageError(Exception):
+    pass
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Sync Spotify playlists, liked songs and followed artists to YouTube Music without the GUI.",
+        epilog=(
+            "Exit codes: 0 ok, 1 failed, 2 usage error, 3 partial transfer, "
+            "4 missing or invalid configuration, 5 YouTube Music headers expired (progress saved), "
+            "6 YouTube Music quota exhausted, 130 interrupted."
+        )
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--dry-run", action="store_true", help="search and report what would change without writing to YouTube Music")
+    common.add_argument("--workers", type=int, help="concurrent YouTube Music searches (default: search_workers from config.json)")
+    common.add_argument("--spotify-workers", type=int, help="concurrent Spotify page fetches (default: spotify_workers from config.json)")
+    common.add_argument("--batch-size", default=None, help="tracks per add request, or 'auto' (default: config.json)")
+    common.add_argument("--json", action="store_true", help="print a JSON summary of the run to stdout")
+    common.add_argument("--probe-quota", action="store_true", help="check quota with a real write probe (creates and deletes a playlist) instead of recent call history")
+    common.add_argument("--metrics", metavar="FILE", help="write API call metrics on exit: Prometheus text format for .prom files, JSON otherwise")
+    common.add_argument("--trace", metavar="FILE", help="record per-track spans and write them as Chrome/Perfetto trace JSON on exit")
+    common.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_REPORT, metavar="FILE",
+                        help=f"profile CPU (cProfile) and memory per phase (tracemalloc) and write a report on exit (default: {DEFAULT_PROFILE_REPORT})")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    playlists = subparsers.add_parser("playlists", parents=[common], help="copy Spotify playlists")
+    playlists.add_argument("--select", help="playlist numbers as shown by --list, e.g. '1,3,5-7' (default: all)")
+    playlists.add_argument("--list", action="store_true", help="list your Spotify playlists with their numbers and exit")
+    playlists.add_argument("--force", action="store_true", help="ignore the last sync snapshot and re-check every track")
+
+    subparsers.add_parser("liked", parents=[common], help="copy Spotify liked songs")
+    subparsers.add_parser("artists", parents=[common], help="subscribe to followed Spotify artists")
+    return parser
+
+def resolve_batch_settings(value, config_data):
+    if value is None:
+        return int(config_data.get("batch_size", 5)), bool(config_data.get("batch_size_auto", False))
+    if str(value).lower() == "auto":
+        return int(config_data.get("batch_size", 5)), True
+    batch_size = int(value)
+    if batch_size < 1:
+        raise ValueError("batch size must be at least 1")
+    return batch_size, False
+
+def exit_code_for(results):
+    statuses = {result["status"] for result in results}
+    if "failed" in statuses:
+        return EXIT_FAILED if statuses <= {"failed"} else EXIT_PARTIAL
+    if "partial" in statuses:
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+def run_playlists(args, config_data, batch_size, auto_batch, max_workers):
+    playlists = copy_playlists.list_spotify_playlists(show=args.list)
+    if args.list:
+        return []
+    if not playlists:
+        print("No playlists found!")
+        return []
+
+    if args.select:
+        indices = copy_playlists.parse_playlist_selection(args.select, len(playlists))
+        if not indices:
+            raise UsageError(f"no valid playlists in selection: {args.select}")
+        playlists = [playlists[i] for i in indices]
+
+    copy_playlists.reset_ytm_playlist_index()
+    resolved = {}
+    results = []
+    for playlist in playlists:
+        progress = None if args.dry_run else copy_playlists.load_progress(playlist['name'])
+        plan = copy_playlists.plan_playlist_sync(playlist, force=args.force or bool(progress))
+        results.append(copy_playlists.transfer_tracks_to_ytm(
+            playlist['name'],
+            plan["tracks"],
+            "playlist",
+            plan=plan,
+            batch_size=batch_size,
+            auto_batch=auto_batch,
+            max_workers=max_workers,
+            resolved=resolved,
+            dry_run=args.dry_run,
+            config_data=config_data
+        ))
+    return results
+
+def run_liked(args, config_data, batch_size, auto_batch, max_workers):
+    print("Fetching liked songs from Spotify...")
+    liked_songs = copy_playlists.get_spotify_liked_songs()
+    if not liked_songs and not copy_playlists.load_progress(LIKED_SONGS_PLAYLIST_NAME):
+        print("No liked songs found on Spotify")
+        return []
+    return [copy_playlists.transfer_tracks_to_ytm(
+        LIKED_SONGS_PLAYLIST_NAME,
+        liked_songs,
+        "liked_songs",
+        batch_size=batch_size,
+        auto_batch=auto_batch,
+        max_workers=max_workers,
+        dry_run=args.dry_run,
+        config_data=config_data
+    )]
+
+def run_artists(args, config_data, batch_size, auto_batch, max_workers):
+    artists = copy_playlists.get_spotify_followed_artists()
+    result = {
+        "name": "Followed artists",
+        "operation_type": "artists",
+        "status": "ok",
+        "attempted": len(artists),
+        "added": 0,
+        "failed": 0,
+        "removed": 0,
+        "not_found": []
+    }
+    outcome = copy_playlists.subscribe_to_ytm_artists(
+        artists,
+        max_workers=max_workers,
+        dry_run=args.dry_run
+    )
+    failed = outcome["failed"]
+    result["not_found"] = list(failed)
+    if args.dry_run:
+        result["status"] = "dry_run"
+        result["attempted"] = outcome["attempted"]
+        return [result]
+
+    result["failed"] = len(failed)
+    result["added"] = outcome["subscribed"]
+    if failed:
+        result["status"] = "partial" if outcome["subscribed"] or outcome["skipped"] else "failed"
+    return [result]
+
+COMMANDS = {
+    "playlists": run_playlists,
+    "liked": run_liked,
+    "artists": run_artists
+}
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    config_data = copy_playlists.load_config()
+    if not config_data:
+        print("No configuration found. Run ui.py once to set up credentials.", file=sys.stderr)
+        return EXIT_CONFIG
+
+    if args.workers is not None:
+        config_data["search_workers"] = args.workers
+    if args.spotify_workers is not None:
+        config_data["spotify_workers"] = args.spotify_workers
+    try:
+        batch_size, auto_batch = resolve_batch_settings(args.batch_size, config_data)
+    except ValueError as e:
+        parser.print_usage(sys.stderr)
+        print(f"cli.py: error: invalid --batch-size: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    copy_playlists.metrics.measure_bytes = bool(args.metrics or args.json)
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        initialized = copy_playlists.initialize_clients(config_data)
+    if not initialized:
+        print("Failed to initialize Spotify/YouTube Music clients. Check config.json.", file=sys.stderr)
+        return EXIT_CONFIG
+
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        quota_ok, quota_feedback = copy_playlists.perform_quota_check(probe=args.probe_quota)
+    if not quota_ok:
+        print(quota_feedback, file=sys.stderr)
+        if copy_playlists.last_quota_status == "auth":
+            return EXIT_HEADERS_EXPIRED
+        if copy_playlists.last_quota_status == "exhausted":
+            return EXIT_QUOTA
+        return EXIT_CONFIG
+
+    if args.trace:
+        copy_playlists.tracer.enable()
+    if args.profile:
+        copy_playlists.profiler.enable()
+    results = []
+    exit_code = EXIT_OK
+    # With --json, stdout carries only the summary; progress output goes to stderr
+    output = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    try:
+        with output, copy_playlists.profiler.profile_thread():
+            results = COMMANDS[args.command](
+                args, config_data, batch_size, auto_batch, copy_playlists.get_search_workers(config_data)
+            )
+        exit_code = exit_code_for(results)
+    except UsageError as e:
+        print(f"cli.py: error: {e}", file=sys.stderr)
+        exit_code = EXIT_USAGE
+    except copy_playlists.HeaderExpiredError as e:
+        print(f"YouTube Music headers expired. Progress saved to: {getattr(e, 'progress_file', None)}", file=sys.stderr)
+        print("Update the headers in config.json (or via ui.py) and run the same command again to resume.", file=sys.stderr)
+        exit_code = EXIT_HEADERS_EXPIRED
+    except KeyboardInterrupt:
+        print("Interrupted. Unfinished transfers resume on the next run.", file=sys.stderr)
+        exit_code = EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"Sync failed: {e}", file=sys.stderr)
+        exit_code = EXIT_FAILED
+
+    if args.metrics:
+        try:
+            copy_playlists.metrics.write(args.metrics)
+        except OSError as e:
+            print(f"Could not write metrics to {args.metrics}: {e}", file=sys.stderr)
+    if args.trace:
+        try:
+            copy_playlists.tracer.export_chrome(args.trace)
+        except OSError as e:
+            print(f"Could not write trace to {args.trace}: {e}", file=sys.stderr)
+    if args.profile:
+        try:
+            copy_playlists.profiler.finish(args.profile)
+            print(f"Profile report written to {args.profile} (raw stats: {args.profile}.prof)", file=sys.stderr)
+        except OSError as e:
+            print(f"Could not write profile report to {args.profile}: {e}", file=sys.stderr)
+    if args.json:
+        print(json.dumps({
+            "command": args.command,
+            "exit_code": exit_code,
+            "results": results,
+            "metrics": copy_playlists.metrics.snapshot()
+        }, ensure_ascii=False))
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
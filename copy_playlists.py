@@ -4,11 +4,60 @@ from ytmusicapi import YTMusic
 import time
 from ytmusicapi import setup
 from tqdm import tqdm
+import hashlib
 import json
 import os
+import re
+import threading
+import queue
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, as_completed
+from api_health import DEFAULT_TTL_SECONDS as QUOTA_CHECK_TTL, ApiHealth
+from fake_backend import open_fake_backend
+from metrics import MetricsRegistry, instrument_client
+from profiling import Profiler
+from tracing import Tracer
+from rate_limit import AdaptiveBatchSizer, RateController
+from search_cache import normalize_query, open_search_cache
+from sync_state import open_sync_state
+from transfer_journal import open_transfer_journal
+from transfer_scheduler import TransferCancelled
+from track_matching import ISRC_ACCEPT_SCORE, TEXT_ACCEPT_SCORE, best_candidate, make_track_record, track_query
 
 sp = None
 ytmusic = None
+client_config = None
+_parsed_headers = {}
+_clients_lock = threading.RLock()
+fake_backend = None
+search_cache = None
+_search_cache_lock = threading.Lock()
+sync_state = None
+_sync_state_lock = threading.Lock()
+transfer_journal = None
+_transfer_journal_lock = threading.Lock()
+ytm_playlist_index = None
+_ytm_playlist_index_lock = threading.Lock()
+header_probe_interval = 300
+spotify_workers = None
+_last_ytmusic_auth_success = 0.0
+write_rate = RateController("write", rate=0.5, min_rate=0.05, max_rate=2.0, increase=0.05)
+search_rate = RateController("search", rate=5.0, min_rate=0.5, max_rate=20.0, burst=5, increase=0.25)
+api_health = ApiHealth(lambda: write_rate.snapshot()["outcomes"] + [
+    outcome for outcome in search_rate.snapshot()["outcomes"] if outcome[1] in ("auth", "throttle")
+])
+_spotify_check = None
+last_quota_status = None
+PIPELINE_QUEUE_SIZE = 200
+# Tracks written before the first mid-transfer delivery check; the interval doubles after each check
+DELIVERY_CHECK_START = 50
+SAVED_BATCH_SIZE_DECAY = 0.25
+_PIPELINE_DONE = object()
+metrics = MetricsRegistry()
+tracer = Tracer()
+profiler = Profiler()
+LIKED_SONGS_TRACE_SCOPE = "liked_songs"
+write_rate.on_wait = search_rate.on_wait = lambda name, seconds: metrics.observe_sleep(f"rate_limit_{name}", seconds)
 
 def load_config():
     if os.path.exists("config.json"):
@@ -48,16 +97,127 @@ def validate_youtube_headers(headers_text):
     
     return True, "Headers appear valid"
 
-def initialize_clients(config_data=None):
-    global sp, ytmusic
+def get_worker_setting(key, default, config_data=None):
+    if config_data is None:
+        config_data = get_client_config()
+    try:
+        return max(1, int(config_data.get(key, default)))
+    except (TypeError, ValueError):
+        return default
+
+def get_search_workers(config_data=None):
+    return get_worker_setting("search_workers", 8, config_data)
+
+def get_spotify_workers(config_data=None):
+    return get_worker_setting("spotify_workers", 4, config_data)
+
+def configure_rate_controllers(config_data=None):
+    config_data = config_data or {}
+    try:
+        write_rate.configure(max_rate=float(config_data.get("write_rate_max", write_rate.max_rate)))
+        search_rate.configure(max_rate=float(config_data.get("search_rate_max", search_rate.max_rate)))
+    except (TypeError, ValueError) as e:
+        print(f"Ignoring invalid rate limit settings: {e}")
+
+def configure_api_health(config_data=None):
+    global _spotify_check
+    config_data = config_data or {}
+    _spotify_check = None
+    api_health.set_identity(get_account_key(config_data))
+    try:
+        api_health.ttl_seconds = float(config_data.get("quota_check_ttl", QUOTA_CHECK_TTL))
+    except (TypeError, ValueError):
+        api_health.ttl_seconds = QUOTA_CHECK_TTL
+
+def classify_api_error(error):
+    error_str = str(error).lower()
+    if "401" in error_str or "403" in error_str or "unauthorized" in error_str:
+        return "auth"
+    if "http 409" in error_str:
+        return "conflict"
+    if "429" in error_str or "rate limit" in error_str or "too many requests" in error_str:
+        return "throttle"
+    if re.search(r"http 5\d\d", error_str):
+        return "server"
+    return "other"
+
+def mark_ytmusic_authenticated():
+    global _last_ytmusic_auth_success
+    _last_ytmusic_auth_success = time.monotonic()
+
+def record_api_success(controller, sent=1, dropped=0):
+    if controller in (write_rate, search_rate):
+        mark_ytmusic_authenticated()
+    controller.record_delivery(sent, dropped)
+
+def record_api_error(controller, error):
+    error_kind = classify_api_error(error)
+    if error_kind in ("throttle", "server"):
+        controller.record_throttle(error_kind)
+    else:
+        controller.record_error(error_kind)
+    return error_kind
+
+def reset_ytm_playlist_index():
+    global ytm_playlist_index
+    with _ytm_playlist_index_lock:
+        ytm_playlist_index = None
+
+def _apply_client_config(config_data):
+    global header_probe_interval, spotify_workers
+    configure_rate_controllers(config_data)
+    configure_api_health(config_data)
+    spotify_workers = get_spotify_workers(config_data)
+    try:
+        header_probe_interval = float(config_data.get("header_probe_interval", 300))
+    except (TypeError, ValueError):
+        header_probe_interval = 300
+
+def get_client_config():
+    global client_config
+    with _clients_lock:
+        if client_config is None:
+            # First use without configure_clients(): apply the same settings it would
+            client_config = load_config() or {}
+            _apply_client_config(client_config)
+        return client_config
+
+def configure_clients(config_data=None):
+    global sp, ytmusic, client_config, fake_backend
     
     if config_data is None:
         config_data = load_config()
     
+    with _clients_lock:
+        client_config = config_data or {}
+        sp = None
+        ytmusic = None
+        fake_backend = None
+        reset_ytm_playlist_index()
+        _apply_client_config(client_config)
+
+def parse_youtube_headers(headers):
+    digest = hashlib.sha256(headers.encode("utf-8")).hexdigest()
+    with _clients_lock:
+        if digest not in _parsed_headers:
+            _parsed_headers.clear()
+            _parsed_headers[digest] = setup(filepath=None, headers_raw=headers)
+        return _parsed_headers[digest]
+
+def get_fake_backend(config_data):
+    global fake_backend
+    with _clients_lock:
+        if fake_backend is None:
+            fake_backend = open_fake_backend(config_data["fake_backend"])
+            print("⚠️ Using the local fake backend instead of Spotify and YouTube Music")
+        return fake_backend
+
+def _build_spotify_client(config_data):
     if not config_data:
         print("No configuration found. Please run the UI to set up credentials.")
-        return False
-    
+        return None
+    if config_data.get("fake_backend") is not None:
+        return get_fake_backend(config_data).spotify
     try:
         sp_oauth = SpotifyOAuth(
             client_id=config_data["spotify_client_id"],
@@ -65,98 +225,110 @@ def initialize_clients(config_data=None):
             redirect_uri=config_data["spotify_redirect_uri"],
             scope="playlist-read-private playlist-read-collaborative user-library-read user-follow-read"
         )
-        sp = spotipy.Spotify(auth_manager=sp_oauth)
-        
-        if config_data.get("youtube_headers"):
-            try:
-                headers = config_data["youtube_headers"].strip()
-                
-                if not headers:
-                    print("YouTube Music headers are empty")
-                    ytmusic = None
-                    return False
-                
-                required_fields = ['cookie', 'user-agent']
-                headers_lower = headers.lower()
-                if not any(field in headers_lower for field in required_fields):
-                    print("YouTube Music headers appear to be invalid - missing required fields")
-                    ytmusic = None
-                    return False
-                
-                with open("raw_headers.txt", "w", encoding="utf-8") as f:
-                    f.write(headers)
-                
-                try:
-                    setup(filepath="browser.json", headers_raw=headers)
-                except Exception as setup_error:
-                    print(f"Failed to parse headers: {setup_error}")
-                    print("Please check that your headers are in the correct format")
-                    ytmusic = None
-                    return False
-                
-                ytmusic = YTMusic("browser.json")
-                
-                try:
-                    test_result = ytmusic.get_library_playlists(limit=1)
-                    if test_result is None:
-                        print("YouTube Music client test failed - headers may be expired")
-                        ytmusic = None
-                        return False
-                except Exception as test_error:
-                    print(f"YouTube Music connection test failed: {test_error}")
-                    ytmusic = None
-                    return False
-                    
-            except Exception as e:
-                print(f"Failed to initialize YouTube Music client: {e}")
-                ytmusic = None
-                return False
-        else:
-            print("No YouTube Music headers provided")
-            return False
-        
-        return True
-        
+        return spotipy.Spotify(auth_manager=sp_oauth)
     except Exception as e:
-        print(f"Error initializing clients: {e}")
+        print(f"Error initializing Spotify client: {e}")
+        return None
+
+def _build_ytmusic_client(config_data):
+    if not config_data:
+        print("No configuration found. Please run the UI to set up credentials.")
+        return None
+    if config_data.get("fake_backend") is not None:
+        return get_fake_backend(config_data).ytmusic
+    headers = (config_data.get("youtube_headers") or "").strip()
+    if not headers:
+        print("No YouTube Music headers provided")
+        return None
+    
+    required_fields = ['cookie', 'user-agent']
+    headers_lower = headers.lower()
+    if not any(field in headers_lower for field in required_fields):
+        print("YouTube Music headers appear to be invalid - missing required fields")
+        return None
+    
+    try:
+        auth = parse_youtube_headers(headers)
+    except Exception as setup_error:
+        print(f"Failed to parse headers: {setup_error}")
+        print("Please check that your headers are in the correct format")
+        return None
+    
+    try:
+        return YTMusic(auth)
+    except Exception as e:
+        print(f"Failed to initialize YouTube Music client: {e}")
+        return None
+
+def initialize_clients(config_data=None):
+    configure_clients(config_data)
+    
+    if not get_client_config():
+        print("No configuration found. Please run the UI to set up credentials.")
+        return False
+    if get_spotify_client() is None:
         return False
+    
+    client = get_ytmusic_client()
+    if client is None:
+        return False
+    try:
+        test_result = client.get_library_playlists(limit=1)
+        if test_result is None:
+            print("YouTube Music client test failed - headers may be expired")
+            return False
+    except Exception as test_error:
+        print(f"YouTube Music connection test failed: {test_error}")
+        return False
+    mark_ytmusic_authenticated()
+    return True
 
 def get_spotify_client():
     global sp
     if sp is None:
-        initialize_clients()
+        with _clients_lock:
+            if sp is None:
+                sp = instrument_client(_build_spotify_client(get_client_config()), "spotify", metrics, classify_api_error, tracer)
     return sp
 
 def get_ytmusic_client():
     global ytmusic
     if ytmusic is None:
-        if not initialize_clients():
-            return None
+        with _clients_lock:
+            if ytmusic is None:
+                ytmusic = instrument_client(_build_ytmusic_client(get_client_config()), "ytmusic", metrics, classify_api_error, tracer)
     return ytmusic
 
-initialize_clients()
+def _playlist_index_key(playlist_name):
+    return playlist_name.strip().lower()
+
+def get_ytm_playlist_index(refresh=False):
+    global ytm_playlist_index
+    with _ytm_playlist_index_lock:
+        if ytm_playlist_index is None or refresh:
+            index = {}
+            for playlist in get_ytmusic_client().get_library_playlists(limit=None):
+                index.setdefault(_playlist_index_key(playlist['title']), playlist)
+            ytm_playlist_index = index
+        return ytm_playlist_index
 
 def get_ytm_playlist_by_name(playlist_name):
     try:
-        playlists = get_ytmusic_client().get_library_playlists()
-        for playlist in playlists:
-            if playlist['title'].strip().lower() == playlist_name.strip().lower():
-                return playlist
-        return None
+        return get_ytm_playlist_index().get(_playlist_index_key(playlist_name))
     except Exception as e:
         print(f"Error fetching YouTube Music playlists: {e}")
         return None
 
+def fetch_ytm_playlist_video_ids(playlist_id):
+    playlist = get_ytmusic_client().get_playlist(playlist_id, limit=10000)
+    return {track['videoId'] for track in playlist.get('tracks', []) if track and 'videoId' in track}
+
 def get_ytm_playlist_song_video_ids(playlist_id):
-    video_ids = set()
     try:
-        playlist = get_ytmusic_client().get_playlist(playlist_id, limit=10000)
-        for track in playlist.get('tracks', []):
-            if track and 'videoId' in track:
-                video_ids.add(track['videoId'])
+        return fetch_ytm_playlist_video_ids(playlist_id)
     except Exception as e:
         print(f"Error fetching playlist tracks: {e}")
-    return video_ids
+        return set()
 
 def create_or_get_ytm_playlist(playlist_name):
     existing = get_ytm_playlist_by_name(playlist_name)
@@ -167,85 +339,355 @@ def create_or_get_ytm_playlist(playlist_name):
         playlist_id = create_ytm_playlist(playlist_name)
         return playlist_id, False
 
-def list_spotify_playlists():
-    playlists = []
-    limit = 50  
-    offset = 0
-
-    while True:
-        results = get_spotify_client().current_user_playlists(limit=limit, offset=offset)
-        if not results['items']:
-            break  
-
-        for idx, playlist in enumerate(results['items'], start=len(playlists) + 1):
+SPOTIFY_PLAYLISTS_PAGE_LIMIT = 50
+SPOTIFY_SAVED_TRACKS_PAGE_LIMIT = 50
+SPOTIFY_PLAYLIST_ITEMS_PAGE_LIMIT = 100
+SPOTIFY_FOLLOWED_ARTISTS_PAGE_LIMIT = 50
+SPOTIFY_PLAYLIST_ITEM_FIELDS = "total,items(track(id,name,artists(name),album(name),duration_ms,external_ids(isrc)))"
+
+def fetch_spotify_pages(fetch_page, limit, max_workers=None):
+    if max_workers is None:
+        max_workers = spotify_workers or get_spotify_workers()
+    with profiler.phase("fetch"):
+        first_page = fetch_page(limit=limit, offset=0)
+        items = list(first_page.get('items') or [])
+        total = first_page.get('total') or 0
+        offsets = list(range(limit, total, limit))
+        if offsets:
+            with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+                for page in executor.map(profiler.profiled(lambda offset: fetch_page(limit=limit, offset=offset)), offsets):
+                    items.extend(page.get('items') or [])
+        return items
+
+def _traced_page_fetcher(fetch_page, trace_scope):
+    if not tracer.enabled:
+        return fetch_page
+
+    def fetch_traced_page(limit, offset):
+        start = tracer.now()
+        page = fetch_page(limit=limit, offset=offset)
+        end = tracer.now()
+        for item in page.get('items') or []:
+            if item and item.get('track'):
+                tracer.track_phase(trace_scope, track_key(make_track_record(item['track'])), "spotify_page", start, end, offset=offset)
+        return page
+
+    return fetch_traced_page
+
+def list_spotify_playlists(show=True):
+    playlists = fetch_spotify_pages(get_spotify_client().current_user_playlists, SPOTIFY_PLAYLISTS_PAGE_LIMIT)
+    if show:
+        for idx, playlist in enumerate(playlists, start=1):
             print(f"{idx}. {playlist['name']} (ID: {playlist['id']})")
-            playlists.append(playlist)
-
-        offset += limit  
 
-    if not playlists:
+    if show and not playlists:
         print("No playlists found!")
     
     return playlists
 
 def get_spotify_liked_songs():
-    liked_songs = []
-    results = get_spotify_client().current_user_saved_tracks()
-    while results:
-        for item in results['items']:
-            track = item['track']
-            if track:
-                artist_name = track['artists'][0]['name']
-                track_name = track['name']
-                liked_songs.append(f"{artist_name} - {track_name}")        
-        if results['next']:
-            results = get_spotify_client().next(results)
-        else:
-            break
-    return liked_songs
+    items = fetch_spotify_pages(
+        _traced_page_fetcher(get_spotify_client().current_user_saved_tracks, LIKED_SONGS_TRACE_SCOPE),
+        SPOTIFY_SAVED_TRACKS_PAGE_LIMIT
+    )
+    return [make_track_record(item['track']) for item in items if item and item.get('track')]
 
 def get_spotify_playlist_tracks(playlist_id):
-    tracks = []
-    results = get_spotify_client().playlist_items(playlist_id)
-    while results:
-        for item in results['items']:
-            track = item['track']
-            if track:
-                artist_name = track['artists'][0]['name']
-                track_name = track['name']
-                tracks.append(f"{artist_name} - {track_name}")        
-        if results['next']:
-            results = get_spotify_client().next(results)
-        else:
-            break
-    return tracks
+    def fetch_page(limit, offset):
+        return get_spotify_client().playlist_items(
+            playlist_id, fields=SPOTIFY_PLAYLIST_ITEM_FIELDS, limit=limit, offset=offset, additional_types=("track",)
+        )
+
+    items = fetch_spotify_pages(_traced_page_fetcher(fetch_page, playlist_id), SPOTIFY_PLAYLIST_ITEMS_PAGE_LIMIT)
+    return [make_track_record(item['track']) for item in items if item and item.get('track')]
 
 def create_ytm_playlist(playlist_name):
     try:
         playlist_id = get_ytmusic_client().create_playlist(title=playlist_name, description="Copied from Spotify")
         print(f"Created YouTube Music playlist: {playlist_name} (ID: {playlist_id})")
+        if isinstance(playlist_id, str):
+            with _ytm_playlist_index_lock:
+                if ytm_playlist_index is not None:
+                    ytm_playlist_index[_playlist_index_key(playlist_name)] = {
+                        "playlistId": playlist_id,
+                        "title": playlist_name
+                    }
         return playlist_id
     except Exception as e:
         print(f"Failed to create playlist: {playlist_name}")
         print(e)
         return None
 
-def search_track_on_ytm(track_query):
-    try:
-        search_results = get_ytmusic_client().search(query=track_query, filter="songs")
-        if search_results:
-            video_id = search_results[0]['videoId']
+def get_search_cache():
+    global search_cache
+    with _search_cache_lock:
+        if search_cache is None:
+            search_cache = open_search_cache(get_client_config())
+            if search_cache is None:
+                search_cache = False
+    return search_cache or None
+
+def flush_search_cache():
+    cache = search_cache
+    if cache:
+        cache.flush()
+
+def rate_limited_search(query, filter="songs", retry_attempts=3):
+    for attempt in range(retry_attempts):
+        search_rate.acquire()
+        try:
+            search_results = get_ytmusic_client().search(query=query, filter=filter)
+        except Exception as e:
+            error_kind = record_api_error(search_rate, e)
+            if error_kind not in ("throttle", "server") or attempt == retry_attempts - 1:
+                raise
+            continue
+        record_api_success(search_rate)
+        return search_results
+
+def match_track_on_ytm(track):
+    if not isinstance(track, dict):
+        search_results = rate_limited_search(track)
+        return search_results[0]['videoId'] if search_results else None
+
+    if track.get("isrc"):
+        search_results = rate_limited_search(track["isrc"])
+        candidate, score = best_candidate(track, search_results, ISRC_ACCEPT_SCORE)
+        if candidate:
+            return candidate['videoId']
+
+    search_results = rate_limited_search(track_query(track))
+    candidate, score = best_candidate(track, search_results, TEXT_ACCEPT_SCORE)
+    return candidate['videoId'] if candidate else None
+
+def search_track_on_ytm(track):
+    cache = get_search_cache()
+    key = track_key(track)
+    if cache:
+        hit, video_id = cache.get(key)
+        if hit:
             return video_id
-        else:
-            return None
+
+    try:
+        video_id = match_track_on_ytm(track)
     except Exception as e:
-        print(f"Error searching for track: {track_query}")
+        # A rejected search says nothing about the track, so it must not be recorded as not found
+        if classify_api_error(e) == "auth":
+            raise HeaderExpiredError("Headers expired while searching")
+        print(f"Error searching for track: {track_query(track)}")
         print(e)
         return None
 
+    if cache:
+        cache.put(key, video_id)
+    return video_id
+
+def track_key(track):
+    if isinstance(track, dict) and track.get("isrc"):
+        return f"isrc:{track['isrc']}"
+    return normalize_query(track_query(track))
+
+def resolve_tracks_on_ytm(tracks, max_workers=8, progress_callback=None):
+    unique_queries = {}
+    for track in tracks:
+        unique_queries.setdefault(track_key(track), track)
+
+    resolved = {}
+    if not unique_queries:
+        return resolved
+
+    # Build the client before fanning out so the workers don't race to initialize it
+    get_ytmusic_client()
+
+    with profiler.phase("search"):
+        completed = 0
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+                futures = {executor.submit(profiler.profiled(search_track_on_ytm), query): key for key, query in unique_queries.items()}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    resolved[key] = future.result()
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, len(unique_queries), unique_queries[key])
+        finally:
+            flush_search_cache()
+        return resolved
+
+def search_tracks_on_ytm(tracks, max_workers=8, progress_callback=None):
+    resolved = resolve_tracks_on_ytm(tracks, max_workers=max_workers, progress_callback=progress_callback)
+    return [resolved.get(track_key(track)) for track in tracks]
+
+class SharedResolutions(dict):
+    # A resolved map for transfers that run at the same time: each key is searched once and the rest wait for it
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._searching = {}
+
+    def claim(self, key):
+        # Returns (future, owned); the owner runs the search, everyone else waits on the future
+        with self._lock:
+            if key in self:
+                return None, False
+            if key in self._searching:
+                return self._searching[key], False
+            future = self._searching[key] = Future()
+            return future, True
+
+    def publish(self, key, future, search):
+        with self._lock:
+            del self._searching[key]
+            if not search.cancelled() and search.exception() is None:
+                self[key] = search.result()
+        if search.cancelled():
+            future.cancel()
+        elif search.exception() is not None:
+            future.set_exception(search.exception())
+        else:
+            future.set_result(search.result())
+
+def get_sync_state():
+    global sync_state
+    with _sync_state_lock:
+        if sync_state is None:
+            sync_state = open_sync_state(get_client_config())
+            if sync_state is None:
+                sync_state = False
+    return sync_state or None
+
+def sync_track_key(track):
+    if isinstance(track, dict) and track.get("id"):
+        return f"spotify:{track['id']}"
+    return track_key(track)
+
+def ytm_playlist_in_library(playlist_id):
+    # Uses the per-run library index, so checking every synced playlist costs no extra calls
+    try:
+        index = get_ytm_playlist_index()
+    except Exception as e:
+        print(f"Error fetching YouTube Music playlists: {e}")
+        return True
+    return any(entry.get('playlistId') == playlist_id for entry in index.values())
+
+def fill_resolved_from_cache(tracks, resolved):
+    cache = get_search_cache()
+    complete = True
+    for track in tracks:
+        key = track_key(track)
+        if key in resolved:
+            continue
+        hit, video_id = cache.get(key) if cache else (False, None)
+        if hit:
+            resolved[key] = video_id
+        else:
+            complete = False
+    return complete
+
+def plan_playlist_sync(playlist, force=False):
+    state = None
+    store = get_sync_state()
+    if store and not force:
+        state = store.get_playlist(playlist['id'])
+
+    plan = {
+        "playlist": playlist,
+        "state": state,
+        "unchanged": False,
+        "tracks": [],
+        "added_tracks": [],
+        "removed_video_ids": set()
+    }
+    if state and state["ytm_playlist_id"] and not ytm_playlist_in_library(state["ytm_playlist_id"]):
+        print(f"{playlist['name']}: the synced YouTube Music playlist is gone, copying it again")
+        state = plan["state"] = None
+    if state and playlist.get('snapshot_id') and state["snapshot_id"] == playlist['snapshot_id']:
+        plan["unchanged"] = True
+        return plan
+
+    tracks = get_spotify_playlist_tracks(playlist['id'])
+    plan["tracks"] = tracks
+    if not state:
+        plan["added_tracks"] = tracks
+        return plan
+
+    previous = state["tracks"]
+    current_keys = {sync_track_key(track) for track in tracks}
+    kept_video_ids = {previous[key] for key in current_keys if previous.get(key)}
+    plan["added_tracks"] = [track for track in tracks if not previous.get(sync_track_key(track))]
+    plan["removed_video_ids"] = {
+        video_id for key, video_id in previous.items()
+        if video_id and key not in current_keys and video_id not in kept_video_ids
+    }
+    return plan
+
+def synced_video_ids(plan):
+    if not plan["state"]:
+        return set()
+    return {video_id for video_id in plan["state"]["tracks"].values() if video_id}
+
+def planned_video_id(plan, track, resolved):
+    if plan["state"]:
+        video_id = plan["state"]["tracks"].get(sync_track_key(track))
+        if video_id:
+            return video_id
+    return resolved.get(track_key(track))
+
+def save_playlist_sync(plan, ytm_playlist_id, resolved, missing_video_ids=None):
+    store = get_sync_state()
+    snapshot_id = plan["playlist"].get('snapshot_id')
+    if not store or not snapshot_id:
+        return
+    mapping = {sync_track_key(track): planned_video_id(plan, track, resolved) for track in plan["tracks"]}
+    if missing_video_ids:
+        # Leave unverified tracks unmapped and the snapshot unset so the next run retries them
+        snapshot_id = None
+        mapping = {key: (None if video_id in missing_video_ids else video_id) for key, video_id in mapping.items()}
+    try:
+        store.save_playlist(plan["playlist"]['id'], snapshot_id, ytm_playlist_id, mapping)
+    except Exception as e:
+        print(f"Error saving sync state: {e}")
+
+def sync_removals_enabled(config_data=None):
+    if config_data is None:
+        config_data = get_client_config()
+    return bool(config_data.get("sync_removals", True))
+
+def remove_tracks_from_ytm_playlist(playlist_id, video_ids):
+    if not video_ids:
+        return 0
+    playlist = get_ytmusic_client().get_playlist(playlist_id, limit=None)
+    items = [
+        track for track in playlist.get('tracks', [])
+        if track and track.get('videoId') in video_ids and track.get('setVideoId')
+    ]
+    if not items:
+        return 0
+    write_rate.acquire()
+    try:
+        get_ytmusic_client().remove_playlist_items(playlist_id, items)
+    except Exception as e:
+        if record_api_error(write_rate, e) == "auth":
+            raise HeaderExpiredError("Headers expired while removing tracks")
+        raise
+    record_api_success(write_rate)
+    return len(items)
+
+def headers_still_valid(probe_interval=None):
+    if probe_interval is None:
+        probe_interval = header_probe_interval
+    if time.monotonic() - _last_ytmusic_auth_success < probe_interval:
+        return True
+    if test_ytmusic_connection():
+        mark_ytmusic_authenticated()
+        return True
+    return False
+
 def test_ytmusic_connection():
+    ytmusic = get_ytmusic_client()
+    if ytmusic is None:
+        return False
     try:
-        ytmusic = get_ytmusic_client()
         ytmusic.get_library_playlists(limit=1)
         return True
     except Exception as e:
@@ -253,7 +695,41 @@ def test_ytmusic_connection():
             return False
         return True
 
-def save_progress(playlist_name, current_track_index, total_tracks, ytm_video_ids, not_found_tracks, operation_type="playlist", current_batch_index=0):
+def wait_for_playlist_tracks(playlist_id, expected_video_ids, max_wait=30):
+    waited = 0
+    delay = min(2, max_wait)
+    while True:
+        metrics.sleep("verify_settle", delay)
+        waited += delay
+        current_playlist_ids = get_ytm_playlist_song_video_ids(playlist_id)
+        if all(vid in current_playlist_ids for vid in expected_video_ids) or waited >= max_wait:
+            return current_playlist_ids
+        delay = min(delay * 2, max_wait - waited)
+
+def get_transfer_journal():
+    global transfer_journal
+    with _transfer_journal_lock:
+        if transfer_journal is None:
+            transfer_journal = open_transfer_journal(get_client_config())
+            if transfer_journal is None:
+                transfer_journal = False
+    return transfer_journal or None
+
+def _legacy_progress_filename(playlist_name):
+    return f"progress_{playlist_name.replace(' ', '_').replace('/', '_')}.json"
+
+def save_progress(playlist_name, current_track_index, total_tracks, ytm_video_ids, not_found_tracks, operation_type="playlist", current_batch_index=0, current_track_offset=None):
+    journal = get_transfer_journal()
+    if journal:
+        try:
+            journal.save(
+                playlist_name, operation_type, current_track_index, total_tracks, ytm_video_ids, not_found_tracks,
+                batch_index=current_batch_index, write_offset=current_track_offset
+            )
+            return journal.path
+        except Exception as e:
+            print(f"Error saving progress to the transfer journal: {e}")
+
     progress_data = {
         "playlist_name": playlist_name,
         "current_track_index": current_track_index,
@@ -262,38 +738,116 @@ def save_progress(playlist_name, current_track_index, total_tracks, ytm_video_id
         "not_found_tracks": not_found_tracks,
         "operation_type": operation_type,
         "current_batch_index": current_batch_index,
+        "current_track_offset": current_track_offset,
         "timestamp": time.time()
     }
-    filename = f"progress_{playlist_name.replace(' ', '_').replace('/', '_')}.json"
+    filename = _legacy_progress_filename(playlist_name)
     with open(filename, "w", encoding="utf-8") as f:
-        json.dump(progress_data, f, indent=2)
+        json.dump(progress_data, f)
     return filename
 
 def load_progress(playlist_name):
+    journal = get_transfer_journal()
+    if journal:
+        try:
+            progress = journal.load(playlist_name)
+            if progress:
+                return progress
+        except Exception as e:
+            print(f"Error loading progress from the transfer journal: {e}")
     try:
-        filename = f"progress_{playlist_name.replace(' ', '_').replace('/', '_')}.json"
+        filename = _legacy_progress_filename(playlist_name)
         if os.path.exists(filename):
             with open(filename, "r", encoding="utf-8") as f:
-                return json.load(f)
+                progress = json.load(f)
+            if progress.get("playlist_name", playlist_name) == playlist_name:
+                return progress
     except Exception as e:
         print(f"Error loading progress: {e}")
     return None
 
 def delete_progress(playlist_name):
+    journal = get_transfer_journal()
+    if journal:
+        try:
+            journal.delete(playlist_name)
+        except Exception as e:
+            print(f"Error clearing the transfer journal: {e}")
     try:
-        filename = f"progress_{playlist_name.replace(' ', '_').replace('/', '_')}.json"
+        filename = _legacy_progress_filename(playlist_name)
         if os.path.exists(filename):
             os.remove(filename)
     except:
         pass
 
+def transfer_resume_points(tracks, pending_tracks):
+    positions = {id(track): index for index, track in enumerate(tracks)}
+    return [positions.get(id(track), 0) for track in pending_tracks] + [len(tracks)]
+
+def begin_transfer(playlist_name, operation_type, tracks, pending_tracks, ytm_video_ids, not_found_tracks, current_batch_index=0, current_track_offset=0):
+    journal = get_transfer_journal()
+    if not journal:
+        return None
+    resume_points = transfer_resume_points(tracks, pending_tracks)
+    try:
+        journal.save(
+            playlist_name, operation_type, resume_points[0], len(tracks), ytm_video_ids, not_found_tracks,
+            batch_index=current_batch_index, write_offset=current_track_offset
+        )
+    except Exception as e:
+        print(f"Error starting the transfer journal: {e}")
+        return None
+    return journal.start(playlist_name, resume_points)
+
 class HeaderExpiredError(Exception):
-    def __init__(self, message, batch_index=None):
+    def __init__(self, message, batch_index=None, track_index=None, search_index=None):
         super().__init__(message)
         self.batch_index = batch_index
+        self.track_index = track_index
+        self.search_index = search_index
+
+def get_account_key(config_data=None):
+    if config_data is None:
+        config_data = get_client_config()
+    headers = config_data.get("youtube_headers") or ""
+    identity = []
+    for line in headers.splitlines():
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        if name == "cookie":
+            for cookie in value.split(";"):
+                cookie_name, _, cookie_value = cookie.strip().partition("=")
+                if cookie_name in ("SAPISID", "__Secure-3PAPISID"):
+                    identity.append(cookie_value)
+        elif name == "x-goog-authuser":
+            identity.append(value.strip())
+    if not identity:
+        identity = [headers]
+    return hashlib.sha256("|".join(identity).encode("utf-8")).hexdigest()[:16]
+
+def load_saved_batch_size(account_key):
+    try:
+        if os.path.exists("batch_sizes.json"):
+            with open("batch_sizes.json", "r", encoding="utf-8") as f:
+                return json.load(f).get(account_key)
+    except Exception as e:
+        print(f"Error loading saved batch size: {e}")
+    return None
+
+def save_batch_size(account_key, batch_size):
+    try:
+        saved = {}
+        if os.path.exists("batch_sizes.json"):
+            with open("batch_sizes.json", "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        saved[account_key] = batch_size
+        with open("batch_sizes.json", "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=2)
+    except Exception as e:
+        print(f"Error saving batch size: {e}")
 
 def add_tracks_to_ytm_playlist_with_header_check(
-    playlist_id, track_ids, batch_size=10, retry_attempts=3, batch_delay=3, start_batch_index=0, progress_callback=None
+    playlist_id, track_ids, batch_size=10, retry_attempts=3, batch_delay=None, start_batch_index=0, progress_callback=None
 ):
     try:
         total_batches = (len(track_ids) + batch_size - 1) // batch_size
@@ -305,30 +859,34 @@ def add_tracks_to_ytm_playlist_with_header_check(
             attempt = 0
             while attempt < retry_attempts:
                 try:
-                    if not test_ytmusic_connection():
+                    if not headers_still_valid():
                         raise HeaderExpiredError("Headers expired", batch_index=batch_num)
+                    write_rate.acquire()
                     get_ytmusic_client().add_playlist_items(playlistId=playlist_id, videoIds=batch)
+                    record_api_success(write_rate)
                     print(f"Added tracks {i + 1} to {i + len(batch)} to YouTube Music playlist.")
                     break
+                except HeaderExpiredError:
+                    raise
                 except Exception as e:
-                    error_str = str(e).lower()
-                    if "401" in error_str or "403" in error_str or "unauthorized" in error_str:
+                    error_kind = record_api_error(write_rate, e)
+                    if error_kind == "auth":
                         print("Detected expired headers during batch add.")
                         raise HeaderExpiredError("Headers expired during batch add", batch_index=batch_num)
-                    if "HTTP 409" in str(e):
+                    if error_kind == "conflict":
                         print(f"Conflict error for tracks {i + 1} to {i + len(batch)}. Skipping...")
                         break
                     else:
                         attempt += 1
-                        print(f"Attempt {attempt} failed for tracks {i + 1} to {i + len(batch)}. Retrying in 5 seconds...")
-                        time.sleep(5)
+                        print(f"Attempt {attempt} failed for tracks {i + 1} to {i + len(batch)}. Retrying at {write_rate.rate:.2f} req/s...")
             else:
                 print(f"Failed to add tracks {i + 1} to {i + len(batch)} after {retry_attempts} attempts.")
 
             if progress_callback:
                 progress_callback(i + len(batch))
 
-            time.sleep(batch_delay)
+            if batch_delay:
+                metrics.sleep("batch_delay", batch_delay)
 
     except HeaderExpiredError as e:
         raise e
@@ -336,36 +894,10 @@ def add_tracks_to_ytm_playlist_with_header_check(
         print(f"Failed to add tracks to playlist ID: {playlist_id}")
         print(e)
 
-def add_tracks_to_ytm_playlist(playlist_id, track_ids, batch_size=10, retry_attempts=3):
-    try:        
-        for i in range(0, len(track_ids), batch_size):
-            batch = track_ids[i:i + batch_size]
-            attempt = 0
-            while attempt < retry_attempts:
-                try:                    
-                    get_ytmusic_client().add_playlist_items(playlistId=playlist_id, videoIds=batch)
-                    print(f"Added tracks {i + 1} to {i + len(batch)} to YouTube Music playlist.")
-                    break  
-                except Exception as e:
-                    if "HTTP 409" in str(e):
-                        print(f"Conflict error for tracks {i + 1} to {i + len(batch)}. Skipping...")
-                        break  
-                    else:
-                        attempt += 1
-                        print(f"Attempt {attempt} failed for tracks {i + 1} to {i + len(batch)}. Retrying in 5 seconds...")
-                        time.sleep(5)  
-            else:
-                print(f"Failed to add tracks {i + 1} to {i + len(batch)} after {retry_attempts} attempts.")
-                        
-            time.sleep(2)
-
-    except Exception as e:
-        print(f"Failed to add tracks to playlist ID: {playlist_id}")
-        print(e)
-
 def get_spotify_followed_artists():
     followed_artists = []
-    results = get_spotify_client().current_user_followed_artists(limit=50)  
+    # Followed artists are paged by cursor, so they can't be fetched in parallel
+    results = get_spotify_client().current_user_followed_artists(limit=SPOTIFY_FOLLOWED_ARTISTS_PAGE_LIMIT)
     while results:
         for artist in results['artists']['items']:
             followed_artists.append(artist['name'])        
@@ -375,19 +907,113 @@ def get_spotify_followed_artists():
             break
     return followed_artists
 
-def subscribe_to_ytm_artists(artist_names):
+ARTIST_SUBSCRIBE_CHUNK_SIZE = 50
+
+def get_ytm_subscribed_artists():
+    names = set()
+    browse_ids = set()
+    try:
+        for artist in get_ytmusic_client().get_library_subscriptions(limit=None) or []:
+            if artist.get('artist'):
+                names.add(normalize_query(artist['artist']))
+            if artist.get('browseId'):
+                browse_ids.add(artist['browseId'])
+    except Exception as e:
+        print(f"Error fetching YouTube Music subscriptions: {e}")
+    return names, browse_ids
+
+def resolve_artist_on_ytm(artist_name):
+    cache = get_search_cache()
+    key = f"artist:{artist_name}"
+    if cache:
+        hit, browse_id = cache.get(key)
+        if hit:
+            return browse_id
+
+    try:
+        search_results = rate_limited_search(artist_name, filter="artists")
+    except Exception as e:
+        if classify_api_error(e) == "auth":
+            raise HeaderExpiredError("Headers expired while searching for artists")
+        print(f"Error searching for artist: {artist_name}")
+        print(e)
+        return None
+
+    candidates = [result for result in search_results or [] if result.get('browseId')]
+    exact = [result for result in candidates if normalize_query(result.get('artist')) == normalize_query(artist_name)]
+    browse_id = (exact or candidates)[0]['browseId'] if candidates else None
+    if cache:
+        cache.put(key, browse_id)
+    return browse_id
+
+def subscribe_to_ytm_artists(artist_names, max_workers=None, chunk_size=ARTIST_SUBSCRIBE_CHUNK_SIZE,
+                             progress_callback=None, dry_run=False, checkpoint=None):
+    failed = []
+    subscribed_names, subscribed_ids = get_ytm_subscribed_artists()
+
+    pending = []
+    seen = set()
+    skipped = 0
     for artist_name in artist_names:
-        try:            
-            search_results = get_ytmusic_client().search(query=artist_name, filter="artists")
-            if search_results:                
-                artist_id = search_results[0]['browseId']                
-                get_ytmusic_client().subscribe_artists([artist_id])
-                print(f"Subscribed to artist: {artist_name} (ID: {artist_id})")
-            else:
-                print(f"No results found for artist: {artist_name}")
-        except Exception as e:
-            print(f"Failed to subscribe to artist: {artist_name}")
-            print(e)
+        key = normalize_query(artist_name)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        if key in subscribed_names:
+            skipped += 1
+        else:
+            pending.append(artist_name)
+
+    to_subscribe = []
+    if pending:
+        # Build the client before fanning out so the workers don't race to initialize it
+        get_ytmusic_client()
+        queued_ids = set()
+        with ThreadPoolExecutor(max_workers=max(1, int(max_workers or get_search_workers()))) as executor:
+            for done, (artist_name, browse_id) in enumerate(
+                zip(pending, executor.map(resolve_artist_on_ytm, pending)), start=1
+            ):
+                if not browse_id:
+                    print(f"No results found for artist: {artist_name}")
+                    failed.append(artist_name)
+                elif browse_id in subscribed_ids or browse_id in queued_ids:
+                    skipped += 1
+                else:
+                    queued_ids.add(browse_id)
+                    to_subscribe.append((artist_name, browse_id))
+                if progress_callback:
+                    progress_callback(done, len(pending), artist_name)
+                if checkpoint:
+                    checkpoint()
+
+    if skipped:
+        print(f"Skipping {skipped} artists already followed on YouTube Music")
+    outcome = {"attempted": len(to_subscribe), "subscribed": 0, "skipped": skipped, "failed": failed}
+    if dry_run:
+        print(f"Would subscribe to {len(to_subscribe)} artists")
+        return outcome
+
+    chunk_size = max(1, int(chunk_size))
+    for start in range(0, len(to_subscribe), chunk_size):
+        chunk = to_subscribe[start:start + chunk_size]
+        if checkpoint:
+            checkpoint()
+        for attempt in range(3):
+            write_rate.acquire()
+            try:
+                get_ytmusic_client().subscribe_artists([browse_id for _, browse_id in chunk])
+            except Exception as e:
+                if record_api_error(write_rate, e) == "auth":
+                    raise HeaderExpiredError("Headers expired while subscribing to artists")
+                print(f"Subscribing to {len(chunk)} artists failed (attempt {attempt + 1}): {e}")
+                continue
+            record_api_success(write_rate)
+            outcome["subscribed"] += len(chunk)
+            print(f"Subscribed to {len(chunk)} artists ({start + len(chunk)}/{len(to_subscribe)})")
+            break
+        else:
+            failed.extend(artist_name for artist_name, _ in chunk)
+    return outcome
 
 def parse_playlist_selection(selection_input, max_playlists):
     selected_indices = set()
@@ -418,7 +1044,8 @@ def parse_playlist_selection(selection_input, max_playlists):
     return sorted(list(selected_indices))
 
 def copy_spotify_to_ytm():
-    if not perform_quota_check():
+    quota_ok, _ = perform_quota_check()
+    if not quota_ok:
         print("\n⚠️ Cannot proceed due to API quota/connection issues.")
         print("Please try again later or check your credentials.")
         return
@@ -430,16 +1057,53 @@ def copy_spotify_to_ytm():
             break
         
         if choice == "1":            
+            reset_ytm_playlist_index()
             spotify_playlists = list_spotify_playlists()
             if not spotify_playlists:
                 return
             copy_all = input("Do you want to copy all playlists? (yes/no): ").strip().lower()
             if copy_all == 'yes':                
+                plans = {}
+                pending_queries = []
+                for playlist in spotify_playlists:
+                    print(f"Checking Spotify playlist: {playlist['name']}")
+                    progress = load_progress(playlist['name'][:150])
+                    plan = plan_playlist_sync(playlist, force=bool(progress))
+                    plans[playlist['id']] = plan
+                    if plan["unchanged"]:
+                        continue
+                    if progress:
+                        pending_queries.extend(plan["tracks"][progress["current_track_index"]:])
+                    else:
+                        pending_queries.extend(plan["added_tracks"])
+
+                try:
+                    with tqdm(desc="Searching unique tracks", unit="track") as search_bar:
+                        def search_progress_callback(done, total, query):
+                            search_bar.total = total
+                            search_bar.update(1)
+
+                        resolved = resolve_tracks_on_ytm(
+                            pending_queries,
+                            max_workers=get_search_workers(),
+                            progress_callback=search_progress_callback
+                        )
+                except HeaderExpiredError:
+                    # Nothing was written yet, so saved progress from earlier runs is still current
+                    print(f"\n🔑 YouTube Music headers have expired!")
+                    print("Please update your headers using the UI and run the script again.")
+                    print("The script will automatically resume from where it left off.")
+                    return
+                print(f"Resolved {len(resolved)} unique tracks for {len(pending_queries)} playlist entries")
+
                 for playlist in spotify_playlists:
                     playlist_name = playlist['name']
                     playlist_id = playlist['id']                    
-                    print(f"Fetching tracks from Spotify playlist: {playlist_name}")
-                    spotify_tracks = get_spotify_playlist_tracks(playlist_id)
+                    plan = plans[playlist_id]
+                    if plan["unchanged"] and not load_progress(playlist_name[:150]):
+                        print(f"{playlist_name} is unchanged since the last sync. Skipping this playlist.")
+                        continue
+                    spotify_tracks = plan["tracks"]
                     if not spotify_tracks:
                         print(f"No tracks found in the playlist: {playlist_name}. Skipping this playlist.")
                         continue
@@ -451,8 +1115,14 @@ def copy_spotify_to_ytm():
                     if not ytm_playlist_id:
                         continue
                     
+                    progress = load_progress(playlist_name)
+                    incremental = bool(plan["state"]) and already_exists and not progress
+
                     existing_video_ids = set()
-                    if already_exists:
+                    if incremental:
+                        print(f"{playlist_name} changed since the last sync: {len(plan['added_tracks'])} new, {len(plan['removed_video_ids'])} removed")
+                        existing_video_ids = synced_video_ids(plan)
+                    elif already_exists:
                         print("Checking for already existing songs in the YouTube Music playlist...")
                         existing_video_ids = get_ytm_playlist_song_video_ids(ytm_playlist_id)
                     
@@ -460,7 +1130,6 @@ def copy_spotify_to_ytm():
                     ytm_video_ids = []
                     not_found_tracks = [] 
 
-                    progress = load_progress(playlist_name)
                     if progress:
                         print(f"📁 Found saved progress for '{playlist_name}'. Resuming...")
                         start_index = progress["current_track_index"]
@@ -472,15 +1141,25 @@ def copy_spotify_to_ytm():
                         current_batch_index = 0
 
                     try:
-                        for idx in range(start_index, len(spotify_tracks)):
-                            track = spotify_tracks[idx]
-                            video_id = search_track_on_ytm(track)
+                        if incremental and plan["removed_video_ids"] and sync_removals_enabled():
+                            try:
+                                removed_count = remove_tracks_from_ytm_playlist(ytm_playlist_id, plan["removed_video_ids"])
+                                print(f"Removed {removed_count} tracks that are no longer in the Spotify playlist")
+                            except HeaderExpiredError:
+                                raise
+                            except Exception as e:
+                                print(f"Failed to remove deleted tracks: {e}")
+
+                        idx = start_index
+                        pending_tracks = plan["added_tracks"] if incremental else spotify_tracks[start_index:]
+                        for track in pending_tracks:
+                            video_id = planned_video_id(plan, track, resolved)
                             if video_id:
                                 if video_id not in existing_video_ids:
                                     ytm_video_ids.append(video_id)
                             else:
-                                not_found_tracks.append(track) 
-                                print(f"Skipping track: {track}")
+                                not_found_tracks.append(track_query(track))
+                                print(f"Skipping track: {track_query(track)}")
 
                         if ytm_video_ids:
                             try:
@@ -510,6 +1189,8 @@ def copy_spotify_to_ytm():
                         else:
                             print(f"No new tracks to add for playlist: {playlist_name}")
                         
+                        if not progress or fill_resolved_from_cache(plan["tracks"], resolved):
+                            save_playlist_sync(plan, ytm_playlist_id, resolved)
                         delete_progress(playlist_name)
                         
                     except HeaderExpiredError:
@@ -540,14 +1221,24 @@ def copy_spotify_to_ytm():
             print("Searching for liked songs on YouTube Music...")
             ytm_video_ids = []
             not_found_tracks = []  
-            for track in tqdm(liked_songs, desc="Processing Liked Songs", unit="track"):
-                video_id = search_track_on_ytm(track)
+            try:
+                with tqdm(total=len(liked_songs), desc="Processing Liked Songs", unit="track") as search_bar:
+                    video_id_results = search_tracks_on_ytm(
+                        liked_songs,
+                        max_workers=get_search_workers(),
+                        progress_callback=lambda done, total, query: search_bar.update(1)
+                    )
+            except HeaderExpiredError:
+                print(f"\n🔑 YouTube Music headers have expired!")
+                print("Please update your headers using the UI and run the script again.")
+                return
+            for track, video_id in zip(liked_songs, video_id_results):
                 if video_id:
                     if video_id not in existing_video_ids:
                         ytm_video_ids.append(video_id)
                 else:
-                    not_found_tracks.append(track) 
-                    print(f"Skipping track: {track}")
+                    not_found_tracks.append(track_query(track))
+                    print(f"Skipping track: {track_query(track)}")
             
             if ytm_video_ids:
                 print(f"\nAdding {len(ytm_video_ids)} liked songs to YouTube Music with verification...")
@@ -567,109 +1258,111 @@ def copy_spotify_to_ytm():
                 print("No followed artists found on Spotify.")
                 return
             print("Subscribing to artists on YouTube Music...")
-            subscribe_to_ytm_artists(followed_artists)
-            print("Finished subscribing to artists.")
+            outcome = subscribe_to_ytm_artists(followed_artists)
+            print(f"Finished subscribing to artists: {outcome['subscribed']} subscribed, "
+                  f"{outcome['skipped']} already followed, {len(outcome['failed'])} failed.")
 
-def verify_batch_added(playlist_id, expected_video_ids, max_retries=3):
-    for attempt in range(max_retries):
-        try:
-            current_playlist_ids = get_ytm_playlist_song_video_ids(playlist_id)
-            missing_ids = [vid for vid in expected_video_ids if vid not in current_playlist_ids]
-            
-            if not missing_ids:
-                return True, []
-            else:
-                print(f"Verification attempt {attempt + 1}: {len(missing_ids)} tracks missing")
-                if attempt < max_retries - 1:
-                    time.sleep(3)
-                
-        except Exception as e:
-            print(f"Verification attempt {attempt + 1} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(3)
-    
-    try:
-        current_playlist_ids = get_ytm_playlist_song_video_ids(playlist_id)
+def acknowledged_video_ids(response):
+    if not isinstance(response, dict) or 'playlistEditResults' not in response:
+        return None
+    acknowledged = set()
+    for result in response.get('playlistEditResults') or []:
+        if not isinstance(result, dict):
+            continue
+        result = result.get('playlistEditVideoAddedResultData', result)
+        if result.get('videoId'):
+            acknowledged.add(result['videoId'])
+    return acknowledged
+
+def reconcile_playlist_tracks(playlist_id, expected_video_ids, retry_attempts=3, batch_size=10, max_settle_wait=30):
+    missing_ids = list(expected_video_ids)
+    for round_num in range(retry_attempts):
+        sent_ids = missing_ids
+        current_playlist_ids = wait_for_playlist_tracks(playlist_id, missing_ids, max_wait=max_settle_wait)
         missing_ids = [vid for vid in expected_video_ids if vid not in current_playlist_ids]
-        return len(missing_ids) == 0, missing_ids
-    except:
-        return False, expected_video_ids
+        # Adds are acknowledged even when YouTube Music drops them, so the pacing learns about drops here
+        write_rate.record_delivery(len(sent_ids), len([vid for vid in sent_ids if vid not in current_playlist_ids]))
+        if not missing_ids or round_num == retry_attempts - 1:
+            break
+
+        print(f"🔄 Reconciliation round {round_num + 1}: re-adding {len(missing_ids)} missing tracks...")
+        for i in range(0, len(missing_ids), batch_size):
+            batch = missing_ids[i:i + batch_size]
+            try:
+                write_rate.acquire()
+                get_ytmusic_client().add_playlist_items(playlistId=playlist_id, videoIds=batch)
+                record_api_success(write_rate, sent=len(batch))
+            except Exception as e:
+                error_kind = record_api_error(write_rate, e)
+                if error_kind == "auth":
+                    raise HeaderExpiredError("Headers expired during reconciliation")
+                if error_kind != "conflict":
+                    print(f"Re-add failed: {e}")
+    return missing_ids
 
 def add_tracks_to_ytm_playlist_with_verification(playlist_id, track_ids, batch_size=10, retry_attempts=3):
     if not track_ids:
         return
         
-    total_added = 0
-    failed_tracks = []
+    expected_ids = list(dict.fromkeys(track_ids))
     
     try:        
-        for i in range(0, len(track_ids), batch_size):
-            batch = track_ids[i:i + batch_size]
+        for i in range(0, len(expected_ids), batch_size):
+            batch = expected_ids[i:i + batch_size]
             batch_attempt = 0
             current_batch = batch.copy()
             
             while batch_attempt < retry_attempts and current_batch:
                 try:
-                    if not test_ytmusic_connection():
-                        raise HeaderExpiredError("Headers expired")
+                    if not headers_still_valid():
+                        raise HeaderExpiredError("Headers expired", batch_index=i // batch_size, track_index=i)
                     
                     print(f"Adding batch {i//batch_size + 1}: {len(current_batch)} tracks (attempt {batch_attempt + 1})")
-                    get_ytmusic_client().add_playlist_items(playlistId=playlist_id, videoIds=current_batch)
-                    
-                    time.sleep(3)
+                    write_rate.acquire()
+                    response = get_ytmusic_client().add_playlist_items(playlistId=playlist_id, videoIds=current_batch)
                     
-                    verification_success, missing_ids = verify_batch_added(playlist_id, current_batch)
-                    
-                    if verification_success:
-                        print(f"✅ Batch {i//batch_size + 1}: All {len(current_batch)} tracks added successfully")
-                        total_added += len(current_batch)
+                    acknowledged = acknowledged_video_ids(response)
+                    if acknowledged is None:
+                        record_api_success(write_rate, sent=len(current_batch))
                         break
-                    else:
-                        added_count = len(current_batch) - len(missing_ids)
-                        total_added += added_count
-                        print(f"⚠️ Batch {i//batch_size + 1}: {added_count}/{len(current_batch)} tracks added, {len(missing_ids)} missing")
-                        
-                        if batch_attempt < retry_attempts - 1:
-                            current_batch = missing_ids
-                            print(f"🔄 Retrying {len(missing_ids)} missing tracks...")
-                            time.sleep(5)
-                        else:
-                            print(f"❌ Failed to add {len(missing_ids)} tracks after {retry_attempts} attempts")
-                            failed_tracks.extend(missing_ids)
+                    dropped_ids = [vid for vid in current_batch if vid not in acknowledged]
+                    if not dropped_ids:
+                        record_api_success(write_rate, sent=len(current_batch))
+                        print(f"✅ Batch {i//batch_size + 1}: All {len(current_batch)} tracks acknowledged")
+                        break
+
+                    record_api_success(write_rate, sent=len(current_batch), dropped=len(dropped_ids))
+                    print(f"⚠️ Batch {i//batch_size + 1}: {len(current_batch) - len(dropped_ids)}/{len(current_batch)} tracks acknowledged, {len(dropped_ids)} dropped")
+                    current_batch = dropped_ids
+                    if batch_attempt < retry_attempts - 1:
+                        print(f"🔄 Retrying {len(dropped_ids)} dropped tracks...")
                     
                 except HeaderExpiredError:
                     raise
                 except Exception as e:
-                    if "HTTP 409" in str(e):
-                        print(f"Conflict error for batch {i//batch_size + 1}. Checking which tracks were added...")
-                        verification_success, missing_ids = verify_batch_added(playlist_id, current_batch)
-                        added_count = len(current_batch) - len(missing_ids)
-                        total_added += added_count
-                        if missing_ids and batch_attempt < retry_attempts - 1:
-                            current_batch = missing_ids
-                            print(f"🔄 Retrying {len(missing_ids)} tracks that weren't added...")
-                        else:
-                            failed_tracks.extend(missing_ids)
+                    error_kind = record_api_error(write_rate, e)
+                    if error_kind == "auth":
+                        raise HeaderExpiredError("Headers expired during batch add", batch_index=i // batch_size, track_index=i)
+                    if error_kind == "conflict":
+                        print(f"Conflict error for batch {i//batch_size + 1}. Leaving it to the final reconciliation...")
                         break
+                    if batch_attempt < retry_attempts - 1:
+                        print(f"Batch attempt {batch_attempt + 1} failed: {e}. Retrying at {write_rate.rate:.2f} req/s...")
                     else:
-                        batch_attempt += 1
-                        if batch_attempt < retry_attempts:
-                            print(f"Batch attempt {batch_attempt} failed: {e}. Retrying in 5 seconds...")
-                            time.sleep(5)
-                        else:
-                            print(f"❌ Batch failed after {retry_attempts} attempts: {e}")
-                            failed_tracks.extend(current_batch)
+                        print(f"❌ Batch failed after {retry_attempts} attempts: {e}")
                 
                 batch_attempt += 1
-            
-            time.sleep(2)
+
+        print("🔍 Reconciling playlist contents...")
+        failed_tracks = reconcile_playlist_tracks(playlist_id, expected_ids, retry_attempts=retry_attempts, batch_size=batch_size)
+        total_added = len(expected_ids) - len(failed_tracks)
 
         print(f"\n📊 Final Results:")
-        print(f"   • Successfully added: {total_added}/{len(track_ids)} tracks")
+        print(f"   • Successfully added: {total_added}/{len(expected_ids)} tracks")
         print(f"   • Failed to add: {len(failed_tracks)} tracks")
         
         if failed_tracks:
-            print(f"   • Success rate: {(total_added/len(track_ids)*100):.1f}%")
+            print(f"   • Success rate: {(total_added/len(expected_ids)*100):.1f}%")
         else:
             print(f"   • Success rate: 100%")
 
@@ -700,7 +1393,7 @@ def check_api_quota():
             except: pass
             return False, f"Failed to add test song: {e}"
 
-        time.sleep(2)
+        metrics.sleep("quota_probe", 2)
         playlist = ytmusic.get_playlist(test_playlist_id)
         found = False
         for track in playlist.get('tracks', []):
@@ -747,7 +1440,7 @@ def check_spotify_quota():
 
 def verify_playlist_actually_updated(playlist_id, expected_minimum_tracks):
     try:
-        time.sleep(3)
+        metrics.sleep("verify_settle", 3)
         
         actual_tracks = get_ytm_playlist_song_video_ids(playlist_id)
         actual_count = len(actual_tracks)
@@ -784,17 +1477,80 @@ def detect_quota_exhaustion(playlist_id, video_ids_added):
         print(f"Error detecting quota exhaustion: {e}")
         return False
 
-def perform_quota_check():
+def check_spotify_quota_cached():
+    global _spotify_check
+    now = time.time()
+    if _spotify_check and now - _spotify_check[0] < api_health.ttl_seconds:
+        return _spotify_check[1]
+    result = check_spotify_quota()
+    _spotify_check = (now, result) if result[0] else None
+    return result
+
+def probe_ytmusic_headers():
+    # Only an actual response proves the headers work; errors never count as "ok" here
+    client = get_ytmusic_client()
+    if client is None:
+        return {"status": "auth", "reason": "YouTube Music client not initialized - check headers"}
+    try:
+        if client.get_library_playlists(limit=1) is None:
+            return {"status": "auth", "reason": "YouTube Music rejected the headers"}
+    except Exception as e:
+        if classify_api_error(e) == "auth":
+            return {"status": "auth", "reason": "YouTube Music rejected the headers"}
+        return {"status": "unknown", "reason": f"Could not reach YouTube Music: {e}"}
+    mark_ytmusic_authenticated()
+    return {"status": "ok", "reason": "Headers accepted; no recent write outcomes to judge quota from"}
+
+def check_ytmusic_health(force=False):
+    global last_quota_status
+    if get_ytmusic_client() is None:
+        last_quota_status = "auth"
+        return False, "YouTube Music client not initialized - check headers"
+    health = api_health.check(force=force)
+    if health["status"] == "unknown":
+        # Nothing recent to judge from: one read call confirms the headers without spending write quota
+        if time.monotonic() - _last_ytmusic_auth_success < header_probe_interval:
+            health = {"status": "ok", "reason": "Headers accepted; no recent write outcomes to judge quota from"}
+        else:
+            health = probe_ytmusic_headers()
+        if health["status"] == "ok":
+            health = api_health.remember(health["status"], health["reason"])
+        # Failures are not cached: the next check after updating the headers should probe again
+    last_quota_status = health["status"]
+
+    if health["status"] == "ok":
+        return True, f"API healthy ({health['reason']})"
+    elif health["status"] == "degraded":
+        return True, f"⚠️ API under pressure, transfers will be paced down ({health['reason']})"
+    elif health["status"] == "exhausted":
+        return False, f"Quota likely exhausted - {health['reason']}. Try again later."
+    elif health["status"] == "unknown":
+        return False, health["reason"]
+    else:
+        return False, f"{health['reason']} - headers may be expired"
+
+def perform_quota_check(probe=False):
+    global last_quota_status
     print("🔍 Checking API quotas...")
     
-    spotify_ok, spotify_msg = check_spotify_quota()
+    spotify_ok, spotify_msg = check_spotify_quota_cached()
     if spotify_ok:
         print(f"✅ Spotify: {spotify_msg}")
     else:
         print(f"❌ Spotify: {spotify_msg}")
+        last_quota_status = "spotify"
         return False, f"Spotify: {spotify_msg}"
     
-    ytm_ok, ytm_msg = check_api_quota()
+    if probe:
+        ytm_ok, ytm_msg = check_api_quota()
+        if ytm_ok:
+            last_quota_status = api_health.remember("ok", "Write probe succeeded", headroom=1.0)["status"]
+        elif "track count is 0" in ytm_msg.lower():
+            last_quota_status = "degraded"
+        else:
+            last_quota_status = api_health.remember("exhausted", ytm_msg, headroom=0.0)["status"]
+    else:
+        ytm_ok, ytm_msg = check_ytmusic_health()
     if ytm_ok:
         print(f"✅ YouTube Music: {ytm_msg}")
         return True, f"Spotify: {spotify_msg}\nYouTube Music: {ytm_msg}"
@@ -802,94 +1558,571 @@ def perform_quota_check():
         print(f"❌ YouTube Music: {ytm_msg}")
         return False, f"Spotify: {spotify_msg}\nYouTube Music: {ytm_msg}"
 
-def add_tracks_with_delayed_verification(
-    playlist_id, track_ids, batch_size=5, retry_attempts=3, 
-    batch_delay=5, verification_delay=30, progress_callback=None,
-    start_batch_index=0  
-):
-    
-    successfully_added = []
-    failed_batches = []
-    
-    try:
-        total_batches = (len(track_ids) + batch_size - 1) // batch_size
-        
-        for i in range(start_batch_index * batch_size, len(track_ids), batch_size):
-            batch = track_ids[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            current_batch_index = i // batch_size  
-            
-            attempt = 0
-            while attempt < retry_attempts:
-                try:
-                    if not test_ytmusic_connection():
-                        raise HeaderExpiredError("Headers expired", batch_index=current_batch_index)
-                    
+class PlaylistBatchWriter:
+    def __init__(self, playlist_id, batch_size=5, retry_attempts=3, batch_delay=None,
+                 progress_callback=None, start_batch_index=0, start_track_index=0,
+                 total_tracks=None, auto_batch=False, batch_callback=None):
+        self.playlist_id = playlist_id
+        self.batch_size = batch_size
+        self.retry_attempts = retry_attempts
+        self.batch_delay = batch_delay
+        self.progress_callback = progress_callback
+        self.batch_callback = batch_callback
+        self.batch_index = start_batch_index
+        self.track_index = start_track_index
+        self.total_tracks = total_tracks
+        self.successfully_added = []
+        self.failed_batches = []
+        self.pending = []
+        self.sizer = None
+        self.account_key = None
+        self.batch_observer = None
+        # Acked batches wait one check interval to show up (settling), then are judged at the next check (checking)
+        self._settling = []
+        self._checking = []
+        self._written = 0
+        self._next_delivery_check = DELIVERY_CHECK_START
+        if auto_batch:
+            self.account_key = get_account_key()
+            saved_size = load_saved_batch_size(self.account_key)
+            initial = batch_size
+            if saved_size:
+                # Drift back toward the chosen size so one bad run doesn't pin later runs to tiny batches
+                initial = round(saved_size + (batch_size - saved_size) * SAVED_BATCH_SIZE_DECAY)
+            self.sizer = AdaptiveBatchSizer(initial=initial)
+            print(f"🤖 Auto batch size: starting at {self.sizer.size} tracks per batch")
+
+    @property
+    def current_size(self):
+        return self.sizer.size if self.sizer else self.batch_size
+
+    def add(self, video_ids):
+        self.pending.extend(video_ids)
+        while len(self.pending) >= self.current_size:
+            self._write_next_batch()
+
+    def flush(self):
+        while self.pending:
+            self._write_next_batch()
+
+    def _write_next_batch(self):
+        batch = self.pending[:self.current_size]
+        batch_num = self.batch_index + 1
+        started = time.perf_counter()
+
+        attempt = 0
+        while attempt < self.retry_attempts:
+            try:
+                if not headers_still_valid():
+                    raise HeaderExpiredError("Headers expired", batch_index=self.batch_index, track_index=self.track_index)
+
+                if self.sizer or self.total_tracks is None:
+                    print(f"Adding batch {batch_num}: {len(batch)} tracks ({self.track_index + len(batch)} queued so far)")
+                else:
+                    total_batches = (self.total_tracks + self.batch_size - 1) // self.batch_size
                     print(f"Adding batch {batch_num}/{total_batches}: {len(batch)} tracks")
-                    get_ytmusic_client().add_playlist_items(playlistId=playlist_id, videoIds=batch)
-                    successfully_added.extend(batch)
+                write_rate.acquire()
+                response = get_ytmusic_client().add_playlist_items(playlistId=self.playlist_id, videoIds=batch)
+                acknowledged = acknowledged_video_ids(response)
+                dropped = len([vid for vid in batch if vid not in acknowledged]) if acknowledged is not None else 0
+                record_api_success(write_rate, sent=len(batch), dropped=dropped)
+                if self.sizer:
+                    # Drops the ack reports can shrink the batch; growing waits for the delivery checks
+                    self.sizer.record_loss(dropped / len(batch))
+                self.successfully_added.extend(batch)
+                self._settling.append(batch if acknowledged is None else [vid for vid in batch if vid in acknowledged])
+                break
+
+            except HeaderExpiredError:
+                raise
+            except Exception as e:
+                error_kind = record_api_error(write_rate, e)
+                if error_kind == "auth":
+                    raise HeaderExpiredError("Headers expired", batch_index=self.batch_index, track_index=self.track_index)
+                elif error_kind == "conflict":
+                    print(f"Conflict error for batch {batch_num}. Assuming success...")
+                    self.successfully_added.extend(batch)
+                    self._settling.append(batch)
                     break
-                    
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if "401" in error_str or "403" in error_str or "unauthorized" in error_str:
-                        raise HeaderExpiredError("Headers expired", batch_index=current_batch_index)
-                    elif "HTTP 409" in str(e):
-                        print(f"Conflict error for batch {batch_num}. Assuming success...")
-                        successfully_added.extend(batch)
-                        break
-                    else:
-                        attempt += 1
-                        print(f"Batch {batch_num} attempt {attempt} failed: {e}")
-                        if attempt < retry_attempts:
-                            time.sleep(batch_delay * attempt)
-            else:
-                print(f"❌ Batch {batch_num} failed after all attempts")
-                failed_batches.append(batch)
-            
-            if progress_callback:
-                progress_callback(len(successfully_added))
-            
-            time.sleep(batch_delay)
-        
-        if start_batch_index > 0:
-            try:
-                progress_file = f"progress_{playlist_id.replace(' ', '_').replace('/', '_')}.json"
-                if os.path.exists(progress_file):
-                    with open(progress_file, "r", encoding="utf-8") as f:
-                        progress_data = json.load(f)
-                    all_track_ids = progress_data.get("ytm_video_ids", track_ids)
                 else:
-                    all_track_ids = track_ids
-            except Exception:
-                all_track_ids = track_ids
+                    attempt += 1
+                    print(f"Batch {batch_num} attempt {attempt} failed: {e}")
+                    if self.sizer:
+                        self.sizer.shrink()
+                    if self.batch_delay and attempt < self.retry_attempts:
+                        metrics.sleep("retry_backoff", self.batch_delay * attempt)
         else:
-            all_track_ids = track_ids.copy()
+            print(f"❌ Batch {batch_num} failed after all attempts")
+            self.failed_batches.append(batch)
+
+        if self.batch_observer:
+            self.batch_observer(batch, started, time.perf_counter())
+        if self.progress_callback:
+            self.progress_callback(len(self.successfully_added))
+
+        del self.pending[:len(batch)]
+        self.track_index += len(batch)
+        self.batch_index += 1
+        if self.batch_callback:
+            self.batch_callback(self.batch_index, self.track_index)
+
+        self._written += len(batch)
+        if self._written >= self._next_delivery_check:
+            self._check_delivery()
+
+        if self.batch_delay:
+            metrics.sleep("batch_delay", self.batch_delay)
+
+    def _check_delivery(self):
+        # Doubling the interval keeps the playlist reads linear in the number of tracks written
+        self._next_delivery_check = self._written * 2
+        if self._checking:
+            try:
+                present = fetch_ytm_playlist_video_ids(self.playlist_id)
+            except Exception as e:
+                print(f"Skipping delivery check: {e}")
+                present = None
+            if present is not None:
+                sent, missing = self._record_delivery(self._checking, present)
+                if missing:
+                    print(f"⚠️ {missing}/{sent} added tracks did not show up in the playlist")
+                self._checking = []
+        self._checking.extend(self._settling)
+        self._settling = []
+
+    def _record_delivery(self, batches, present):
+        # add_playlist_items acks silently dropped tracks too, so only the playlist itself shows what landed
+        video_ids = [vid for batch in batches for vid in batch]
+        missing = len([vid for vid in video_ids if vid not in present])
+        write_rate.record_delivery(len(video_ids), missing)
+        if self.sizer:
+            self.sizer.record(len(video_ids), missing, batches=len(batches))
+        return len(video_ids), missing
+
+    def verify(self, all_track_ids, verification_delay=30, resumed=False):
+        all_track_ids = list(all_track_ids)
+        if not (self.successfully_added or resumed):
+            return self.successfully_added, self.failed_batches
+
+        print(f"\n⏳ Waiting up to {verification_delay}s for YouTube Music to settle before final verification...")
+        final_tracks = wait_for_playlist_tracks(self.playlist_id, all_track_ids, max_wait=verification_delay)
+
+        print("🔍 Performing final verification...")
+        actually_added = [vid for vid in all_track_ids if vid in final_tracks]
+        if self._checking or self._settling:
+            self._record_delivery(self._checking + self._settling, final_tracks)
+            self._checking = []
+            self._settling = []
+
+        print(f"📊 Final Results:")
+        print(f"   Attempted: {len(all_track_ids)} tracks")
+        print(f"   Verified: {len(actually_added)} tracks")
+        print(f"   Missing: {len(all_track_ids) - len(actually_added)} tracks")
+        print(f"   Success Rate: {(len(actually_added)/len(all_track_ids)*100):.1f}%")
+
+        return actually_added, self.failed_batches
+
+    def close(self):
+        if self.sizer:
+            save_batch_size(self.account_key, self.sizer.size)
+            print(f"🤖 Auto batch size settled at {self.sizer.size} tracks per batch")
+
+def _put_unless_stopped(out_queue, item, stop_event):
+    while not stop_event.is_set():
+        try:
+            out_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _pipeline_search(track, trace_scope=None):
+    if not (trace_scope and tracer.enabled):
+        return search_track_on_ytm(track)
+    start = tracer.now()
+    video_id = search_track_on_ytm(track)
+    tracer.track_phase(trace_scope, track_key(track), "search", start, tracer.now(), found=bool(video_id))
+    return video_id
+
+def _submit_search(executor, resolved, key, track, trace_scope=None):
+    if not isinstance(resolved, SharedResolutions):
+        return executor.submit(profiler.profiled(_pipeline_search), track, trace_scope), True
+    future, owned = resolved.claim(key)
+    if owned:
+        search = executor.submit(profiler.profiled(_pipeline_search), track, trace_scope)
+        search.add_done_callback(lambda search: resolved.publish(key, future, search))
+        return search, True
+    return future, False
+
+def _search_producer(tracks, resolved, max_workers, out_queue, stop_event, progress_callback=None, trace_scope=None):
+    # Keep a bounded window of searches in flight and emit results in playlist order
+    window = max(1, int(max_workers)) * 4
+    in_flight = {}
+    owned = set()
+    ordered = deque()
+    done = 0
+
+    def emit_until(limit):
+        nonlocal done
+        while len(ordered) > limit:
+            track, key = ordered.popleft()
+            if key in in_flight:
+                future = in_flight.pop(key)
+                owned.discard(future)
+                try:
+                    resolved[key] = future.result()
+                except CancelledError:
+                    # The transfer that owned this search stopped before running it
+                    resolved[key] = _pipeline_search(track, trace_scope)
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(tracks), track)
+            if not _put_unless_stopped(out_queue, (track, resolved[key]), stop_event):
+                return False
+        return True
 
-        if successfully_added or start_batch_index > 0:
-            print(f"\n⏳ Waiting {verification_delay}s before final verification...")
-            time.sleep(verification_delay)
+    with profiler.profile_thread(), profiler.phase("search"):
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+                try:
+                    for track in tracks:
+                        key = track_key(track)
+                        if key not in resolved and key not in in_flight:
+                            future, is_owner = _submit_search(executor, resolved, key, track, trace_scope)
+                            if future is not None:
+                                in_flight[key] = future
+                                if is_owner:
+                                    owned.add(future)
+                        ordered.append((track, key))
+                        if not emit_until(window):
+                            return
+                    if not emit_until(0):
+                        return
+                finally:
+                    # Searches other transfers are waiting on stay theirs to finish or cancel
+                    for future in owned:
+                        future.cancel()
+            flush_search_cache()
+            _put_unless_stopped(out_queue, _PIPELINE_DONE, stop_event)
+        except Exception as e:
+            _put_unless_stopped(out_queue, e, stop_event)
 
-            print("🔍 Performing final verification...")
-            final_tracks = get_ytm_playlist_song_video_ids(playlist_id)
-            actually_added = [vid for vid in all_track_ids if vid in final_tracks]
+def stream_tracks_to_ytm_playlist(
+    playlist_id, tracks, video_ids=None, not_found_tracks=None, existing_video_ids=None,
+    resolved=None, batch_size=5, retry_attempts=3, verification_delay=30, start_track_index=0,
+    auto_batch=False, max_workers=8, queue_size=PIPELINE_QUEUE_SIZE,
+    search_progress_callback=None, progress_callback=None, journal=None, checkpoint=None, trace_scope=None
+):
+    video_ids = [] if video_ids is None else video_ids
+    not_found_tracks = [] if not_found_tracks is None else not_found_tracks
+    existing_video_ids = existing_video_ids or set()
+    resolved = {} if resolved is None else resolved
+
+    writer = PlaylistBatchWriter(
+        playlist_id, batch_size=batch_size, retry_attempts=retry_attempts,
+        progress_callback=progress_callback, start_batch_index=start_track_index // max(1, batch_size),
+        start_track_index=start_track_index, auto_batch=auto_batch,
+        batch_callback=journal.batch_written if journal else None
+    )
+    results = queue.Queue(maxsize=max(1, queue_size))
+    stop_event = threading.Event()
+    producer = threading.Thread(
+        target=_search_producer,
+        args=(tracks, resolved, max_workers, results, stop_event, search_progress_callback, trace_scope),
+        daemon=True
+    )
+    searched = 0
+
+    tracing = bool(trace_scope) and tracer.enabled
+    stream_started = tracer.now()
+    queued_at = {}
+    written = {}
+    if tracing:
+        def observe_batch(batch, started, finished):
+            for video_id in batch:
+                entry = queued_at.pop(video_id, None)
+                if entry:
+                    key, ready = entry
+                    tracer.track_phase(trace_scope, key, "batch_wait", ready, started)
+                    tracer.track_phase(trace_scope, key, "add_playlist_items", started, finished, batch_size=len(batch))
+                    written[video_id] = key
+
+        writer.batch_observer = observe_batch
+
+    write_phase = profiler.start_phase("write")
+    try:
+        # Tracks resolved by an earlier run go straight to the writer
+        writer.add(video_ids[start_track_index:])
+
+        if tracks:
+            # Build the client before fanning out so the workers don't race to initialize it
+            get_ytmusic_client()
+            producer.start()
+            while True:
+                item = results.get()
+                if item is _PIPELINE_DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if checkpoint:
+                    checkpoint()
+                track, video_id = item
+                searched += 1
+                if video_id and video_id not in existing_video_ids:
+                    video_ids.append(video_id)
+                    if tracing:
+                        queued_at[video_id] = (track_key(track), tracer.now())
+                    if journal:
+                        journal.track_resolved(searched, video_id=video_id)
+                    writer.add([video_id])
+                elif not video_id:
+                    not_found_tracks.append(track_query(track))
+                    if journal:
+                        journal.track_resolved(searched, missing_query=track_query(track))
+                elif journal:
+                    journal.track_resolved(searched)
+
+        if checkpoint:
+            checkpoint()
+        writer.flush()
+        profiler.end_phase(write_phase)
+        write_phase = None
+        verify_started = tracer.now()
+        with profiler.phase("verify"):
+            actually_added, failed_batches = writer.verify(video_ids, verification_delay=verification_delay, resumed=start_track_index > 0)
+        if written:
+            verified = set(actually_added)
+            verify_finished = tracer.now()
+            for video_id, key in written.items():
+                tracer.track_phase(trace_scope, key, "verify", verify_started, verify_finished, verified=video_id in verified)
+        return actually_added, failed_batches
+
+    except (HeaderExpiredError, TransferCancelled) as e:
+        e.search_index = searched
+        if e.track_index is None:
+            # Raised outside a write (a search, or a cancel); resume after the last written batch
+            e.batch_index = writer.batch_index
+            e.track_index = writer.track_index
+        raise e
+    except Exception as e:
+        print(f"Error in streaming transfer: {e}")
+        return writer.successfully_added, writer.failed_batches
+    finally:
+        stop_event.set()
+        if producer.is_alive():
+            producer.join()
+        writer.close()
+        profiler.end_phase(write_phase)
+        if tracing:
+            tracer.complete("transfer", stream_started, tracer.now(), "transfer", playlist=trace_scope, tracks=len(tracks))
+
+def report_transfer_result(label, actually_added, total, failed_batches, target="", log=print):
+    if len(actually_added) == total:
+        log(f"✅ Perfect success! All {len(actually_added)} {label} added{target}")
+    elif len(actually_added) > 0:
+        success_rate = (len(actually_added) / total) * 100
+        log(f"⚠️ Partial success: {len(actually_added)}/{total} {label} added ({success_rate:.1f}%)")
+        log(f"   Missing {total - len(actually_added)} tracks may appear later due to YouTube Music delays")
+    else:
+        log(f"❌ No {label} were successfully added{target}")
+
+    if failed_batches:
+        failed_count = sum(len(batch) for batch in failed_batches)
+        log(f"⚠️ {failed_count} tracks failed during batch adding (network/API issues)")
+
+def _dry_run_transfer(playlist_name, tracks, plan, max_workers, result, log):
+    existing_playlist = get_ytm_playlist_by_name(playlist_name)
+    incremental = bool(plan and plan["state"]) and existing_playlist is not None
+    pending_tracks = plan["added_tracks"] if incremental else tracks
+
+    existing_video_ids = set()
+    if incremental:
+        existing_video_ids = synced_video_ids(plan)
+        result["removed"] = len(plan["removed_video_ids"])
+    elif existing_playlist:
+        existing_video_ids = get_ytm_playlist_song_video_ids(existing_playlist['playlistId'])
+
+    video_ids = search_tracks_on_ytm(pending_tracks, max_workers=max_workers)
+    would_add = [video_id for video_id in video_ids if video_id and video_id not in existing_video_ids]
+    result["status"] = "dry_run"
+    result["attempted"] = len(would_add)
+    result["not_found"] = [track_query(track) for track, video_id in zip(pending_tracks, video_ids) if not video_id]
+    log(f"🧪 Dry run for {playlist_name}: {len(would_add)} tracks would be added, "
+        f"{result['removed']} removed, {len(result['not_found'])} not found")
+    return result
+
+def transfer_tracks_to_ytm(
+    playlist_name, tracks, operation_type="playlist", plan=None, batch_size=5, auto_batch=False,
+    max_workers=8, resolved=None, dry_run=False, verification_delay=30, config_data=None,
+    log=print, search_progress_callback=None, progress_callback=None, checkpoint=None
+):
+    result = {
+        "name": playlist_name,
+        "operation_type": operation_type,
+        "status": "ok",
+        "attempted": 0,
+        "added": 0,
+        "failed": 0,
+        "removed": 0,
+        "not_found": []
+    }
+    resolved = {} if resolved is None else resolved
+    label = "liked songs" if operation_type == "liked_songs" else "tracks"
+    # Matches the scope the Spotify fetch used, so each track's phases share one trace lane
+    if plan:
+        trace_scope = plan["playlist"]['id']
+    else:
+        trace_scope = LIKED_SONGS_TRACE_SCOPE if operation_type == "liked_songs" else playlist_name
+    target = f" to: {playlist_name}" if operation_type == "playlist" else ""
+
+    progress = None if dry_run else load_progress(playlist_name)
+    if progress:
+        log(f"📁 Found saved progress for '{playlist_name}'. Resuming...")
+        start_index = progress.get("current_track_index", 0)
+        ytm_video_ids = progress["ytm_video_ids"]
+        not_found_tracks = progress["not_found_tracks"]
+        current_batch_index = progress.get("current_batch_index", 0)
+        
+        if current_batch_index is None:
+            current_batch_index = 0
+            log(f"⚠️ Batch index was null, starting from beginning of batching phase")
+        start_offset = progress.get("current_track_offset")
+        if start_offset is None:
+            start_offset = current_batch_index * batch_size
+    else:
+        if plan and plan["unchanged"]:
+            log(f"⏭️ {playlist_name} is unchanged since the last sync, skipping")
+            result["status"] = "skipped"
+            return result
+        if not tracks:
+            log(f"⚠️ No tracks found in: {playlist_name}")
+            result["status"] = "empty"
+            return result
+        log(f"🎵 Processing: {playlist_name}")
+        start_index = 0
+        ytm_video_ids = []
+        not_found_tracks = []
+        current_batch_index = 0
+        start_offset = 0
+
+    if dry_run:
+        return _dry_run_transfer(playlist_name, tracks, plan, max_workers, result, log)
+
+    ytm_playlist_id, already_exists = create_or_get_ytm_playlist(playlist_name)
+    if not ytm_playlist_id:
+        log(f"❌ Failed to create playlist: {playlist_name}")
+        result["status"] = "failed"
+        return result
+
+    incremental = bool(plan and plan["state"]) and already_exists and not progress
+    if progress:
+        pending_tracks = tracks[start_index:]
+    else:
+        pending_tracks = plan["added_tracks"] if incremental else tracks
 
-            print(f"📊 Final Results:")
-            print(f"   Attempted: {len(all_track_ids)} tracks")
-            print(f"   Verified: {len(actually_added)} tracks")
-            print(f"   Missing: {len(all_track_ids) - len(actually_added)} tracks")
-            print(f"   Success Rate: {(len(actually_added)/len(all_track_ids)*100):.1f}%")
+    existing_video_ids = set()
+    missing_video_ids = set()
+    if incremental:
+        log(f"🔁 {playlist_name} changed since the last sync: {len(plan['added_tracks'])} new, {len(plan['removed_video_ids'])} removed")
+        existing_video_ids = synced_video_ids(plan)
+    elif already_exists and pending_tracks:
+        log(f"📋 Playlist exists, checking for new songs...")
+        existing_video_ids = get_ytm_playlist_song_video_ids(ytm_playlist_id)
 
-            return actually_added, failed_batches
+    try:
+        if incremental and plan["removed_video_ids"] and sync_removals_enabled(config_data):
+            try:
+                result["removed"] = remove_tracks_from_ytm_playlist(ytm_playlist_id, plan["removed_video_ids"])
+                log(f"🗑️ Removed {result['removed']} tracks that are no longer in the Spotify playlist")
+            except HeaderExpiredError:
+                raise
+            except Exception as e:
+                log(f"⚠️ Failed to remove deleted tracks: {e}")
 
-        return successfully_added, failed_batches
-        
-        
-    except HeaderExpiredError as e:
-        raise e
-    except Exception as e:
-        print(f"Error in delayed verification method: {e}")
-        return successfully_added, failed_batches
+        if progress and start_offset < len(ytm_video_ids):
+            log(f"📤 Resuming: Adding remaining {label} from batch {current_batch_index + 1}...")
+        if pending_tracks:
+            log(f"🔎 Searching {len(pending_tracks)} {label} and adding them as they resolve (batch size {batch_size})...")
+        else:
+            log(f"⚙️ Using batch size: {batch_size} tracks per batch")
+
+        journal = begin_transfer(
+            playlist_name, operation_type, tracks, pending_tracks, ytm_video_ids, not_found_tracks,
+            current_batch_index=current_batch_index, current_track_offset=start_offset
+        )
+        try:
+            actually_added, failed_batches = stream_tracks_to_ytm_playlist(
+                ytm_playlist_id,
+                pending_tracks,
+                video_ids=ytm_video_ids,
+                not_found_tracks=not_found_tracks,
+                existing_video_ids=existing_video_ids,
+                resolved=resolved,
+                batch_size=batch_size,
+                verification_delay=verification_delay,
+                start_track_index=start_offset,
+                auto_batch=auto_batch,
+                max_workers=max_workers,
+                search_progress_callback=search_progress_callback,
+                progress_callback=progress_callback,
+                journal=journal,
+                checkpoint=checkpoint,
+                trace_scope=trace_scope
+            )
+        except (HeaderExpiredError, TransferCancelled) as e:
+            expired_batch_index = e.batch_index or 0
+            if isinstance(e, TransferCancelled):
+                log(f"⏹️ Transfer of {playlist_name} cancelled before batch {expired_batch_index + 1}")
+            else:
+                log(f"🔑 Headers expired during batch {expired_batch_index + 1}")
+            e.progress_file = save_progress(
+                playlist_name,
+                resume_track_index(tracks, pending_tracks, e.search_index or 0),
+                len(tracks), ytm_video_ids, not_found_tracks, operation_type,
+                current_batch_index=expired_batch_index,
+                current_track_offset=e.track_index
+            )
+            raise
+
+    except (HeaderExpiredError, TransferCancelled) as e:
+        if not getattr(e, "progress_file", None):
+            e.progress_file = save_progress(
+                playlist_name, start_index, len(tracks), ytm_video_ids, not_found_tracks, operation_type
+            )
+        raise
+
+    result["attempted"] = len(ytm_video_ids)
+    result["added"] = len(actually_added)
+    result["failed"] = sum(len(batch) for batch in failed_batches)
+    result["not_found"] = list(not_found_tracks)
+    if ytm_video_ids:
+        missing_video_ids = set(ytm_video_ids) - set(actually_added)
+        report_transfer_result(label, actually_added, len(ytm_video_ids), failed_batches, target, log)
+        if not actually_added:
+            result["status"] = "failed"
+        elif missing_video_ids or failed_batches:
+            result["status"] = "partial"
+    else:
+        log(f"ℹ️ No new {label} to add{target}")
+
+    if not_found_tracks:
+        log(f"⚠️ {len(not_found_tracks)} {label} not found on YouTube Music")
+        for track in not_found_tracks[:10]:
+            log(f"   • {track}")
+        if len(not_found_tracks) > 10:
+            log(f"   ... and {len(not_found_tracks) - 10} more")
+
+    if plan:
+        # A resumed run only searched the tracks after its resume point; the earlier ones come from the cache
+        if not progress or fill_resolved_from_cache(plan["tracks"], resolved):
+            save_playlist_sync(plan, ytm_playlist_id, resolved, missing_video_ids)
+        else:
+            log(f"ℹ️ Could not map every track of the resumed transfer; the next sync re-checks all of {playlist_name}")
+    delete_progress(playlist_name)
+    return result
+
+def resume_track_index(tracks, pending_tracks, searched):
+    return transfer_resume_points(tracks, pending_tracks)[min(searched, len(pending_tracks))]
 
 if __name__ == "__main__":
     copy_spotify_to_ytm()
\ No newline at end of file
@@ -0,0 +1,370 @@
+import hashlib
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+# Endpoints that share YouTube Music's write budget
+YTM_WRITE_ENDPOINTS = ("create_playlist", "add_playlist_items", "remove_playlist_items", "delete_playlist", "subscribe_artists")
+HTTP_REASONS = {401: "Unauthorized", 403: "Forbidden", 409: "Conflict", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+class FakeBackendError(Exception):
+    def __init__(self, status, endpoint):
+        # Same wording as ytmusicapi, so classify_api_error treats it like the real thing
+        super().__init__(f"Server returned HTTP {status}: {HTTP_REASONS.get(status, 'Error')}.\n({endpoint})")
+        self.status = status
+        self.endpoint = endpoint
+
+def sample_latency(spec, rng):
+    if not spec:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    kind, *params = spec
+    if kind == "fixed":
+        return float(params[0])
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1])
+    if kind == "lognormal":
+        # (median, sigma): most calls near the median with a long slow tail
+        median, sigma = params
+        return rng.lognormvariate(0, sigma) * median
+    if kind == "exponential":
+        return rng.expovariate(1.0 / params[0])
+    raise ValueError(f"Unknown latency distribution: {kind}")
+
+def _stable_fraction(text):
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+class FakeCatalog:
+    def __init__(self, missing_rate=0.02, artist_count=997):
+        self.missing_rate = missing_rate
+        self.artist_count = max(1, artist_count)
+
+    def artist_name(self, index):
+        return f"Fake Artist {index % self.artist_count}"
+
+    def spotify_track(self, index):
+        return {
+            "id": f"sp{index:08d}",
+            "name": f"Fake Song {index}",
+            "artists": [{"name": self.artist_name(index)}],
+            "album": {"name": f"Fake Album {index // 12}"},
+            "duration_ms": 120000 + (index * 7919) % 240000,
+            "external_ids": {"isrc": f"FAKE{index:08d}"}
+        }
+
+    def video_id(self, index):
+        return f"vid{index:08d}"
+
+    def is_missing(self, index):
+        return _stable_fraction(f"track:{index}") < self.missing_rate
+
+    def index_for_query(self, query):
+        query = (query or "").strip()
+        if query.startswith("FAKE") and query[4:].isdigit():
+            return int(query[4:])
+        if " - Fake Song " in query:
+            try:
+                return int(query.rsplit(" ", 1)[1])
+            except ValueError:
+                return None
+        return None
+
+    def song_result(self, index):
+        track = self.spotify_track(index)
+        return {
+            "videoId": self.video_id(index),
+            "title": track["name"],
+            "artists": [{"name": track["artists"][0]["name"]}],
+            "duration_seconds": track["duration_ms"] // 1000
+        }
+
+    def artist_browse_id(self, name):
+        return "UC" + hashlib.md5(name.encode("utf-8")).hexdigest()[:22]
+
+class FakeBackend:
+    def __init__(self, playlist_sizes=(), liked_songs=0, followed_artists=0, seed=0,
+                 latency=None, rate_limits=None, error_rates=None, drop_rate=0.0,
+                 visibility_delay=0.0, count_delay=0.0, expire_headers_after=None,
+                 missing_rate=0.02, catalog=None):
+        self.catalog = catalog or FakeCatalog(missing_rate=missing_rate)
+        self.latency = latency or {}
+        self.rate_limits = rate_limits or {}
+        self.error_rates = error_rates or {}
+        self.drop_rate = drop_rate
+        self.visibility_delay = visibility_delay
+        self.count_delay = count_delay
+        self.expire_headers_after = expire_headers_after
+        self.calls = {}
+        self.errors = {}
+        self.sleep_seconds = 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._ytm_calls = 0
+        self._headers_expired = False
+        self._next_id = 0
+
+        next_track = 0
+        self.spotify_playlists = []
+        for number, size in enumerate(playlist_sizes):
+            self.spotify_playlists.append({
+                "id": f"spl{number:06d}",
+                "name": f"Fake Playlist {number}",
+                "snapshot_id": f"snap{number:06d}-0",
+                "tracks": list(range(next_track, next_track + size))
+            })
+            next_track += size
+        self.liked_tracks = list(range(next_track, next_track + liked_songs))
+        self.followed_artists = [self.catalog.artist_name(index) for index in range(followed_artists)]
+
+        self.ytm_playlists = {}
+        self.ytm_subscriptions = set()
+        self.spotify = FakeSpotify(self)
+        self.ytmusic = FakeYTMusic(self)
+
+    def renew_headers(self):
+        with self._lock:
+            self._headers_expired = False
+            self._ytm_calls = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "errors": {str(status): count for status, count in self.errors.items()},
+                "sleep_seconds": self.sleep_seconds,
+                "playlists": {playlist_id: len(p["items"]) for playlist_id, p in self.ytm_playlists.items()}
+            }
+
+    def _new_id(self, prefix):
+        self._next_id += 1
+        return f"{prefix}{self._next_id:08d}"
+
+    def _take_token(self, bucket_name, rate):
+        now = time.monotonic()
+        tokens, last = self._buckets.get(bucket_name, (rate, now))
+        tokens = min(rate, tokens + (now - last) * rate)
+        if tokens < 1:
+            self._buckets[bucket_name] = (tokens, now)
+            return False
+        self._buckets[bucket_name] = (tokens - 1, now)
+        return True
+
+    def _error_for(self, endpoint):
+        rates = dict(self.error_rates.get("*", {}))
+        rates.update(self.error_rates.get(endpoint, {}))
+        roll = self._rng.random()
+        for status, probability in sorted(rates.items()):
+            if roll < probability:
+                return int(status)
+            roll -= probability
+        return None
+
+    def call(self, service, endpoint):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            delay = sample_latency(self.latency.get(endpoint, self.latency.get("*")), self._rng)
+            status = None
+            if service == "ytmusic":
+                self._ytm_calls += 1
+                if self.expire_headers_after is not None and self._ytm_calls > self.expire_headers_after:
+                    self._headers_expired = True
+                if self._headers_expired:
+                    status = 401
+            if status is None:
+                bucket = "ytm_write" if endpoint in YTM_WRITE_ENDPOINTS else f"{service}_read"
+                rate = self.rate_limits.get(endpoint, self.rate_limits.get(bucket))
+                if rate and not self._take_token(bucket, float(rate)):
+                    status = 429
+            if status is None:
+                status = self._error_for(endpoint)
+            if status == 429 and service == "spotify":
+                # spotipy sleeps on Retry-After itself instead of raising
+                retry_after = 1.0 / float(self.rate_limits.get(endpoint, self.rate_limits.get("spotify_read", 1)))
+                delay += retry_after
+                status = None
+            if status is not None:
+                self.errors[status] = self.errors.get(status, 0) + 1
+            self.sleep_seconds += delay
+        if delay:
+            time.sleep(delay)
+        if status is not None:
+            raise FakeBackendError(status, endpoint)
+
+    def visible_items(self, playlist, now=None):
+        now = time.monotonic() if now is None else now
+        return [item for item in playlist["items"] if now - item["added_at"] >= self.visibility_delay]
+
+class FakeSpotify:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _page(self, items, limit, offset):
+        return {"items": items[offset:offset + limit], "total": len(items), "limit": limit, "offset": offset}
+
+    def current_user_playlists(self, limit=50, offset=0):
+        self.backend.call("spotify", "current_user_playlists")
+        playlists = [
+            {"id": p["id"], "name": p["name"], "snapshot_id": p["snapshot_id"], "tracks": {"total": len(p["tracks"])}}
+            for p in self.backend.spotify_playlists
+        ]
+        return self._page(playlists, limit, offset)
+
+    def playlist_items(self, playlist_id, fields=None, limit=100, offset=0, additional_types=("track",)):
+        self.backend.call("spotify", "playlist_items")
+        playlist = next((p for p in self.backend.spotify_playlists if p["id"] == playlist_id), None)
+        indices = playlist["tracks"] if playlist else []
+        page = self._page(indices, limit, offset)
+        page["items"] = [{"track": self.backend.catalog.spotify_track(index)} for index in page["items"]]
+        return page
+
+    def current_user_saved_tracks(self, limit=20, offset=0):
+        self.backend.call("spotify", "current_user_saved_tracks")
+        page = self._page(self.backend.liked_tracks, limit, offset)
+        page["items"] = [{"track": self.backend.catalog.spotify_track(index)} for index in page["items"]]
+        return page
+
+    def _artists_page(self, limit, offset):
+        artists = self.backend.followed_artists
+        items = [
+            {"id": f"spa{index:06d}", "name": name}
+            for index, name in enumerate(artists[offset:offset + limit], start=offset)
+        ]
+        end = offset + limit
+        return {"artists": {
+            "items": items,
+            "total": len(artists),
+            "next": f"fake://me/following?offset={end}&limit={limit}" if end < len(artists) else None
+        }}
+
+    def current_user_followed_artists(self, limit=20, after=None):
+        self.backend.call("spotify", "current_user_followed_artists")
+        return self._artists_page(limit, 0)
+
+    def next(self, result):
+        if not result.get("next"):
+            return None
+        self.backend.call("spotify", "current_user_followed_artists")
+        query = parse_qs(urlparse(result["next"]).query)
+        return self._artists_page(int(query["limit"][0]), int(query["offset"][0]))
+
+    def current_user(self):
+        self.backend.call("spotify", "current_user")
+        return {"id": "fake-user", "display_name": "Fake User"}
+
+class FakeYTMusic:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def search(self, query, filter=None, limit=20):
+        backend = self.backend
+        backend.call("ytmusic", "search")
+        if filter == "artists":
+            name = (query or "").strip()
+            if not name.startswith("Fake Artist"):
+                return []
+            return [{"artist": name, "browseId": backend.catalog.artist_browse_id(name)}]
+        index = backend.catalog.index_for_query(query)
+        decoy = {"videoId": "decoy000000", "title": "Unrelated Upload", "artists": [{"name": "Somebody Else"}]}
+        if index is None or backend.catalog.is_missing(index):
+            return [decoy]
+        return [backend.catalog.song_result(index), decoy]
+
+    def get_library_playlists(self, limit=25):
+        self.backend.call("ytmusic", "get_library_playlists")
+        with self.backend._lock:
+            playlists = [{"playlistId": playlist_id, "title": p["title"]} for playlist_id, p in self.backend.ytm_playlists.items()]
+        return playlists if limit is None else playlists[:limit]
+
+    def create_playlist(self, title, description="", privacy_status="PRIVATE", video_ids=None):
+        backend = self.backend
+        backend.call("ytmusic", "create_playlist")
+        with backend._lock:
+            playlist_id = backend._new_id("PLfake")
+            backend.ytm_playlists[playlist_id] = {"title": title, "description": description, "items": []}
+        return playlist_id
+
+    def delete_playlist(self, playlistId):
+        self.backend.call("ytmusic", "delete_playlist")
+        with self.backend._lock:
+            self.backend.ytm_playlists.pop(playlistId, None)
+        return "STATUS_SUCCEEDED"
+
+    def add_playlist_items(self, playlistId, videoIds=None, source_playlist=None, duplicates=False):
+        backend = self.backend
+        backend.call("ytmusic", "add_playlist_items")
+        results = []
+        with backend._lock:
+            playlist = backend.ytm_playlists.get(playlistId)
+            if playlist is None:
+                raise FakeBackendError(404, "add_playlist_items")
+            present = {item["videoId"] for item in playlist["items"]}
+            now = time.monotonic()
+            for video_id in videoIds or []:
+                if not duplicates and video_id in present:
+                    continue
+                set_video_id = backend._new_id("SV")
+                results.append({"videoId": video_id, "setVideoId": set_video_id})
+                # A silent drop is acknowledged like any other item but never lands in the playlist
+                if backend.drop_rate and backend._rng.random() < backend.drop_rate:
+                    continue
+                playlist["items"].append({"videoId": video_id, "setVideoId": set_video_id, "added_at": now})
+                present.add(video_id)
+        return {"status": "STATUS_SUCCEEDED", "playlistEditResults": results}
+
+    def get_playlist(self, playlistId, limit=100, related=False, suggestions_limit=0):
+        backend = self.backend
+        backend.call("ytmusic", "get_playlist")
+        with backend._lock:
+            playlist = backend.ytm_playlists.get(playlistId)
+            if playlist is None:
+                raise FakeBackendError(404, "get_playlist")
+            now = time.monotonic()
+            visible = backend.visible_items(playlist, now)
+            # The reported count trails the tracks themselves, like YouTube Music's cached counts
+            counted = [item for item in visible if now - item["added_at"] >= backend.visibility_delay + backend.count_delay]
+            tracks = visible if limit is None else visible[:max(limit, 100)]
+            return {
+                "id": playlistId,
+                "title": playlist["title"],
+                "trackCount": len(counted),
+                "tracks": [{"videoId": item["videoId"], "setVideoId": item["setVideoId"]} for item in tracks]
+            }
+
+    def remove_playlist_items(self, playlistId, videos):
+        backend = self.backend
+        backend.call("ytmusic", "remove_playlist_items")
+        with backend._lock:
+            playlist = backend.ytm_playlists.get(playlistId)
+            if playlist is None:
+                raise FakeBackendError(404, "remove_playlist_items")
+            removed = {video.get("setVideoId") for video in videos}
+            playlist["items"] = [item for item in playlist["items"] if item["setVideoId"] not in removed]
+        return "STATUS_SUCCEEDED"
+
+    def get_library_subscriptions(self, limit=25, order=None):
+        backend = self.backend
+        backend.call("ytmusic", "get_library_subscriptions")
+        with backend._lock:
+            artists = [{"artist": name, "browseId": backend.catalog.artist_browse_id(name)} for name in sorted(backend.ytm_subscriptions)]
+        return artists if limit is None else artists[:limit]
+
+    def subscribe_artists(self, channelIds):
+        backend = self.backend
+        backend.call("ytmusic", "subscribe_artists")
+        by_id = {backend.catalog.artist_browse_id(name): name for name in backend.followed_artists}
+        with backend._lock:
+            for channel_id in channelIds:
+                if channel_id in by_id:
+                    backend.ytm_subscriptions.add(by_id[channel_id])
+        return {"status": "STATUS_SUCCEEDED"}
+
+def open_fake_backend(options):
+    if isinstance(options, FakeBackend):
+        return options
+    options = dict(options or {})
+    if "playlist_sizes" in options:
+        options["playlist_sizes"] = tuple(options["playlist_sizes"])
+    return FakeBackend(**options)
@@ -0,0 +1,184 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "s2ym"
+
+def _response_bytes(response):
+    if response is None:
+        return 0
+    try:
+        return len(json.dumps(response, separators=(",", ":"), default=str))
+    except Exception:
+        return 0
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+class MetricsRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS, measure_bytes=False):
+        self.buckets = tuple(sorted(buckets))
+        # Sizing a response means serializing it again, so it only happens when the metrics get exported
+        self.measure_bytes = measure_bytes
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._calls = {}
+            self._errors = {}
+            self._sleeps = {}
+            self._started = time.time()
+
+    def observe_call(self, service, endpoint, seconds, error_kind=None, response_bytes=0):
+        key = (service, endpoint)
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = {"count": 0, "seconds": 0.0, "bytes": 0, "buckets": [0] * (len(self.buckets) + 1)}
+            call["count"] += 1
+            call["seconds"] += seconds
+            call["bytes"] += response_bytes
+            call["buckets"][bisect_left(self.buckets, seconds)] += 1
+            if error_kind:
+                error_key = (service, endpoint, error_kind)
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+
+    def observe_sleep(self, reason, seconds):
+        with self._lock:
+            sleep = self._sleeps.setdefault(reason, {"count": 0, "seconds": 0.0})
+            sleep["count"] += 1
+            sleep["seconds"] += seconds
+
+    def sleep(self, reason, seconds):
+        if seconds <= 0:
+            return
+        self.observe_sleep(reason, seconds)
+        time.sleep(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            calls = {
+                f"{service}.{endpoint}": {
+                    "count": call["count"],
+                    "seconds": round(call["seconds"], 6),
+                    "bytes": call["bytes"],
+                    "latency_buckets": {
+                        **{str(bound): count for bound, count in zip(self.buckets, call["buckets"])},
+                        "+Inf": call["buckets"][-1]
+                    }
+                }
+                for (service, endpoint), call in sorted(self._calls.items())
+            }
+            errors = {}
+            for (service, endpoint, kind), count in sorted(self._errors.items()):
+                errors.setdefault(f"{service}.{endpoint}", {})[kind] = count
+            sleeps = {reason: {"count": s["count"], "seconds": round(s["seconds"], 6)} for reason, s in sorted(self._sleeps.items())}
+            return {
+                "started_at": self._started,
+                "uptime_seconds": round(time.time() - self._started, 3),
+                "calls": calls,
+                "errors": errors,
+                "sleeps": sleeps
+            }
+
+    def prometheus_text(self):
+        with self._lock:
+            calls = sorted(self._calls.items())
+            errors = sorted(self._errors.items())
+            sleeps = sorted(self._sleeps.items())
+
+        lines = [
+            f"# HELP {METRIC_PREFIX}_api_requests_total Spotify and YouTube Music API calls.",
+            f"# TYPE {METRIC_PREFIX}_api_requests_total counter"
+        ]
+        lines += [f"{METRIC_PREFIX}_api_requests_total{_labels(service=s, endpoint=e)} {c['count']}" for (s, e), c in calls]
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_api_errors_total Failed API calls by error class.",
+            f"# TYPE {METRIC_PREFIX}_api_errors_total counter"
+        ]
+        lines += [f"{METRIC_PREFIX}_api_errors_total{_labels(service=s, endpoint=e, kind=k)} {count}" for (s, e, k), count in errors]
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_api_request_duration_seconds API call latency.",
+            f"# TYPE {METRIC_PREFIX}_api_request_duration_seconds histogram"
+        ]
+        for (service, endpoint), call in calls:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), call["buckets"]):
+                cumulative += count
+                lines.append(
+                    f"{METRIC_PREFIX}_api_request_duration_seconds_bucket{_labels(service=service, endpoint=endpoint, le=bound)} {cumulative}"
+                )
+            lines.append(f"{METRIC_PREFIX}_api_request_duration_seconds_sum{_labels(service=service, endpoint=endpoint)} {call['seconds']:.6f}")
+            lines.append(f"{METRIC_PREFIX}_api_request_duration_seconds_count{_labels(service=service, endpoint=endpoint)} {call['count']}")
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_api_response_bytes_total Size of decoded API responses.",
+            f"# TYPE {METRIC_PREFIX}_api_response_bytes_total counter"
+        ]
+        lines += [f"{METRIC_PREFIX}_api_response_bytes_total{_labels(service=s, endpoint=e)} {c['bytes']}" for (s, e), c in calls]
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_sleep_seconds_total Time spent in deliberate waits (pacing, settling, backoff), summed over threads.",
+            f"# TYPE {METRIC_PREFIX}_sleep_seconds_total counter"
+        ]
+        lines += [f"{METRIC_PREFIX}_sleep_seconds_total{_labels(reason=reason)} {s['seconds']:.6f}" for reason, s in sleeps]
+        lines += [
+            f"# HELP {METRIC_PREFIX}_sleeps_total Number of deliberate waits.",
+            f"# TYPE {METRIC_PREFIX}_sleeps_total counter"
+        ]
+        lines += [f"{METRIC_PREFIX}_sleeps_total{_labels(reason=reason)} {s['count']}" for reason, s in sleeps]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, format=None):
+        if format is None:
+            format = "prometheus" if path.endswith((".prom", ".txt")) else "json"
+        content = self.prometheus_text() if format == "prometheus" else json.dumps(self.snapshot(), indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+class InstrumentedClient:
+    def __init__(self, client, service, registry, classify=None, tracer=None):
+        self._client = client
+        self._service = service
+        self._registry = registry
+        self._classify = classify
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = attribute(*args, **kwargs)
+            except Exception as e:
+                end = time.perf_counter()
+                kind = self._classify(e) if self._classify else type(e).__name__
+                self._registry.observe_call(self._service, name, end - start, error_kind=kind)
+                if self._tracer:
+                    self._tracer.complete(f"{self._service}.{name}", start, end, self._service, error=kind)
+                raise
+            end = time.perf_counter()
+            response_bytes = _response_bytes(response) if self._registry.measure_bytes else 0
+            self._registry.observe_call(self._service, name, end - start, response_bytes=response_bytes)
+            if self._tracer:
+                self._tracer.complete(f"{self._service}.{name}", start, end, self._service)
+            return response
+
+        return timed
+
+def instrument_client(client, service, registry, classify=None, tracer=None):
+    if client is None:
+        return None
+    return InstrumentedClient(client, service, registry, classify, tracer)
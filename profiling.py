@@ -0,0 +1,176 @@
+import contextlib
+import cProfile
+import io
+import platform
+import pstats
+import threading
+import time
+import tracemalloc
+
+PHASES = ("fetch", "search", "write", "verify")
+DEFAULT_REPORT_PATH = "profile_report.txt"
+REPORT_TOP_FUNCTIONS = 40
+REPORT_TOP_ALLOCATIONS = 10
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+def _kib(size):
+    return f"{size / 1024:,.1f} KiB"
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles = []
+        self._phases = {}
+        self._started = None
+        self._owns_tracemalloc = False
+
+    def enable(self):
+        with self._lock:
+            if self.enabled:
+                return
+            self._local = threading.local()
+            self._profiles = []
+            self._phases = {name: {"count": 0, "seconds": 0.0, "allocated": 0, "sites": {}} for name in PHASES}
+            self._started = time.perf_counter()
+            self._owns_tracemalloc = not tracemalloc.is_tracing()
+            if self._owns_tracemalloc:
+                tracemalloc.start()
+            if hasattr(tracemalloc, "reset_peak"):
+                # Python 3.9+; on 3.8 the reported peak may include allocations from before profiling
+                tracemalloc.reset_peak()
+            self.enabled = True
+
+    def _thread_profile(self):
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append((threading.current_thread().name, profile))
+        return profile
+
+    @contextlib.contextmanager
+    def profile_thread(self):
+        # cProfile only sees the thread that enabled it, so every thread doing transfer work opts in
+        if not self.enabled or getattr(self._local, "active", False):
+            yield
+            return
+        profile = self._thread_profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active; on Python 3.12+ it covers every thread
+            yield
+            return
+        self._local.active = True
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._local.active = False
+
+    def profiled(self, func):
+        if not self.enabled:
+            return func
+
+        def run_profiled(*args, **kwargs):
+            with self.profile_thread():
+                return func(*args, **kwargs)
+
+        return run_profiled
+
+    def start_phase(self, name):
+        if not self.enabled:
+            return None
+        return name, time.perf_counter(), tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def end_phase(self, token):
+        if token is None or not self.enabled:
+            return
+        name, started, before = token
+        seconds = time.perf_counter() - started
+        after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        differences = after.compare_to(before, "lineno")
+        with self._lock:
+            phase = self._phases.setdefault(name, {"count": 0, "seconds": 0.0, "allocated": 0, "sites": {}})
+            phase["count"] += 1
+            phase["seconds"] += seconds
+            for difference in differences:
+                if difference.size_diff:
+                    site = str(difference.traceback[0])
+                    phase["allocated"] += difference.size_diff
+                    phase["sites"][site] = phase["sites"].get(site, 0) + difference.size_diff
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        token = self.start_phase(name)
+        try:
+            yield
+        finally:
+            self.end_phase(token)
+
+    def report(self):
+        with self._lock:
+            profiles = list(self._profiles)
+            phases = {name: dict(phase, sites=dict(phase["sites"])) for name, phase in self._phases.items()}
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        elapsed = time.perf_counter() - self._started if self._started else 0
+
+        out = io.StringIO()
+        out.write("Spotify2YTMusic transfer profile\n")
+        out.write(f"Python {platform.python_version()} on {platform.platform()}\n")
+        out.write(f"Profiled for {elapsed:.1f}s across {len(profiles)} thread(s)\n")
+        out.write(f"Traced memory: {_kib(current)} now, {_kib(peak)} peak\n\n")
+
+        out.write("== Phases ==\n")
+        out.write("Search and write overlap in the streaming pipeline, so allocations made while both run count toward both.\n")
+        out.write(f"{'phase':<10}{'runs':>6}{'wall s':>10}{'net allocated':>18}\n")
+        for name, phase in phases.items():
+            out.write(f"{name:<10}{phase['count']:>6}{phase['seconds']:>10.2f}{_kib(phase['allocated']):>18}\n")
+        for name, phase in phases.items():
+            sites = sorted(phase["sites"].items(), key=lambda item: abs(item[1]), reverse=True)[:REPORT_TOP_ALLOCATIONS]
+            if not sites:
+                continue
+            out.write(f"\n-- Top allocation sites: {name} --\n")
+            for site, size in sites:
+                out.write(f"{_kib(size):>16}  {site}\n")
+
+        stats = None
+        for _, profile in profiles:
+            try:
+                thread_stats = pstats.Stats(profile, stream=out)
+            except TypeError:
+                # pstats refuses profiles that never recorded a call
+                continue
+            if stats is None:
+                stats = thread_stats
+            else:
+                stats.add(thread_stats)
+        if stats is None:
+            out.write("\nNo CPU profile was recorded.\n")
+            return out.getvalue(), None
+
+        for sort_key, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+            out.write(f"\n== CPU: top {REPORT_TOP_FUNCTIONS} functions by {title} ==\n")
+            stats.sort_stats(sort_key).print_stats(REPORT_TOP_FUNCTIONS)
+        return out.getvalue(), stats
+
+    def finish(self, path=DEFAULT_REPORT_PATH):
+        if not self.enabled:
+            return None
+        text, stats = self.report()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if stats is not None:
+            stats.dump_stats(f"{path}.prof")
+        with self._lock:
+            self.enabled = False
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+        return path
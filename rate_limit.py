@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+
+# Largest batch the GUI slider can show; auto mode stays within it so the learned size can be edited
+MAX_BATCH_SIZE = 20
+
+class RateController:
+    def __init__(self, name, rate=1.0, min_rate=0.1, max_rate=10.0, burst=1,
+                 increase=0.1, decrease=0.5, history=200, drop_threshold=0.2, drop_window=20):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1, burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.outcomes = deque(maxlen=history)
+        self.drop_threshold = drop_threshold
+        self.drop_window = max(1, drop_window)
+        self._deliveries = deque()
+        self.on_wait = None
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill_locked()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if self.on_wait:
+                self.on_wait(self.name, wait)
+            time.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            self.outcomes.append((time.time(), "ok"))
+
+    def record_delivery(self, sent, dropped=0):
+        # Isolated silent drops are normal noise; only a high drop ratio over recent items means congestion
+        with self._lock:
+            self._deliveries.append((sent, dropped))
+            window_sent = sum(item[0] for item in self._deliveries)
+            while len(self._deliveries) > 1 and window_sent - self._deliveries[0][0] >= self.drop_window:
+                window_sent -= self._deliveries.popleft()[0]
+            window_dropped = sum(item[1] for item in self._deliveries)
+            congested = (
+                dropped and window_sent >= self.drop_window
+                and window_dropped / window_sent > self.drop_threshold
+            )
+            if congested:
+                self._deliveries.clear()
+        if congested:
+            self.record_throttle("drop")
+        else:
+            self.record_success()
+
+    def record_throttle(self, reason="throttle"):
+        with self._lock:
+            self._refill_locked()
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Drain the bucket so the next caller waits a full interval at the reduced rate
+            self._tokens = min(self._tokens, 0.0)
+            self.outcomes.append((time.time(), reason))
+
+    def record_error(self, reason="error"):
+        with self._lock:
+            self.outcomes.append((time.time(), reason))
+
+    def configure(self, rate=None, min_rate=None, max_rate=None, burst=None):
+        with self._lock:
+            if min_rate is not None:
+                self.min_rate = min_rate
+            if max_rate is not None:
+                self.max_rate = max_rate
+            if burst is not None:
+                self.burst = max(1, burst)
+            if rate is not None:
+                self.rate = rate
+            self.rate = min(self.max_rate, max(self.min_rate, self.rate))
+            self._tokens = min(self._tokens, self.burst)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate": self.rate,
+                "min_rate": self.min_rate,
+                "max_rate": self.max_rate,
+                "outcomes": list(self.outcomes)
+            }
+
+class AdaptiveBatchSizer:
+    def __init__(self, initial=5, min_size=1, max_size=MAX_BATCH_SIZE, grow_after=3, drop_threshold=0.2):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.grow_after = grow_after
+        self.drop_threshold = drop_threshold
+        self.size = min(max_size, max(min_size, int(initial)))
+        self._clean_streak = 0
+
+    def record(self, sent, dropped, batches=1):
+        # Only verified delivery may grow the size: acks also cover tracks YouTube Music drops silently.
+        # An occasional dropped track is random loss, not a sign the batch is too big
+        if self.record_loss(dropped / max(1, sent)):
+            return
+        self._clean_streak += batches
+        while self._clean_streak >= self.grow_after:
+            self._clean_streak -= self.grow_after
+            self.size = min(self.max_size, self.size + max(1, self.size // 4))
+
+    def record_loss(self, drop_ratio):
+        if drop_ratio > self.drop_threshold:
+            self.shrink(drop_ratio)
+            return True
+        return False
+
+    def shrink(self, drop_ratio=1.0):
+        self._clean_streak = 0
+        factor = 0.5 if drop_ratio >= 0.25 else 0.75
+        self.size = max(self.min_size, min(self.size - 1, int(self.size * factor)))
@@ -0,0 +1,148 @@
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+DEFAULT_CACHE_PATH = "search_cache.db"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS = 3 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 100000
+ACCESS_FLUSH_SIZE = 500
+
+def normalize_query(query):
+    text = unicodedata.normalize("NFKC", query or "").casefold()
+    text = re.sub(r"[\s\u200b]+", " ", text)
+    return text.strip()
+
+class SearchCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 negative_ttl_seconds=DEFAULT_NEGATIVE_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        # Access times of cache hits, written in batches rather than one transaction per hit
+        self._pending_access = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_results ("
+            " query TEXT PRIMARY KEY,"
+            " video_id TEXT,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_results_accessed ON search_results(accessed_at)")
+        self._conn.commit()
+
+    def _is_expired(self, video_id, stored_at, now):
+        ttl = self.ttl_seconds if video_id else self.negative_ttl_seconds
+        return ttl is not None and now - stored_at > ttl
+
+    def get(self, query):
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id, stored_at FROM search_results WHERE query = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            video_id, stored_at = row
+            if self._is_expired(video_id, stored_at, now):
+                self._pending_access.pop(key, None)
+                self._conn.execute("DELETE FROM search_results WHERE query = ?", (key,))
+                self._conn.commit()
+                return False, None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= ACCESS_FLUSH_SIZE:
+                self._flush_access_locked()
+            return True, video_id
+
+    def _flush_access_locked(self):
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE search_results SET accessed_at = ? WHERE query = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+        )
+        self._conn.commit()
+        self._pending_access = {}
+
+    def put(self, query, video_id):
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop(key, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (query, video_id, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, video_id, now, now)
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 500:
+                self._evict_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_access_locked()
+
+    def evict(self):
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self):
+        self._writes_since_evict = 0
+        self._flush_access_locked()
+        now = time.time()
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM search_results WHERE video_id IS NOT NULL AND stored_at < ?",
+                (now - self.ttl_seconds,)
+            )
+        if self.negative_ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM search_results WHERE video_id IS NULL AND stored_at < ?",
+                (now - self.negative_ttl_seconds,)
+            )
+        if self.max_entries:
+            count = self._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM search_results WHERE query IN ("
+                    " SELECT query FROM search_results ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+        self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._pending_access = {}
+            self._conn.execute("DELETE FROM search_results")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_access_locked()
+            self._conn.close()
+
+def open_search_cache(config_data=None):
+    config_data = config_data or {}
+    if not config_data.get("search_cache_enabled", True):
+        return None
+    try:
+        ttl_days = config_data.get("search_cache_ttl_days", DEFAULT_TTL_SECONDS / 86400)
+        negative_ttl_days = config_data.get("search_cache_negative_ttl_days", DEFAULT_NEGATIVE_TTL_SECONDS / 86400)
+        cache = SearchCache(
+            path=config_data.get("search_cache_path", DEFAULT_CACHE_PATH),
+            ttl_seconds=float(ttl_days) * 86400 if ttl_days is not None else None,
+            negative_ttl_seconds=float(negative_ttl_days) * 86400 if negative_ttl_days is not None else None,
+            max_entries=int(config_data.get("search_cache_max_entries", DEFAULT_MAX_ENTRIES))
+        )
+        cache.evict()
+        return cache
+    except Exception as e:
+        print(f"Search cache disabled: {e}")
+        return None
@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+import time
+
+DEFAULT_SYNC_STATE_PATH = "sync_state.db"
+
+class SyncState:
+    def __init__(self, path=DEFAULT_SYNC_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS synced_playlists ("
+            " spotify_playlist_id TEXT PRIMARY KEY,"
+            " snapshot_id TEXT,"
+            " ytm_playlist_id TEXT,"
+            " synced_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS synced_tracks ("
+            " spotify_playlist_id TEXT NOT NULL,"
+            " track_key TEXT NOT NULL,"
+            " video_id TEXT,"
+            " PRIMARY KEY (spotify_playlist_id, track_key))"
+        )
+        self._conn.commit()
+
+    def get_playlist(self, spotify_playlist_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot_id, ytm_playlist_id, synced_at FROM synced_playlists WHERE spotify_playlist_id = ?",
+                (spotify_playlist_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            tracks = dict(self._conn.execute(
+                "SELECT track_key, video_id FROM synced_tracks WHERE spotify_playlist_id = ?",
+                (spotify_playlist_id,)
+            ).fetchall())
+        return {
+            "snapshot_id": row[0],
+            "ytm_playlist_id": row[1],
+            "synced_at": row[2],
+            "tracks": tracks
+        }
+
+    def save_playlist(self, spotify_playlist_id, snapshot_id, ytm_playlist_id, tracks):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO synced_playlists (spotify_playlist_id, snapshot_id, ytm_playlist_id, synced_at)"
+                " VALUES (?, ?, ?, ?)",
+                (spotify_playlist_id, snapshot_id, ytm_playlist_id, time.time())
+            )
+            self._conn.execute("DELETE FROM synced_tracks WHERE spotify_playlist_id = ?", (spotify_playlist_id,))
+            self._conn.executemany(
+                "INSERT INTO synced_tracks (spotify_playlist_id, track_key, video_id) VALUES (?, ?, ?)",
+                [(spotify_playlist_id, key, video_id) for key, video_id in tracks.items()]
+            )
+
+    def forget_playlist(self, spotify_playlist_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM synced_playlists WHERE spotify_playlist_id = ?", (spotify_playlist_id,))
+            self._conn.execute("DELETE FROM synced_tracks WHERE spotify_playlist_id = ?", (spotify_playlist_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def open_sync_state(config_data=None):
+    config_data = config_data or {}
+    if not config_data.get("incremental_sync", True):
+        return None
+    try:
+        return SyncState(config_data.get("sync_state_path", DEFAULT_SYNC_STATE_PATH))
+    except Exception as e:
+        print(f"Incremental sync disabled: {e}")
+        return None
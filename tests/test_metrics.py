@@ -0,0 +1,17 @@
+from metrics import MetricsRegistry, instrument_client
+
+class Client:
+    def search(self, query):
+        return [{"videoId": "abc", "title": query}]
+
+def test_response_bytes_are_skipped_by_default():
+    registry = MetricsRegistry()
+    instrument_client(Client(), "ytmusic", registry).search("song")
+    call = registry.snapshot()["calls"]["ytmusic.search"]
+    assert call["count"] == 1
+    assert call["bytes"] == 0
+
+def test_response_bytes_are_measured_for_export():
+    registry = MetricsRegistry(measure_bytes=True)
+    instrument_client(Client(), "ytmusic", registry).search("song")
+    assert registry.snapshot()["calls"]["ytmusic.search"]["bytes"] == len('[{"videoId":"abc","title":"song"}]')
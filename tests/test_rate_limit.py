@@ -0,0 +1,111 @@
+import pytest
+
+from rate_limit import MAX_BATCH_SIZE, AdaptiveBatchSizer, RateController
+
+def test_throttle_halves_rate_down_to_minimum():
+    controller = RateController("test", rate=4.0, min_rate=0.5, max_rate=10.0)
+    controller.record_throttle()
+    assert controller.rate == pytest.approx(2.0)
+    for _ in range(10):
+        controller.record_throttle()
+    assert controller.rate == pytest.approx(0.5)
+
+def test_success_recovers_additively_up_to_maximum():
+    controller = RateController("test", rate=1.0, max_rate=2.0, increase=0.25)
+    controller.record_throttle()
+    assert controller.rate == pytest.approx(0.5)
+    controller.record_success()
+    controller.record_success()
+    assert controller.rate == pytest.approx(1.0)
+    for _ in range(20):
+        controller.record_success()
+    assert controller.rate == pytest.approx(2.0)
+
+def test_throttle_drains_bucket():
+    controller = RateController("test", rate=1.0, burst=3)
+    controller.record_throttle()
+    assert controller._tokens <= 0
+
+def test_error_does_not_change_rate():
+    controller = RateController("test", rate=3.0)
+    controller.record_error("auth")
+    assert controller.rate == pytest.approx(3.0)
+    assert controller.snapshot()["outcomes"][-1][1] == "auth"
+
+def test_isolated_drops_do_not_back_off():
+    controller = RateController("test", rate=5.0, max_rate=5.0, drop_threshold=0.2, drop_window=20)
+    # One dropped item in every 20 stays below the threshold
+    for batch in range(20):
+        controller.record_delivery(5, 1 if batch % 4 == 0 else 0)
+    assert controller.rate == pytest.approx(5.0)
+    assert all(reason == "ok" for _, reason in controller.snapshot()["outcomes"])
+
+def test_sustained_drops_back_off_once_per_window():
+    controller = RateController("test", rate=8.0, max_rate=8.0, increase=0.0, drop_threshold=0.2, drop_window=20)
+    for _ in range(4):
+        controller.record_delivery(5, 2)
+    assert controller.rate == pytest.approx(4.0)
+    assert [reason for _, reason in controller.snapshot()["outcomes"]].count("drop") == 1
+    # The window restarts after a backoff, so the next drop alone cannot trigger another one
+    controller.record_delivery(5, 2)
+    assert controller.rate == pytest.approx(4.0)
+
+def test_configure_clamps_rate():
+    controller = RateController("test", rate=5.0)
+    controller.configure(max_rate=2.0)
+    assert controller.rate == pytest.approx(2.0)
+    controller.configure(rate=0.01, min_rate=0.2)
+    assert controller.rate == pytest.approx(0.2)
+
+def test_acquire_consumes_tokens():
+    controller = RateController("test", rate=1000.0, burst=2)
+    waits = []
+    controller.on_wait = lambda name, wait: waits.append(wait)
+    controller.acquire()
+    controller.acquire()
+    assert waits == []
+    controller.acquire()
+    assert waits
+
+def test_sizer_grows_after_clean_batches():
+    sizer = AdaptiveBatchSizer(initial=8, max_size=12, grow_after=2)
+    sizer.record(8, 0)
+    assert sizer.size == 8
+    sizer.record(8, 0)
+    assert sizer.size == 10
+    for _ in range(10):
+        sizer.record(sizer.size, 0)
+    assert sizer.size == 12
+
+def test_sizer_ignores_occasional_drops():
+    sizer = AdaptiveBatchSizer(initial=20, max_size=50, grow_after=1, drop_threshold=0.2)
+    sizer.record(20, 1)
+    assert sizer.size == 25
+
+def test_sizer_shrinks_on_heavy_loss():
+    sizer = AdaptiveBatchSizer(initial=20, min_size=2, drop_threshold=0.2)
+    sizer.record(20, 10)
+    assert sizer.size == 10
+    assert sizer.record_loss(0.22)
+    assert sizer.size == 7
+    for _ in range(10):
+        sizer.shrink()
+    assert sizer.size == 2
+
+def test_sizer_loss_resets_growth_streak():
+    sizer = AdaptiveBatchSizer(initial=10, grow_after=2)
+    sizer.record(10, 0)
+    sizer.record(10, 5)
+    sizer.record(5, 0)
+    assert sizer.size == 5
+
+def test_sizer_verified_window_counts_each_batch():
+    sizer = AdaptiveBatchSizer(initial=8, max_size=50, grow_after=2)
+    sizer.record(32, 0, batches=4)
+    assert sizer.size == 12
+
+def test_sizer_defaults_to_slider_max():
+    sizer = AdaptiveBatchSizer(initial=MAX_BATCH_SIZE)
+    for _ in range(10):
+        sizer.record(sizer.size, 0)
+    assert sizer.size == MAX_BATCH_SIZE
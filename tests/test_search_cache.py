@@ -0,0 +1,120 @@
+from search_cache import ACCESS_FLUSH_SIZE, SearchCache, normalize_query, open_search_cache
+
+def make_cache(tmp_path, **kwargs):
+    return SearchCache(path=str(tmp_path / "search_cache.db"), **kwargs)
+
+def age_entry(cache, query, seconds):
+    cache._conn.execute(
+        "UPDATE search_results SET stored_at = stored_at - ?, accessed_at = accessed_at - ? WHERE query = ?",
+        (seconds, seconds, normalize_query(query))
+    )
+    cache._conn.commit()
+
+def test_normalize_query_ignores_case_and_spacing():
+    assert normalize_query("  Daft\u200b  PUNK ") == "daft punk"
+
+def test_hit_and_negative_hit(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("Song Artist", "abc123")
+    cache.put("Missing Song", None)
+    assert cache.get("song  artist") == (True, "abc123")
+    assert cache.get("missing song") == (True, None)
+    assert cache.get("never searched") == (False, None)
+    cache.close()
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=100, negative_ttl_seconds=10)
+    cache.put("found", "abc123")
+    cache.put("missing", None)
+    age_entry(cache, "found", 50)
+    age_entry(cache, "missing", 50)
+    # Negative results expire sooner than matches
+    assert cache.get("found") == (True, "abc123")
+    assert cache.get("missing") == (False, None)
+    age_entry(cache, "found", 100)
+    assert cache.get("found") == (False, None)
+    count = cache._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+    assert count == 0
+    cache.close()
+
+def test_ttl_none_never_expires(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=None)
+    cache.put("found", "abc123")
+    age_entry(cache, "found", 10 * 365 * 86400)
+    assert cache.get("found") == (True, "abc123")
+    cache.close()
+
+def test_evict_drops_expired_entries(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=100, negative_ttl_seconds=10)
+    cache.put("old", "abc123")
+    cache.put("fresh", "def456")
+    cache.put("old missing", None)
+    age_entry(cache, "old", 200)
+    age_entry(cache, "old missing", 20)
+    cache.evict()
+    rows = cache._conn.execute("SELECT query FROM search_results").fetchall()
+    assert rows == [("fresh",)]
+    cache.close()
+
+def test_evict_keeps_most_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    for index, query in enumerate(("first", "second", "third")):
+        cache.put(query, f"id{index}")
+        age_entry(cache, query, 30 - index * 10)
+    # Reading "first" makes it the most recently used entry
+    assert cache.get("first") == (True, "id0")
+    cache.evict()
+    assert cache.get("first") == (True, "id0")
+    assert cache.get("second") == (False, None)
+    assert cache.get("third") == (True, "id2")
+    cache.close()
+
+def stored_accessed_at(cache, query):
+    return cache._conn.execute(
+        "SELECT accessed_at FROM search_results WHERE query = ?", (normalize_query(query),)
+    ).fetchone()[0]
+
+def test_hits_write_access_times_in_batches(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("song", "abc123")
+    age_entry(cache, "song", 100)
+    aged = stored_accessed_at(cache, "song")
+    assert cache.get("song") == (True, "abc123")
+    assert stored_accessed_at(cache, "song") == aged
+    for index in range(ACCESS_FLUSH_SIZE - 1):
+        cache.put(f"other {index}", "def456")
+        cache.get(f"other {index}")
+    assert stored_accessed_at(cache, "song") > aged
+    cache.close()
+
+def test_close_writes_pending_access_times(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("song", "abc123")
+    age_entry(cache, "song", 100)
+    aged = stored_accessed_at(cache, "song")
+    cache.get("song")
+    cache.close()
+    cache = make_cache(tmp_path)
+    assert stored_accessed_at(cache, "song") > aged
+    cache.close()
+
+def test_entries_survive_reopen(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("song", "abc123")
+    cache.close()
+    cache = make_cache(tmp_path)
+    assert cache.get("song") == (True, "abc123")
+    cache.close()
+
+def test_open_search_cache_honours_config(tmp_path):
+    assert open_search_cache({"search_cache_enabled": False}) is None
+    cache = open_search_cache({
+        "search_cache_path": str(tmp_path / "cache.db"),
+        "search_cache_ttl_days": 1,
+        "search_cache_negative_ttl_days": None,
+        "search_cache_max_entries": 10
+    })
+    assert cache.ttl_seconds == 86400
+    assert cache.negative_ttl_seconds is None
+    assert cache.max_entries == 10
+    cache.close()
@@ -0,0 +1,159 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("spotipy")
+pytest.importorskip("ytmusicapi")
+
+import copy_playlists
+from fake_backend import FakeBackend
+from rate_limit import MAX_BATCH_SIZE
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    def make(config=None, **options):
+        fake = FakeBackend(seed=1, missing_rate=0.1, **options)
+        monkeypatch.chdir(tmp_path)
+        for name in ("search_cache", "sync_state", "transfer_journal"):
+            monkeypatch.setattr(copy_playlists, name, None)
+        copy_playlists.configure_clients(dict({
+            "fake_backend": fake,
+            "youtube_headers": "test",
+            "write_rate_max": 1000.0,
+            "search_rate_max": 1000.0,
+            "search_cache_path": str(tmp_path / "search_cache.db"),
+            "sync_state_path": str(tmp_path / "sync_state.db"),
+            "transfer_journal_path": str(tmp_path / "transfer_journal.db")
+        }, **(config or {})))
+        copy_playlists.write_rate.configure(rate=1000.0, burst=10)
+        copy_playlists.search_rate.configure(rate=1000.0, burst=10)
+        return fake
+    return make
+
+def transfer(fake, playlist, resolved=None):
+    plan = copy_playlists.plan_playlist_sync(playlist, force=bool(copy_playlists.load_progress(playlist['name'])))
+    return copy_playlists.transfer_tracks_to_ytm(
+        playlist['name'], plan["tracks"], "playlist", plan=plan, batch_size=7,
+        max_workers=4, resolved=resolved, verification_delay=0, log=lambda *args: None
+    )
+
+def expected_video_ids(fake, playlist):
+    return [
+        fake.catalog.video_id(index) for index in playlist["tracks"] if not fake.catalog.is_missing(index)
+    ]
+
+def ytm_video_ids(fake):
+    (ytm_playlist,) = fake.ytm_playlists.values()
+    return [item["videoId"] for item in ytm_playlist["items"]]
+
+def test_stream_writes_every_match_in_order(backend):
+    fake = backend(playlist_sizes=[60])
+    (playlist,) = copy_playlists.list_spotify_playlists(show=False)
+    result = transfer(fake, playlist)
+    expected = expected_video_ids(fake, fake.spotify_playlists[0])
+    assert result["status"] == "ok"
+    assert result["added"] == len(expected)
+    assert len(result["not_found"]) == 60 - len(expected)
+    assert ytm_video_ids(fake) == expected
+
+def test_resume_after_header_expiry_adds_no_duplicates(backend):
+    fake = backend(playlist_sizes=[60], expire_headers_after=40)
+    (playlist,) = copy_playlists.list_spotify_playlists(show=False)
+    with pytest.raises(copy_playlists.HeaderExpiredError):
+        transfer(fake, playlist)
+    assert copy_playlists.load_progress(playlist['name'])
+
+    fake.expire_headers_after = None
+    fake.renew_headers()
+    transfer(fake, playlist)
+    assert copy_playlists.load_progress(playlist['name']) is None
+    assert ytm_video_ids(fake) == expected_video_ids(fake, fake.spotify_playlists[0])
+
+def test_verified_drops_slow_the_write_rate(backend):
+    fake = backend(playlist_sizes=[300], drop_rate=0.3)
+    copy_playlists.write_rate.configure(rate=100.0)
+    (playlist,) = copy_playlists.list_spotify_playlists(show=False)
+    transfer(fake, playlist)
+    outcomes = [reason for _, reason in copy_playlists.write_rate.snapshot()["outcomes"]]
+    # Every add was acknowledged, so only the delivery checks can have seen the drops
+    assert "drop" in outcomes
+    assert copy_playlists.write_rate.rate < 100.0
+
+@pytest.mark.parametrize("drop_rate, grows", [(0.0, True), (0.3, False)])
+def test_auto_batch_grows_only_on_verified_delivery(backend, drop_rate, grows):
+    fake = backend(playlist_sizes=[300], drop_rate=drop_rate)
+    (playlist,) = copy_playlists.list_spotify_playlists(show=False)
+    plan = copy_playlists.plan_playlist_sync(playlist)
+    copy_playlists.transfer_tracks_to_ytm(
+        playlist['name'], plan["tracks"], "playlist", plan=plan, batch_size=5, auto_batch=True,
+        max_workers=4, verification_delay=0, log=lambda *args: None
+    )
+    saved_size = copy_playlists.load_saved_batch_size(copy_playlists.get_account_key())
+    assert (saved_size > 5) == grows
+    assert saved_size <= MAX_BATCH_SIZE
+
+def test_subscribe_reports_only_new_subscriptions(backend):
+    fake = backend(followed_artists=30)
+    fake.ytm_subscriptions.update(fake.followed_artists[:10])
+    outcome = copy_playlists.subscribe_to_ytm_artists(fake.followed_artists)
+    assert outcome["subscribed"] == 20
+    assert outcome["skipped"] == 10
+    assert outcome["failed"] == []
+    assert fake.ytm_subscriptions == set(fake.followed_artists)
+
+def test_concurrent_transfers_search_each_track_once(backend):
+    fake = backend(
+        config={"search_cache_enabled": False},
+        playlist_sizes=[40, 40],
+        latency={"search": ["fixed", 0.002]}
+    )
+    fake.spotify_playlists[1]["tracks"] = list(fake.spotify_playlists[0]["tracks"])
+    queries = []
+    search = fake.ytmusic.search
+
+    def recording_search(query, filter=None, limit=20):
+        queries.append((query, filter))
+        return search(query, filter=filter, limit=limit)
+
+    fake.ytmusic.search = recording_search
+    playlists = copy_playlists.list_spotify_playlists(show=False)
+    resolved = copy_playlists.SharedResolutions()
+    results = []
+    threads = [
+        threading.Thread(target=lambda playlist=playlist: results.append(transfer(fake, playlist, resolved)))
+        for playlist in playlists
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [result["status"] for result in results] == ["ok", "ok"]
+    assert len(queries) == len(set(queries))
+    expected = expected_video_ids(fake, fake.spotify_playlists[0])
+    for ytm_playlist in fake.ytm_playlists.values():
+        assert [item["videoId"] for item in ytm_playlist["items"]] == expected
+
+def test_shared_resolutions_hand_one_search_to_every_waiter():
+    resolved = copy_playlists.SharedResolutions()
+    future, owned = resolved.claim("key")
+    assert owned
+    assert resolved.claim("key") == (future, False)
+
+    search = Future()
+    search.set_result("video")
+    resolved.publish("key", future, search)
+    assert future.result() == "video"
+    assert resolved["key"] == "video"
+    assert resolved.claim("key") == (None, False)
+
+def test_cancelled_search_can_be_claimed_again():
+    resolved = copy_playlists.SharedResolutions()
+    future, _ = resolved.claim("key")
+    search = Future()
+    search.cancel()
+    resolved.publish("key", future, search)
+    assert future.cancelled()
+    assert "key" not in resolved
+    assert resolved.claim("key")[1]
@@ -0,0 +1,83 @@
+from transfer_journal import TransferJournal, open_transfer_journal
+
+def make_journal(tmp_path):
+    return TransferJournal(str(tmp_path / "transfer_journal.db"))
+
+def test_load_unknown_transfer(tmp_path):
+    journal = make_journal(tmp_path)
+    assert journal.load("Nothing") is None
+    journal.close()
+
+def test_save_and_load_round_trip(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.save("Mix", "playlist", 3, 10, ["a", "b"], ["Missing Song"], batch_index=1, write_offset=2)
+    progress = journal.load("Mix")
+    assert progress["playlist_name"] == "Mix"
+    assert progress["operation_type"] == "playlist"
+    assert progress["current_track_index"] == 3
+    assert progress["total_tracks"] == 10
+    assert progress["ytm_video_ids"] == ["a", "b"]
+    assert progress["not_found_tracks"] == ["Missing Song"]
+    assert progress["current_batch_index"] == 1
+    assert progress["current_track_offset"] == 2
+    journal.close()
+
+def test_resume_after_reopen(tmp_path):
+    journal = make_journal(tmp_path)
+    transfer = journal.start("Mix", resume_points=[0, 2, 3, 5])
+    journal.save("Mix", "playlist", 0, 5, [], [])
+    transfer.track_resolved(1, video_id="a")
+    transfer.track_resolved(2, missing_query="Missing Song")
+    transfer.track_resolved(3, video_id="b")
+    transfer.batch_written(1, 1)
+    journal.close()
+
+    # A crash after the last checkpoint resumes from what the journal holds
+    journal = make_journal(tmp_path)
+    progress = journal.load("Mix")
+    assert progress["current_track_index"] == 5
+    assert progress["ytm_video_ids"] == ["a", "b"]
+    assert progress["not_found_tracks"] == ["Missing Song"]
+    assert progress["current_batch_index"] == 1
+    assert progress["current_track_offset"] == 1
+    journal.close()
+
+def test_resolved_index_past_resume_points_is_clamped(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.save("Mix", "playlist", 0, 4, [], [])
+    transfer = journal.start("Mix", resume_points=[0, 4])
+    transfer.track_resolved(7, video_id="a")
+    assert journal.load("Mix")["current_track_index"] == 4
+    journal.close()
+
+def test_replaying_save_does_not_duplicate_items(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.save("Mix", "playlist", 1, 5, ["a"], [])
+    journal.save("Mix", "playlist", 2, 5, ["a", "b"], ["Missing Song"])
+    journal.save("Mix", "playlist", 2, 5, ["a", "b"], ["Missing Song"])
+    progress = journal.load("Mix")
+    assert progress["ytm_video_ids"] == ["a", "b"]
+    assert progress["not_found_tracks"] == ["Missing Song"]
+    journal.close()
+
+def test_save_with_fewer_items_replaces_them(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.save("Mix", "playlist", 3, 5, ["a", "b", "c"], ["Missing Song"])
+    journal.save("Mix", "playlist", 1, 5, ["x"], [])
+    progress = journal.load("Mix")
+    assert progress["ytm_video_ids"] == ["x"]
+    assert progress["not_found_tracks"] == []
+    journal.close()
+
+def test_transfers_are_kept_apart(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.save("One", "playlist", 1, 2, ["a"], [])
+    journal.save("Two", "liked_songs", 1, 2, ["b"], [])
+    journal.delete("One")
+    assert journal.load("One") is None
+    assert journal.load("Two")["ytm_video_ids"] == ["b"]
+    journal.close()
+
+def test_open_transfer_journal_reports_unusable_path(tmp_path, capsys):
+    assert open_transfer_journal({"transfer_journal_path": str(tmp_path / "missing" / "journal.db")}) is None
+    assert "falling back to progress files" in capsys.readouterr().out
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from transfer_scheduler import (
+    PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, TransferCancelled, TransferJob, TransferScheduler
+)
+
+TIMEOUT = 5
+
+def wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the scheduler"
+        time.sleep(0.01)
+
+def wait_until_idle(scheduler):
+    wait_for(scheduler.is_idle)
+
+def blocking_job(name, started, release, priority=PRIORITY_NORMAL):
+    def run(job):
+        started.set()
+        assert release.wait(TIMEOUT)
+        return name
+    return TransferJob("playlist", name, run, priority)
+
+def recording_job(name, order, priority):
+    return TransferJob("playlist", name, lambda job: order.append(name), priority)
+
+def test_queued_jobs_run_by_priority_then_submission_order():
+    scheduler = TransferScheduler(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    order = []
+    scheduler.submit(blocking_job("first", started, release))
+    assert started.wait(TIMEOUT)
+    scheduler.submit(recording_job("low", order, PRIORITY_LOW))
+    scheduler.submit(recording_job("normal 1", order, PRIORITY_NORMAL))
+    scheduler.submit(recording_job("high", order, PRIORITY_HIGH))
+    scheduler.submit(recording_job("normal 2", order, PRIORITY_NORMAL))
+    release.set()
+    wait_until_idle(scheduler)
+    assert order == ["high", "normal 1", "normal 2", "low"]
+
+def test_jobs_report_result_and_failure():
+    updates = []
+    scheduler = TransferScheduler(on_update=lambda job: updates.append((job.name, job.status)))
+
+    def fail(job):
+        raise ValueError("boom")
+
+    done = scheduler.submit(TransferJob("playlist", "ok", lambda job: 42))
+    failed = scheduler.submit(TransferJob("playlist", "bad", fail))
+    # Finished jobs are reported after they leave the queue
+    wait_for(lambda: ("ok", "done") in updates and ("bad", "failed") in updates)
+    assert (done.status, done.result) == ("done", 42)
+    assert failed.status == "failed"
+    assert isinstance(failed.error, ValueError)
+    assert updates.index(("ok", "queued")) < updates.index(("ok", "running")) < updates.index(("ok", "done"))
+
+def test_cancel_queued_job_never_runs():
+    scheduler = TransferScheduler(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+    scheduler.submit(blocking_job("first", started, release))
+    assert started.wait(TIMEOUT)
+    queued = scheduler.submit(TransferJob("playlist", "queued", lambda job: ran.append(job.name)))
+    assert scheduler.cancel(queued.id)
+    assert queued.status == "cancelled"
+    assert queued not in scheduler.jobs()
+    release.set()
+    wait_until_idle(scheduler)
+    assert ran == []
+
+def test_cancel_running_job_stops_at_next_checkpoint():
+    scheduler = TransferScheduler()
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        while True:
+            job.checkpoint()
+            time.sleep(0.01)
+
+    job = scheduler.submit(TransferJob("playlist", "long", run))
+    assert started.wait(TIMEOUT)
+    assert scheduler.cancel(job.id)
+    wait_until_idle(scheduler)
+    assert job.status == "cancelled"
+    assert job.error is None
+
+def test_cancel_unknown_job():
+    assert not TransferScheduler().cancel(12345)
+
+def test_cancel_all_clears_queue():
+    scheduler = TransferScheduler(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    running = scheduler.submit(blocking_job("first", started, release))
+    assert started.wait(TIMEOUT)
+    queued = [scheduler.submit(TransferJob("playlist", f"queued {index}", lambda job: None)) for index in range(3)]
+    scheduler.cancel_all()
+    assert running.cancelled
+    assert all(job.status == "cancelled" for job in queued)
+    release.set()
+    wait_until_idle(scheduler)
+    # The job finished its run after being cancelled, so it still counts as cancelled
+    assert running.status == "cancelled"
+
+def test_paused_scheduler_starts_nothing_until_resumed():
+    scheduler = TransferScheduler()
+    scheduler.pause()
+    ran = threading.Event()
+    job = scheduler.submit(TransferJob("playlist", "waiting", lambda job: ran.set()))
+    assert not ran.wait(0.2)
+    assert job.status == "queued"
+    scheduler.resume()
+    assert ran.wait(TIMEOUT)
+    wait_until_idle(scheduler)
+    assert job.status == "done"
+
+def test_checkpoint_raises_once_cancelled():
+    job = TransferJob("playlist", "solo", lambda job: None)
+    job.checkpoint()
+    job.cancel()
+    with pytest.raises(TransferCancelled):
+        job.checkpoint()
+
+def test_requeue_keeps_work_with_fresh_state():
+    job = TransferJob("playlist", "again", lambda job: None, PRIORITY_LOW)
+    job.cancel()
+    copy = job.requeue(PRIORITY_HIGH)
+    assert (copy.kind, copy.name, copy.run) == (job.kind, job.name, job.run)
+    assert copy.priority == PRIORITY_HIGH
+    assert not copy.cancelled and copy.status == "queued"
@@ -0,0 +1,45 @@
+from ui_events import OutputLog, open_output_log
+
+def test_write_returns_only_lines_the_view_keeps(tmp_path):
+    log = OutputLog(max_lines=3, path=str(tmp_path / "transfer.log"))
+    assert log.write(["one", "two"]) == ["one", "two"]
+    assert log.write([f"line {index}" for index in range(5)]) == ["line 2", "line 3", "line 4"]
+    log.close()
+
+def test_every_line_reaches_the_log_file(tmp_path):
+    path = tmp_path / "transfer.log"
+    log = OutputLog(max_lines=2, path=str(path))
+    log.write([f"line {index}" for index in range(5)])
+    log.close()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [line.split(" ", 2)[2] for line in lines] == [f"line {index}" for index in range(5)]
+
+def test_log_file_rotates(tmp_path):
+    path = tmp_path / "transfer.log"
+    log = OutputLog(path=str(path), max_bytes=200, backup_count=2)
+    log.write(["x" * 50] * 20)
+    log.close()
+    assert (tmp_path / "transfer.log.1").exists()
+    assert (tmp_path / "transfer.log.2").exists()
+    assert not (tmp_path / "transfer.log.3").exists()
+
+def test_logs_are_kept_apart(tmp_path):
+    first = OutputLog(path=str(tmp_path / "first.log"))
+    second = OutputLog(path=str(tmp_path / "second.log"))
+    first.write(["only in first"])
+    first.close()
+    second.close()
+    assert "only in first" in (tmp_path / "first.log").read_text(encoding="utf-8")
+    assert (tmp_path / "second.log").read_text(encoding="utf-8") == ""
+
+def test_no_path_keeps_the_view_bounded_only(tmp_path):
+    log = OutputLog(max_lines=1, path=None)
+    assert log.write(["one", "two"]) == ["two"]
+    log.close()
+
+def test_open_output_log_honours_config(tmp_path):
+    log = open_output_log({"log_max_lines": 5, "log_path": str(tmp_path / "custom.log")})
+    assert log.max_lines == 5
+    log.write(["hello"])
+    log.close()
+    assert "hello" in (tmp_path / "custom.log").read_text(encoding="utf-8")
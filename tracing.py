@@ -0,0 +1,93 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_MAX_EVENTS = 2000000
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.max_events = DEFAULT_MAX_EVENTS
+        self.dropped = 0
+        self._events = []
+        self._threads = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self, max_events=DEFAULT_MAX_EVENTS):
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self.dropped = 0
+            self.max_events = max_events
+            self._origin = time.perf_counter()
+            self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def now(self):
+        return time.perf_counter()
+
+    def _timestamp(self, moment):
+        return round((moment - self._origin) * 1e6, 3)
+
+    def _append(self, *events):
+        thread = threading.current_thread()
+        with self._lock:
+            if len(self._events) + len(events) > self.max_events:
+                self.dropped += len(events)
+                return
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.extend(events)
+
+    def complete(self, name, start, end, category="api", **args):
+        if not self.enabled:
+            return
+        self._append({
+            "name": name, "cat": category, "ph": "X", "ts": self._timestamp(start),
+            "dur": round((end - start) * 1e6, 3), "pid": os.getpid(), "tid": threading.get_ident(), "args": args
+        })
+
+    @contextlib.contextmanager
+    def span(self, name, category="api", **args):
+        if not self.enabled:
+            yield
+            return
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, start, self.now(), category, **args)
+
+    def track_phase(self, scope, key, phase, start, end, **args):
+        # One async lane per playlist/track pair; its phases line up along that lane in Perfetto
+        if not self.enabled:
+            return
+        lane = f"{scope}/{key}"
+        base = {"name": phase, "cat": "track", "id": lane, "pid": os.getpid(), "tid": threading.get_ident()}
+        self._append(
+            dict(base, ph="b", ts=self._timestamp(start), args=dict(args, playlist=scope, track=key)),
+            dict(base, ph="e", ts=self._timestamp(end))
+        )
+
+    def chrome_trace(self):
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": ident, "args": {"name": name}}
+            for ident, name in threads.items()
+        ]
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": self.dropped}
+        }
+
+    def export_chrome(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
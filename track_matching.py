@@ -0,0 +1,109 @@
+import re
+from difflib import SequenceMatcher
+
+from search_cache import normalize_query
+
+TITLE_WEIGHT = 0.45
+ARTIST_WEIGHT = 0.35
+DURATION_WEIGHT = 0.2
+
+ISRC_ACCEPT_SCORE = 0.6
+TEXT_ACCEPT_SCORE = 0.45
+
+_DECORATION_PATTERN = re.compile(
+    r"\s*[\(\[][^\)\]]*\b(feat\.?|ft\.?|with|remaster(ed)?|version|edit|mono|stereo)\b[^\)\]]*[\)\]]"
+)
+_SUFFIX_PATTERN = re.compile(r"\s+-\s+[^-]*\b(remaster(ed)?|version|edit|mono|stereo)\b.*$")
+
+def make_track_record(track):
+    artists = [artist.get('name') for artist in track.get('artists') or [] if artist and artist.get('name')]
+    track_name = track.get('name') or ""
+    artist_name = artists[0] if artists else ""
+    return {
+        "id": track.get('id'),
+        "name": track_name,
+        "artists": artists,
+        "album": (track.get('album') or {}).get('name'),
+        "duration_ms": track.get('duration_ms'),
+        "isrc": (track.get('external_ids') or {}).get('isrc'),
+        "query": f"{artist_name} - {track_name}"
+    }
+
+def track_query(track):
+    if isinstance(track, dict):
+        return track.get("query") or ""
+    return track
+
+def clean_title(title):
+    text = normalize_query(title)
+    text = _DECORATION_PATTERN.sub("", text)
+    text = _SUFFIX_PATTERN.sub("", text)
+    return text.strip()
+
+def _similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+def title_similarity(expected, candidate):
+    raw = _similarity(normalize_query(expected), normalize_query(candidate))
+    cleaned = _similarity(clean_title(expected), clean_title(candidate))
+    return max(raw, cleaned)
+
+def artist_overlap(expected_artists, candidate_artists):
+    expected = [normalize_query(name) for name in expected_artists if name]
+    candidates = [normalize_query(name) for name in candidate_artists if name]
+    if not expected or not candidates:
+        return 0.0
+    matched = 0
+    for name in expected:
+        for candidate in candidates:
+            if name == candidate or name in candidate or candidate in name or _similarity(name, candidate) >= 0.85:
+                matched += 1
+                break
+    return matched / len(expected)
+
+def duration_score(expected_ms, candidate_seconds):
+    if not expected_ms or not candidate_seconds:
+        return 0.5
+    delta = abs(expected_ms / 1000.0 - candidate_seconds)
+    if delta <= 2:
+        return 1.0
+    if delta >= 30:
+        return 0.0
+    return 1.0 - (delta - 2) / 28.0
+
+def candidate_duration_seconds(candidate):
+    if candidate.get('duration_seconds'):
+        return candidate['duration_seconds']
+    duration = candidate.get('duration')
+    if not duration:
+        return None
+    try:
+        seconds = 0
+        for part in duration.split(':'):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    except ValueError:
+        return None
+
+def score_candidate(track, candidate):
+    candidate_artists = [artist.get('name') for artist in candidate.get('artists') or [] if artist]
+    title = title_similarity(track.get("name", ""), candidate.get('title') or "")
+    artists = artist_overlap(track.get("artists") or [], candidate_artists)
+    duration = duration_score(track.get("duration_ms"), candidate_duration_seconds(candidate))
+    return TITLE_WEIGHT * title + ARTIST_WEIGHT * artists + DURATION_WEIGHT * duration
+
+def best_candidate(track, candidates, min_score):
+    best = None
+    best_score = 0.0
+    for candidate in candidates or []:
+        if not candidate or not candidate.get('videoId'):
+            continue
+        score = score_candidate(track, candidate)
+        if score > best_score:
+            best = candidate
+            best_score = score
+    if best_score < min_score:
+        return None, best_score
+    return best, best_score
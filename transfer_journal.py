@@ -0,0 +1,134 @@
+import sqlite3
+import threading
+import time
+
+DEFAULT_JOURNAL_PATH = "transfer_journal.db"
+
+class TransferJournal:
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transfers ("
+            " name TEXT PRIMARY KEY,"
+            " operation_type TEXT,"
+            " total_tracks INTEGER,"
+            " search_index INTEGER NOT NULL DEFAULT 0,"
+            " batch_index INTEGER NOT NULL DEFAULT 0,"
+            " write_offset INTEGER,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transfer_items ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " name TEXT NOT NULL,"
+            " video_id TEXT,"
+            " missing_query TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transfer_items_name ON transfer_items(name, id)")
+        self._conn.commit()
+
+    def save(self, name, operation_type, search_index, total_tracks, video_ids, not_found_tracks,
+             batch_index=0, write_offset=None):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transfers"
+                " (name, operation_type, total_tracks, search_index, batch_index, write_offset, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, operation_type, total_tracks, search_index, batch_index or 0, write_offset, now)
+            )
+            stored_videos, stored_missing = self._conn.execute(
+                "SELECT COUNT(video_id), COUNT(missing_query) FROM transfer_items WHERE name = ?", (name,)
+            ).fetchone()
+            if stored_videos > len(video_ids) or stored_missing > len(not_found_tracks):
+                self._conn.execute("DELETE FROM transfer_items WHERE name = ?", (name,))
+                stored_videos = stored_missing = 0
+            # Only rows the journal hasn't seen yet are written, so checkpoints stay cheap
+            self._conn.executemany(
+                "INSERT INTO transfer_items (name, video_id) VALUES (?, ?)",
+                [(name, video_id) for video_id in video_ids[stored_videos:]]
+            )
+            self._conn.executemany(
+                "INSERT INTO transfer_items (name, missing_query) VALUES (?, ?)",
+                [(name, query) for query in not_found_tracks[stored_missing:]]
+            )
+
+    def record_track(self, name, search_index, video_id=None, missing_query=None):
+        with self._lock, self._conn:
+            if video_id or missing_query:
+                self._conn.execute(
+                    "INSERT INTO transfer_items (name, video_id, missing_query) VALUES (?, ?, ?)",
+                    (name, video_id, missing_query)
+                )
+            self._conn.execute(
+                "UPDATE transfers SET search_index = ?, updated_at = ? WHERE name = ?",
+                (search_index, time.time(), name)
+            )
+
+    def record_batch(self, name, batch_index, write_offset):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE transfers SET batch_index = ?, write_offset = ?, updated_at = ? WHERE name = ?",
+                (batch_index, write_offset, time.time(), name)
+            )
+
+    def load(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT operation_type, total_tracks, search_index, batch_index, write_offset, updated_at"
+                " FROM transfers WHERE name = ?",
+                (name,)
+            ).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT video_id, missing_query FROM transfer_items WHERE name = ? ORDER BY id", (name,)
+            ).fetchall()
+        return {
+            "playlist_name": name,
+            "current_track_index": row[2],
+            "total_tracks": row[1],
+            "ytm_video_ids": [video_id for video_id, _ in items if video_id],
+            "not_found_tracks": [query for _, query in items if query],
+            "operation_type": row[0],
+            "current_batch_index": row[3],
+            "current_track_offset": row[4],
+            "timestamp": row[5]
+        }
+
+    def delete(self, name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transfers WHERE name = ?", (name,))
+            self._conn.execute("DELETE FROM transfer_items WHERE name = ?", (name,))
+
+    def start(self, name, resume_points):
+        return JournalledTransfer(self, name, resume_points)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class JournalledTransfer:
+    def __init__(self, journal, name, resume_points):
+        self.journal = journal
+        self.name = name
+        self.resume_points = resume_points
+
+    def track_resolved(self, searched, video_id=None, missing_query=None):
+        search_index = self.resume_points[min(searched, len(self.resume_points) - 1)]
+        self.journal.record_track(self.name, search_index, video_id, missing_query)
+
+    def batch_written(self, batch_index, write_offset):
+        self.journal.record_batch(self.name, batch_index, write_offset)
+
+def open_transfer_journal(config_data=None):
+    config_data = config_data or {}
+    try:
+        return TransferJournal(config_data.get("transfer_journal_path", DEFAULT_JOURNAL_PATH))
+    except Exception as e:
+        print(f"Transfer journal unavailable, falling back to progress files: {e}")
+        return None
@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import threading
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+class TransferCancelled(Exception):
+    def __init__(self, message, batch_index=None, track_index=None, search_index=None):
+        super().__init__(message)
+        self.batch_index = batch_index
+        self.track_index = track_index
+        self.search_index = search_index
+
+class TransferJob:
+    def __init__(self, kind, name, run, priority=PRIORITY_NORMAL):
+        self.id = None
+        self.kind = kind
+        self.name = name
+        self.run = run
+        self.priority = priority
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.scheduler = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def checkpoint(self):
+        # Called by the transfer between tracks: blocks while paused, raises once cancelled
+        if self.scheduler:
+            self.scheduler.wait_while_paused(self._cancel_event)
+        if self._cancel_event.is_set():
+            raise TransferCancelled(f"{self.name} was cancelled")
+
+    def requeue(self, priority=None):
+        return TransferJob(self.kind, self.name, self.run, self.priority if priority is None else priority)
+
+class TransferScheduler:
+    def __init__(self, max_workers=1, on_update=None):
+        self.max_workers = max(1, int(max_workers))
+        self.on_update = on_update
+        self.paused = False
+        self._heap = []
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._workers = set()
+        self._condition = threading.Condition()
+
+    def submit(self, job):
+        with self._condition:
+            job.id = next(self._ids)
+            job.scheduler = self
+            job.status = "queued"
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (job.priority, job.id, job))
+            self._start_workers_locked()
+            self._condition.notify()
+        self._notify(job)
+        return job
+
+    def set_max_workers(self, max_workers):
+        with self._condition:
+            self.max_workers = max(1, int(max_workers))
+            self._start_workers_locked()
+            self._condition.notify_all()
+
+    def cancel(self, job_id):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.cancel()
+            queued = job.status == "queued"
+            if queued:
+                job.status = "cancelled"
+                del self._jobs[job_id]
+            self._condition.notify_all()
+        if queued:
+            self._notify(job)
+        return True
+
+    def cancel_all(self):
+        with self._condition:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def pause(self):
+        with self._condition:
+            self.paused = True
+
+    def resume(self):
+        with self._condition:
+            self.paused = False
+            self._condition.notify_all()
+
+    def wait_while_paused(self, cancel_event=None):
+        with self._condition:
+            while self.paused and not (cancel_event and cancel_event.is_set()):
+                self._condition.wait(0.5)
+
+    def jobs(self):
+        with self._condition:
+            return sorted(self._jobs.values(), key=lambda job: (job.status != "running", job.priority, job.id))
+
+    def is_idle(self):
+        with self._condition:
+            return not self._jobs
+
+    def _start_workers_locked(self):
+        while len(self._workers) < min(self.max_workers, len(self._jobs)):
+            worker = threading.Thread(target=self._worker, daemon=True)
+            self._workers.add(worker)
+            worker.start()
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                if len(self._workers) > self.max_workers or (not self._heap and not self.paused):
+                    # Surplus or idle workers exit; submit() starts new ones on demand
+                    self._workers.discard(threading.current_thread())
+                    return None
+                if self._heap and not self.paused:
+                    _, _, job = heapq.heappop(self._heap)
+                    if job.status != "queued":
+                        continue
+                    job.status = "running"
+                    return job
+                self._condition.wait()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._notify(job)
+            try:
+                job.result = job.run(job)
+                job.status = "cancelled" if job.cancelled else "done"
+            except TransferCancelled:
+                job.status = "cancelled"
+            except Exception as e:
+                job.error = e
+                job.status = "failed"
+            with self._condition:
+                self._jobs.pop(job.id, None)
+                self._condition.notify_all()
+            self._notify(job)
+
+    def _notify(self, job):
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                print(f"Error reporting job update: {e}")
@@ -4,6 +4,10 @@ import threading
 import copy_playlists
 import json
 import os
+from profiling import DEFAULT_REPORT_PATH as DEFAULT_PROFILE_REPORT
+from rate_limit import MAX_BATCH_SIZE
+from transfer_scheduler import FINISHED_STATUSES, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, TransferJob, TransferScheduler
+from ui_events import UI_TICK_MS, UIEventQueue, open_output_log
 
 def load_config():
     if os.path.exists("config.json"):
@@ -29,17 +33,19 @@ def save_config(config):
         return False
 
 class SettingsDialog:
-    def __init__(self, parent, config_data, callback):
+    def __init__(self, parent, config_data, callback, on_cancel=None):
         self.parent = parent
         self.callback = callback
+        self.on_cancel = on_cancel
         self.config_data = config_data.copy()
         
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Settings - Credentials & Headers")
-        self.dialog.geometry("600x700")
+        self.dialog.geometry("600x740")
         self.dialog.configure(bg='#1e1e1e')
         self.dialog.resizable(False, False)
         self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
         
         self.dialog.transient(parent)
         self.dialog.geometry("+%d+%d" % (parent.winfo_rootx() + 50, parent.winfo_rooty() + 50))
@@ -118,6 +124,14 @@ class SettingsDialog:
                                            bg='#ff6b6b', fg='white', 
                                            font=('Segoe UI', 9))
         youtube_instructions_btn.pack(pady=5)
+
+        self.profile_var = tk.BooleanVar(value=self.config_data.get("profile_transfers", False))
+        tk.Checkbutton(
+            main_frame, text=f"🔬 Profile transfers (CPU and memory report in {self.config_data.get('profile_report_path', DEFAULT_PROFILE_REPORT)})",
+            variable=self.profile_var,
+            bg='#1e1e1e', fg='white', selectcolor='#404040', activebackground='#1e1e1e', activeforeground='white',
+            font=('Segoe UI', 9)
+        ).pack(anchor="w", pady=(10, 0))
         
         button_frame = tk.Frame(main_frame, bg='#1e1e1e')
         button_frame.pack(fill="x", pady=(10, 0))
@@ -131,10 +145,15 @@ class SettingsDialog:
         
         cancel_btn = tk.Button(button_frame, 
                              text="❌ Cancel",
-                             command=self.dialog.destroy,
+                             command=self.cancel,
                              bg='#d13438', fg='white', 
                              font=('Segoe UI', 10))
         cancel_btn.pack(side="right")
+
+    def cancel(self):
+        self.dialog.destroy()
+        if self.on_cancel:
+            self.on_cancel()
         
     def update_delay_description(self, value):
         delay = int(float(value))
@@ -164,6 +183,7 @@ class SettingsDialog:
         self.config_data["spotify_client_secret"] = self.client_secret_entry.get().strip()
         self.config_data["spotify_redirect_uri"] = self.redirect_uri_entry.get().strip()
         self.config_data["youtube_headers"] = self.headers_text.get("1.0", tk.END).strip()
+        self.config_data["profile_transfers"] = bool(self.profile_var.get())
         
         if not self.config_data["spotify_client_id"]:
             messagebox.showerror("Error", "Spotify Client ID is required!")
@@ -314,9 +334,24 @@ class Spotify2YTMUI(tk.Tk):
             "maximum_value": 0,
             "paused": False
         }
-        
+        # Worker threads never touch widgets; they queue events that the Tk loop applies
+        self.ui_events = UIEventQueue()
         
         self.config_data = load_config()
+        self.output_log = open_output_log(self.config_data)
+        # All transfers run as jobs on one pool; the rate controllers in copy_playlists are shared by every job
+        self.scheduler = TransferScheduler(
+            max_workers=copy_playlists.get_worker_setting("transfer_jobs", 1, self.config_data),
+            on_update=self._on_job_update
+        )
+        self.expired_jobs = []
+        self.expired_jobs_lock = threading.Lock()
+        # Running jobs share one progress bar, so it shows their combined progress
+        self.job_progress = {}
+        self.job_progress_lock = threading.Lock()
+        self.trace_path = self.config_data.get("trace_path")
+        if self.trace_path:
+            copy_playlists.tracer.enable()
         
         self.title("Spotify ➡️ YTMusic By ZWB75")
         self.geometry("700x950")
@@ -380,11 +415,19 @@ class Spotify2YTMUI(tk.Tk):
                                  bg='#1e1e1e')
         subtitle_label.pack(pady=(0, 20))
 
-        settings_btn = ttk.Button(main_frame, 
+        top_buttons = tk.Frame(main_frame, bg='#1e1e1e')
+        top_buttons.pack(pady=(0, 20))
+
+        settings_btn = ttk.Button(top_buttons, 
                              text="⚙️ Settings", 
                              command=self.open_settings,
                              style='Custom.TButton')
-        settings_btn.pack(pady=(0, 20))
+        settings_btn.pack(side="left", padx=(0, 10))
+
+        ttk.Button(top_buttons, 
+                  text="🧪 Test API Quota", 
+                  command=self.test_api_quota,
+                  style='Custom.TButton').pack(side="left")
 
         self.create_batch_size_section(main_frame)
 
@@ -420,7 +463,25 @@ class Spotify2YTMUI(tk.Tk):
                                          orient="horizontal", 
                                          mode="determinate",
                                          style='Custom.Horizontal.TProgressbar')
-        self.progressbar.pack(fill="x", pady=(0, 15))
+        self.progressbar.pack(fill="x", pady=(0, 10))
+
+        jobs_frame = tk.Frame(main_frame, bg='#1e1e1e')
+        jobs_frame.pack(fill="x", pady=(0, 15))
+
+        ttk.Button(jobs_frame, 
+                  text="⏸️ Pause", 
+                  command=self.pause_jobs,
+                  style='Custom.TButton').pack(side="left", padx=(0, 10))
+
+        ttk.Button(jobs_frame, 
+                  text="▶️ Resume", 
+                  command=self.resume_jobs,
+                  style='Custom.TButton').pack(side="left", padx=(0, 10))
+
+        ttk.Button(jobs_frame, 
+                  text="⏹️ Cancel All", 
+                  command=self.cancel_jobs,
+                  style='Red.TButton').pack(side="left")
 
         self.style.configure('Custom.Horizontal.TProgressbar',
                            background='#0078d4',
@@ -467,6 +528,7 @@ class Spotify2YTMUI(tk.Tk):
         self.response_text.pack(side="left", fill="both", expand=True, padx=10, pady=10)
         scrollbar.pack(side="right", fill="y", pady=10)
 
+        self.after(UI_TICK_MS, self._process_ui_events)
 
     def create_batch_size_section(self, parent):
         frame = tk.LabelFrame(parent, text="Batch Size", bg='#2d2d2d', fg='white', font=('Segoe UI', 11, 'bold'))
@@ -475,7 +537,7 @@ class Spotify2YTMUI(tk.Tk):
         tk.Label(frame, text="Batch size (tracks per batch):", bg='#2d2d2d', fg='white', font=('Segoe UI', 10)).pack(anchor="w", padx=10, pady=(10, 0))
 
         self.batch_slider = tk.Scale(
-            frame, from_=1, to=20, orient=tk.HORIZONTAL,
+            frame, from_=1, to=MAX_BATCH_SIZE, orient=tk.HORIZONTAL,
             bg='#2d2d2d', fg='white', highlightthickness=0,
             showvalue=0, length=350, command=self.update_batch_display
         )
@@ -488,6 +550,14 @@ class Spotify2YTMUI(tk.Tk):
         self.batch_description = tk.Label(frame, text="", bg='#2d2d2d', fg='#cccccc', font=('Segoe UI', 9), wraplength=600, justify="left")
         self.batch_description.pack(anchor="w", padx=20, pady=(0, 10))
 
+        self.batch_auto_var = tk.BooleanVar(value=self.config_data.get("batch_size_auto", False))
+        tk.Checkbutton(
+            frame, text="🤖 Auto: grow while no tracks are dropped, shrink when they go missing (slider sets the starting size)",
+            variable=self.batch_auto_var, command=self.toggle_batch_auto,
+            bg='#2d2d2d', fg='white', selectcolor='#404040', activebackground='#2d2d2d', activeforeground='white',
+            font=('Segoe UI', 9), wraplength=600, justify="left"
+        ).pack(anchor="w", padx=20, pady=(0, 10))
+
         presets_frame = tk.Frame(frame, bg='#2d2d2d')
         presets_frame.pack(anchor="w", padx=20, pady=(0, 10))
         tk.Label(presets_frame, text="Presets:", bg='#2d2d2d', fg='#cccccc', font=('Segoe UI', 9)).pack(side="left")
@@ -525,6 +595,14 @@ class Spotify2YTMUI(tk.Tk):
         self.config_data["batch_size"] = batch_size
         save_config(self.config_data)
 
+    def toggle_batch_auto(self):
+        self.config_data["batch_size_auto"] = bool(self.batch_auto_var.get())
+        save_config(self.config_data)
+        if self.config_data["batch_size_auto"]:
+            self.append_response("🤖 Auto batch size enabled - the size adapts to the observed drop rate")
+        else:
+            self.append_response(f"⚙️ Auto batch size disabled - using {int(self.batch_slider.get())} tracks per batch")
+
     def set_batch_preset(self, value):
         self.batch_slider.set(value)
         self.update_batch_display(value)
@@ -533,11 +611,86 @@ class Spotify2YTMUI(tk.Tk):
         
 
     def append_response(self, msg):
+        self.ui_events.post("log", msg)
+
+    def set_status(self, text):
+        self.ui_events.post("status", text)
+
+    def set_progress(self, value, maximum):
+        self.ui_events.post("progress", value, maximum)
+
+    def call_in_ui(self, func, *args):
+        self.ui_events.post("call", func, *args)
+
+    def report_job_progress(self, job, text, value=None, maximum=None):
+        with self.job_progress_lock:
+            entry = self.job_progress.setdefault(job.id, {"text": text, "value": 0, "maximum": 0})
+            entry["text"] = text
+            if value is not None:
+                entry["value"] = value
+                entry["maximum"] = maximum
+            self._post_job_progress_locked()
+
+    def _forget_job_progress(self, job):
+        with self.job_progress_lock:
+            if self.job_progress.pop(job.id, None) is not None:
+                self._post_job_progress_locked()
+
+    def _post_job_progress_locked(self):
+        entries = list(self.job_progress.values())
+        if not entries:
+            return
+        value = sum(entry["value"] for entry in entries)
+        maximum = sum(entry["maximum"] for entry in entries)
+        self.set_progress(value, maximum)
+        if len(entries) == 1:
+            self.set_status(entries[0]["text"])
+        else:
+            self.set_status(f"{len(entries)} transfers running · {value}/{maximum} · {entries[-1]['text']}")
+
+    def _write_log(self, lines):
+        lines = self.output_log.write(lines)
         self.response_text.config(state="normal")
-        self.response_text.insert(tk.END, msg + "\n")
+        self.response_text.insert(tk.END, "\n".join(lines) + "\n")
+        # The view is a ring buffer; the full log is in the rotating log file
+        line_count = int(self.response_text.index("end-1c").split(".")[0]) - 1
+        if line_count > self.output_log.max_lines:
+            self.response_text.delete("1.0", f"{line_count - self.output_log.max_lines + 1}.0")
         self.response_text.see(tk.END)
         self.response_text.config(state="disabled")
 
+    def _process_ui_events(self):
+        try:
+            # Profiled too, so log writes and widget updates show up next to the transfer threads
+            with copy_playlists.profiler.profile_thread():
+                self._apply_ui_events()
+        finally:
+            self.after(UI_TICK_MS, self._process_ui_events)
+
+    def _apply_ui_events(self):
+        lines = []
+        for kind, payload in self.ui_events.drain():
+            if kind == "log":
+                lines.append(payload[0])
+            elif kind == "status":
+                self.progress.set(payload[0])
+            elif kind == "progress":
+                if not self.progress_bar_state["paused"]:
+                    self.progressbar["maximum"] = max(1, payload[1])
+                    self.progressbar["value"] = payload[0]
+            elif kind == "call":
+                # Dialogs block, so everything logged before them is shown first
+                if lines:
+                    self._write_log(lines)
+                    lines = []
+                func, args = payload[0], payload[1:]
+                try:
+                    func(*args)
+                except Exception as e:
+                    print(f"Error in UI callback {getattr(func, '__name__', func)}: {e}")
+        if lines:
+            self._write_log(lines)
+
     def clear_output(self):
         self.response_text.config(state="normal")
         self.response_text.delete(1.0, tk.END)
@@ -668,15 +821,99 @@ class Spotify2YTMUI(tk.Tk):
         if not selected:
             messagebox.showinfo("No Selection", "Please select at least one playlist.")
             return
-        playlists = [self.playlists[i] for i in selected]
-        threading.Thread(target=self._copy_playlists, args=(playlists,)).start()
+        self._queue_playlists([self.playlists[i] for i in selected])
 
     def copy_all_playlists(self):
         if not self.check_configuration():
             return
         if not self.check_api_quotas():
             return
-        threading.Thread(target=self._copy_playlists, args=(self.playlists,)).start()
+        self._queue_playlists(self.playlists)
+
+    def _transfer_settings(self):
+        # Tk variables are read here on the UI thread, never from a job
+        return {
+            "batch_size": int(self.batch_slider.get()),
+            "auto_batch": bool(self.batch_auto_var.get()),
+            "max_workers": copy_playlists.get_search_workers(self.config_data)
+        }
+
+    def _profiled(self, run):
+        if not self.config_data.get("profile_transfers"):
+            return run
+        if not copy_playlists.profiler.enabled:
+            copy_playlists.profiler.enable()
+            self.append_response("🔬 Profiling transfers; the report is written when the queue finishes")
+
+        def run_profiled(job):
+            with copy_playlists.profiler.profile_thread():
+                return run(job)
+
+        return run_profiled
+
+    def _queue_playlists(self, playlists, priority=PRIORITY_NORMAL):
+        copy_playlists.reset_ytm_playlist_index()
+        settings = self._transfer_settings()
+        # Jobs may run side by side, so the shared map makes sure each track is searched only once
+        resolved = copy_playlists.SharedResolutions()
+        for playlist in playlists:
+            self.scheduler.submit(TransferJob(
+                "playlist",
+                playlist['name'],
+                self._profiled(lambda job, playlist=playlist: self._copy_playlist(job, playlist, settings, resolved)),
+                priority
+            ))
+
+    def pause_jobs(self):
+        self.scheduler.pause()
+        self.append_response("⏸️ Transfers paused")
+        self.set_status("Transfers paused")
+
+    def resume_jobs(self):
+        self.scheduler.resume()
+        self.append_response("▶️ Transfers resumed")
+
+    def cancel_jobs(self):
+        if self.scheduler.is_idle():
+            return
+        if not messagebox.askyesno("Cancel Transfers", "Cancel all running and queued transfers?\nProgress of running transfers is saved."):
+            return
+        self.scheduler.cancel_all()
+        # Nothing is left to hold back, so later transfers start right away
+        self.scheduler.resume()
+
+    def _on_job_update(self, job):
+        if job.status == "running":
+            self.append_response(f"▶️ Started: {job.name}")
+        elif job.status == "failed":
+            self.append_response(f"❌ {job.name} failed: {job.error}")
+        elif job.status == "cancelled":
+            self.append_response(f"⏹️ Cancelled: {job.name}")
+        if job.status in FINISHED_STATUSES:
+            self._forget_job_progress(job)
+            if self.scheduler.is_idle():
+                self.call_in_ui(self._on_jobs_finished)
+
+    def _on_jobs_finished(self):
+        if not self.scheduler.is_idle() or self.expired_jobs:
+            return
+        self.reset_progress_bar()
+        self.progress.set("✅ All transfers completed")
+        self.append_response("🎉 All queued transfers finished!")
+        if self.trace_path:
+            try:
+                copy_playlists.tracer.export_chrome(self.trace_path)
+                self.append_response(f"🧭 Trace written to {self.trace_path}")
+            except OSError as e:
+                self.append_response(f"⚠️ Could not write trace to {self.trace_path}: {e}")
+        if copy_playlists.profiler.enabled:
+            report_path = self.config_data.get("profile_report_path", DEFAULT_PROFILE_REPORT)
+            try:
+                copy_playlists.profiler.finish(report_path)
+                self.append_response(f"🔬 Profile report written to {report_path}")
+            except OSError as e:
+                self.append_response(f"⚠️ Could not write profile report to {report_path}: {e}")
+        messagebox.showinfo("Success", "All transfers finished!")
 
     def pause_progress_bar(self):
         self.progress_bar_state["current_value"] = self.progressbar["value"]
@@ -698,24 +935,28 @@ class Spotify2YTMUI(tk.Tk):
         self.progressbar["value"] = 0
         self.progressbar["maximum"] = 100
 
+    def _headers_expired(self, job, progress_file, operation_type):
+        # Hold the queue so the remaining jobs don't run into the same expired headers
+        self.scheduler.pause()
+        with self.expired_jobs_lock:
+            self.expired_jobs.append(job)
+            first = len(self.expired_jobs) == 1
+        if first:
+            self.call_in_ui(self.show_header_expired_dialog, job.name, progress_file, operation_type)
+
     def show_header_expired_dialog(self, playlist_name, progress_file, operation_type="playlist"):
         self.pause_progress_bar()
         
         result = messagebox.askyesno(
             "Headers Expired", 
             f"🔑 YouTube Music headers have expired!\n\n"
-            f"Progress has been saved for: {playlist_name}\n\n"
+            f"{'Progress has been saved for' if progress_file else 'Stopped'}: {playlist_name}\n\n"
             f"Would you like to update your headers now?\n"
             f"Click 'Yes' to open settings, or 'No' to stop the transfer.",
             icon='warning'
         )
         
         if result:
-            self.pending_resume = {
-                "playlist_name": playlist_name,
-                "operation_type": operation_type
-            }
-            
             def on_save(new_config):
                 self.config_data = new_config
                 self.update_copy_playlists_config()
@@ -725,447 +966,180 @@ class Spotify2YTMUI(tk.Tk):
                                   "The transfer will now resume automatically.")
                 self._resume_transfer()
             
-            SettingsDialog(self, self.config_data, on_save)
+            # Closing settings without saving leaves the headers expired, same as answering No
+            SettingsDialog(self, self.config_data, on_save, on_cancel=lambda: self._stop_expired_transfers(progress_file))
         else:
-            self.reset_progress_bar()
-            self.progress.set("Transfer stopped - headers expired")
+            self._stop_expired_transfers(progress_file)
+
+    def _stop_expired_transfers(self, progress_file):
+        with self.expired_jobs_lock:
+            expired_jobs, self.expired_jobs = self.expired_jobs, []
+        for job in expired_jobs:
+            self.append_response(f"❌ {job.name} failed: YouTube Music headers expired")
+        # Queued jobs would only run into the same expired headers
+        self.scheduler.cancel_all()
+        self.scheduler.resume()
+        self.reset_progress_bar()
+        self.progress.set("Transfer stopped - headers expired")
+        if progress_file:
             self.append_response(f"⏸️ Transfer stopped. Progress saved to: {progress_file}")
+        else:
+            self.append_response("⏸️ Transfer stopped.")
+        # The last job may have finished while its headers were pending, so nothing else would report the end
+        self._on_jobs_finished()
 
     def _resume_transfer(self):
-        if not hasattr(self, 'pending_resume'):
-            return
+        with self.expired_jobs_lock:
+            expired_jobs, self.expired_jobs = self.expired_jobs, []
+        # Interrupted jobs go ahead of the ones still queued; each picks up from its saved progress
+        for job in expired_jobs:
+            self.append_response(f"🔄 Resuming transfer for: {job.name}")
+            self.scheduler.submit(job.requeue(PRIORITY_HIGH))
+        self.scheduler.resume()
+
+    def _transfer_callbacks(self, job):
+        status = {"searched": 0, "total": 0, "added": 0}
+
+        def show_status():
+            self.report_job_progress(
+                job, f"{job.name}: searched {status['searched']}/{status['total']} · added {status['added']} tracks",
+                status["searched"], status["total"]
+            )
 
-        resume_info = self.pending_resume
-        playlist_name = resume_info["playlist_name"]
-        operation_type = resume_info["operation_type"]
-        remaining_playlists = resume_info.get("remaining_playlists", [])
-
-        self.append_response(f"🔄 Resuming transfer for: {playlist_name}")
-
-        if operation_type == "playlist":
-            if hasattr(self, 'playlists'):
-                for playlist in self.playlists:
-                    if playlist['name'] == playlist_name:
-                        threading.Thread(target=self._copy_playlists, args=([playlist],)).start()
-                        break
-                if remaining_playlists:
-                    for pl_name in remaining_playlists:
-                        for playlist in self.playlists:
-                            if playlist['name'] == pl_name:
-                                threading.Thread(target=self._copy_playlists, args=([playlist],)).start()
-        elif operation_type == "liked_songs":
-            threading.Thread(target=self._copy_liked_songs).start()
-
-        delattr(self, 'pending_resume')
-
-    def _copy_playlists(self, playlists):
-        for playlist in playlists:
-            name = playlist['name']
-            playlist_id = playlist['id']
-
-            progress = copy_playlists.load_progress(name)
-            if progress:
-                self.append_response(f"📁 Found saved progress for '{name}'. Resuming...")
-                tracks = copy_playlists.get_spotify_playlist_tracks(playlist_id)
-                start_index = progress.get("current_track_index", 0)
-                ytm_video_ids = progress["ytm_video_ids"]
-                not_found_tracks = progress["not_found_tracks"]
-                current_batch_index = progress.get("current_batch_index", 0)
-                
-                if current_batch_index is None:
-                    current_batch_index = 0
-                    self.append_response(f"⚠️ Batch index was null, starting from beginning of batching phase")
-            else:
-                self.progress.set(f"Processing: {name}")
-                self.append_response(f"🎵 Processing playlist: {name}")
-                tracks = copy_playlists.get_spotify_playlist_tracks(playlist_id)
-                if not tracks:
-                    self.append_response(f"⚠️ No tracks found in playlist: {name}")
-                    continue
-                start_index = 0
-                ytm_video_ids = []
-                not_found_tracks = []
-                current_batch_index = 0
-
-            ytm_playlist_id, already_exists = copy_playlists.create_or_get_ytm_playlist(name)
-            if not ytm_playlist_id:
-                self.append_response(f"❌ Failed to create playlist: {name}")
-                continue
-
-            existing_video_ids = set()
-            if already_exists and not progress:
-                self.append_response(f"📋 Playlist exists, checking for new songs...")
-                existing_video_ids = copy_playlists.get_ytm_playlist_song_video_ids(ytm_playlist_id)
-
-            if not self.progress_bar_state["paused"]:
-                self.progressbar["maximum"] = len(tracks)
-                self.progressbar["value"] = start_index
-
-            batch_size = int(self.batch_slider.get())
+        def search_progress_callback(done, total, track):
+            status["searched"] = done
+            status["total"] = total
+            show_status()
 
-            try:
-                if progress and ytm_video_ids:
-                    self.append_response(f"📤 Resuming: Adding remaining tracks from batch {current_batch_index + 1}...")
-                    self.append_response(f"⚙️ Using batch size: {batch_size} tracks per batch")
-                    
-                    if not self.progress_bar_state["paused"]:
-                        self.progressbar["maximum"] = len(ytm_video_ids)
-                        completed_tracks = current_batch_index * batch_size
-                        self.progressbar["value"] = completed_tracks
-                    
-                    def progress_callback(current):
-                        base = current_batch_index * batch_size
-                        total_progress = base + current
-                        if not self.progress_bar_state["paused"]:
-                            self.progressbar["value"] = min(total_progress, len(ytm_video_ids))
-                            self.progress.set(f"Adding tracks: {total_progress}/{len(ytm_video_ids)}")
-                            self.update_idletasks()
-                    
-                    try:
-                        actually_added, failed_batches = copy_playlists.add_tracks_with_delayed_verification(
-                            ytm_playlist_id,
-                            ytm_video_ids,
-                            batch_size=batch_size,  
-                            batch_delay=5,
-                            verification_delay=30,
-                            progress_callback=progress_callback,
-                            start_batch_index=current_batch_index
-                        )
-                        
-                        if not self.progress_bar_state["paused"]:
-                            self.progressbar["value"] = len(ytm_video_ids)
-                        
-                        if len(actually_added) == len(ytm_video_ids):
-                            self.append_response(f"✅ Perfect success! All {len(actually_added)} tracks added to: {name}")
-                        elif len(actually_added) > 0:
-                            success_rate = (len(actually_added) / len(ytm_video_ids)) * 100
-                            self.append_response(f"⚠️ Partial success: {len(actually_added)}/{len(ytm_video_ids)} tracks added ({success_rate:.1f}%)")
-                            self.append_response(f"   Missing {len(ytm_video_ids) - len(actually_added)} tracks may appear later due to YouTube Music delays")
-                        else:
-                            self.append_response(f"❌ No tracks were successfully added to: {name}")
-                        
-                        if failed_batches:
-                            failed_count = sum(len(batch) for batch in failed_batches)
-                            self.append_response(f"⚠️ {failed_count} tracks failed during batch adding (network/API issues)")
-
-                    except copy_playlists.HeaderExpiredError as e:
-                        expired_batch_index = getattr(e, "batch_index", current_batch_index)
-                        self.append_response(f"🔑 Headers expired during batch {expired_batch_index + 1}")
-                        
-                        progress_file = copy_playlists.save_progress(
-                            name, len(tracks), len(tracks), ytm_video_ids, not_found_tracks, "playlist", 
-                            current_batch_index=expired_batch_index
-                        )
-                        self.show_header_expired_dialog(name, progress_file, "playlist")
-                        return
-                
-                else:
-                    for idx in range(start_index, len(tracks)):
-                        track = tracks[idx]
-                        video_id = copy_playlists.search_track_on_ytm(track)
-                        if video_id and video_id not in existing_video_ids:
-                            ytm_video_ids.append(video_id)
-                        elif not video_id:
-                            not_found_tracks.append(track)
-
-                        if not self.progress_bar_state["paused"]:
-                            self.progressbar["value"] = idx + 1
-                            self.progress.set(f"Searching: {idx + 1}/{len(tracks)} - {track[:50]}...")
-                            self.update_idletasks()
-
-                    if ytm_video_ids and not self.progress_bar_state["paused"]:
-                        self.progressbar["maximum"] = len(ytm_video_ids)
-                        self.progressbar["value"] = 0
-
-                    if ytm_video_ids:
-                        try:
-                            self.append_response(f"📤 Adding {len(ytm_video_ids)} tracks with batch size {batch_size}...")
-                            
-                            def progress_callback(current):
-                                base = current_batch_index * batch_size
-                                total_progress = base + current
-                                if not self.progress_bar_state["paused"]:
-                                    self.progressbar["value"] = min(total_progress, len(ytm_video_ids))
-                                    self.progress.set(f"Adding tracks: {total_progress}/{len(ytm_video_ids)}")
-                                    self.update_idletasks()
-                            
-                            actually_added, failed_batches = copy_playlists.add_tracks_with_delayed_verification(
-                                ytm_playlist_id,
-                                ytm_video_ids,
-                                batch_size=batch_size,  
-                                batch_delay=5,
-                                verification_delay=30,
-                                progress_callback=progress_callback,
-                                start_batch_index=0
-                            )
-                            
-                            if not self.progress_bar_state["paused"]:
-                                self.progressbar["value"] = len(ytm_video_ids)
-                            
-                            if len(actually_added) == len(ytm_video_ids):
-                                self.append_response(f"✅ Perfect success! All {len(actually_added)} tracks added to: {name}")
-                            elif len(actually_added) > 0:
-                                success_rate = (len(actually_added) / len(ytm_video_ids)) * 100
-                                self.append_response(f"⚠️ Partial success: {len(actually_added)}/{len(ytm_video_ids)} tracks added ({success_rate:.1f}%)")
-                                self.append_response(f"   Missing {len(ytm_video_ids) - len(actually_added)} tracks may appear later due to YouTube Music delays")
-                            else:
-                                self.append_response(f"❌ No tracks were successfully added to: {name}")
-                        
-                            if failed_batches:
-                                failed_count = sum(len(batch) for batch in failed_batches)
-                                self.append_response(f"⚠️ {failed_count} tracks failed during batch adding (network/API issues)")
-
-                        except copy_playlists.HeaderExpiredError as e:
-                            expired_batch_index = getattr(e, "batch_index", 0)
-                            self.append_response(f"🔑 Headers expired during batch {expired_batch_index + 1}")
-                            
-                            progress_file = copy_playlists.save_progress(
-                                name, len(tracks), len(tracks), ytm_video_ids, not_found_tracks, "playlist", 
-                                current_batch_index=expired_batch_index
-                            )
-                            self.show_header_expired_dialog(name, progress_file, "playlist")
-                            return
-                    else:
-                        self.append_response(f"ℹ️ No new tracks to add for: {name}")
-                        if not self.progress_bar_state["paused"]:
-                            self.progressbar["maximum"] = 1
-                            self.progressbar["value"] = 1
-                    
-                if not_found_tracks:
-                    self.append_response(f"⚠️ {len(not_found_tracks)} tracks not found on YouTube Music")
-                    for track in not_found_tracks[:10]: 
-                        self.append_response(f"   • {track}")
-                    if len(not_found_tracks) > 10:
-                        self.append_response(f"   ... and {len(not_found_tracks) - 10} more")
-                
-                copy_playlists.delete_progress(name)
-                self.reset_progress_bar()
-                    
-            except copy_playlists.HeaderExpiredError:
-                progress_file = copy_playlists.save_progress(
-                    name, idx, len(tracks), ytm_video_ids, not_found_tracks, "playlist"
-                )
-                self.show_header_expired_dialog(name, progress_file, "playlist")
-                return
-                
-        self.progress.set("✅ Playlist transfer completed")
-        self.append_response("🎉 Finished copying all playlists!")
-        messagebox.showinfo("Success", "Playlists transferred successfully!")
+        def progress_callback(current):
+            status["added"] = current
+            show_status()
+
+        return search_progress_callback, progress_callback
+
+    def _copy_playlist(self, job, playlist, settings, resolved):
+        name = playlist['name']
+        self.report_job_progress(job, f"Checking: {name}")
+        progress = copy_playlists.load_progress(name)
+        plan = copy_playlists.plan_playlist_sync(playlist, force=bool(progress))
+        self.report_job_progress(job, f"Processing: {name}")
+
+        search_progress_callback, progress_callback = self._transfer_callbacks(job)
+        try:
+            return copy_playlists.transfer_tracks_to_ytm(
+                name,
+                plan["tracks"],
+                "playlist",
+                plan=plan,
+                batch_size=settings["batch_size"],
+                auto_batch=settings["auto_batch"],
+                max_workers=settings["max_workers"],
+                resolved=resolved,
+                config_data=self.config_data,
+                log=self.append_response,
+                search_progress_callback=search_progress_callback,
+                progress_callback=progress_callback,
+                checkpoint=job.checkpoint
+            )
+        except copy_playlists.HeaderExpiredError as e:
+            self._headers_expired(job, e.progress_file, "playlist")
 
-    def _copy_liked_songs(self):
+    def _copy_liked_songs(self, job, settings):
         playlist_name = "Liked Songs from Spotify"
         
         progress = copy_playlists.load_progress(playlist_name)
-        if progress:
-            self.append_response(f"📁 Found saved progress for '{playlist_name}'. Resuming...")
-            liked_songs = copy_playlists.get_spotify_liked_songs()
-            start_index = progress["current_track_index"]
-            ytm_video_ids = progress["ytm_video_ids"]
-            not_found_tracks = progress["not_found_tracks"]
-            current_batch_index = progress.get("current_batch_index", 0)
-            
-            if current_batch_index is None:
-                current_batch_index = 0
-                self.append_response(f"⚠️ Batch index was null, starting from beginning of batching phase")
-        else:
-            self.progress.set("Fetching liked songs...")
+        if not progress:
+            self.report_job_progress(job, "Fetching liked songs...")
             self.append_response("💖 Fetching liked songs from Spotify...")
-            liked_songs = copy_playlists.get_spotify_liked_songs()
-            if not liked_songs:
-                self.progress.set("No liked songs found")
-                self.append_response("⚠️ No liked songs found on Spotify")
-                messagebox.showinfo("No Liked Songs", "No liked songs found on Spotify.")
-                return
-            start_index = 0
-            ytm_video_ids = []
-            not_found_tracks = []
-            current_batch_index = 0
-        
-        ytm_playlist_id, already_exists = copy_playlists.create_or_get_ytm_playlist(playlist_name)
-        if not ytm_playlist_id:
-            self.progress.set("Failed to create playlist")
-            self.append_response("❌ Failed to create playlist on YouTube Music")
-            return
-        
-        existing_video_ids = set()
-        if already_exists and not progress:
-            self.append_response("📋 Playlist exists, checking for new songs...")
-            existing_video_ids = copy_playlists.get_ytm_playlist_song_video_ids(ytm_playlist_id)
-
-        if not self.progress_bar_state["paused"]:
-            self.progressbar["maximum"] = len(liked_songs)
-            self.progressbar["value"] = start_index
-
-        batch_size = int(self.batch_slider.get())
-
+        liked_songs = copy_playlists.get_spotify_liked_songs()
+        if not liked_songs and not progress:
+            self.report_job_progress(job, "No liked songs found")
+            self.append_response("⚠️ No liked songs found on Spotify")
+            self.call_in_ui(messagebox.showinfo, "No Liked Songs", "No liked songs found on Spotify.")
+            return None
+
+        search_progress_callback, progress_callback = self._transfer_callbacks(job)
         try:
-            if progress and ytm_video_ids:
-                self.append_response(f"📤 Resuming: Adding remaining liked songs from batch {current_batch_index + 1}...")
-                self.append_response(f"⚙️ Using batch size: {batch_size} tracks per batch")
-                
-                if not self.progress_bar_state["paused"]:
-                    self.progressbar["maximum"] = len(ytm_video_ids)
-                    completed_tracks = current_batch_index * batch_size
-                    self.progressbar["value"] = completed_tracks
-                
-                def progress_callback(current):
-                    base = current_batch_index * batch_size
-                    total_progress = base + current
-                    if not self.progress_bar_state["paused"]:
-                        self.progressbar["value"] = min(total_progress, len(ytm_video_ids))
-                        self.progress.set(f"Adding tracks: {total_progress}/{len(ytm_video_ids)}")
-                        self.update_idletasks()
-                
-                try:
-                    actually_added, failed_batches = copy_playlists.add_tracks_with_delayed_verification(
-                        ytm_playlist_id,
-                        ytm_video_ids,
-                        batch_size=batch_size,  
-                        batch_delay=5,
-                        verification_delay=30,
-                        progress_callback=progress_callback,
-                        start_batch_index=current_batch_index
-                    )
-                    
-                    if not self.progress_bar_state["paused"]:
-                        self.progressbar["value"] = len(ytm_video_ids)
-                    
-                    if len(actually_added) == len(ytm_video_ids):
-                        self.append_response(f"✅ Perfect success! All {len(actually_added)} liked songs added")
-                    elif len(actually_added) > 0:
-                        success_rate = (len(actually_added) / len(ytm_video_ids)) * 100
-                        self.append_response(f"⚠️ Partial success: {len(actually_added)}/{len(ytm_video_ids)} liked songs added ({success_rate:.1f}%)")
-                        self.append_response(f"   Missing {len(ytm_video_ids) - len(actually_added)} tracks may appear later due to YouTube Music delays")
-                    else:
-                        self.append_response(f"❌ No liked songs were successfully added")
-                        
-                except copy_playlists.HeaderExpiredError as e:
-                    expired_batch_index = getattr(e, "batch_index", current_batch_index)
-                    self.append_response(f"🔑 Headers expired during batch {expired_batch_index + 1}")
-                    
-                    progress_file = copy_playlists.save_progress(
-                        playlist_name, len(liked_songs), len(liked_songs), ytm_video_ids, not_found_tracks, "liked_songs", 
-                        current_batch_index=expired_batch_index
-                    )
-                    self.show_header_expired_dialog(playlist_name, progress_file, "liked_songs")
-                    return
-            
-            else:
-                for idx in range(start_index, len(liked_songs)):
-                    track = liked_songs[idx]
-                    video_id = copy_playlists.search_track_on_ytm(track)
-                    if video_id and video_id not in existing_video_ids:
-                        ytm_video_ids.append(video_id)
-                    elif not video_id:
-                        not_found_tracks.append(track)
-                    
-                    if not self.progress_bar_state["paused"]:
-                        self.progressbar["value"] = idx + 1
-                        self.progress.set(f"Searching: {idx + 1}/{len(liked_songs)} - {track[:50]}...")
-                        self.update_idletasks()
-
-                if ytm_video_ids and not self.progress_bar_state["paused"]:
-                    self.progressbar["maximum"] = len(ytm_video_ids)
-                    self.progressbar["value"] = 0
-
-                if ytm_video_ids:
-                    try:
-                        self.append_response(f"📤 Adding {len(ytm_video_ids)} liked songs with batch size {batch_size}...")
-                        
-                        def progress_callback(current):
-                            base = current_batch_index * batch_size
-                            total_progress = base + current
-                            if not self.progress_bar_state["paused"]:
-                                self.progressbar["value"] = min(total_progress, len(ytm_video_ids))
-                                self.progress.set(f"Adding tracks: {total_progress}/{len(ytm_video_ids)}")
-                                self.update_idletasks()
-                        
-                        actually_added, failed_batches = copy_playlists.add_tracks_with_delayed_verification(
-                            ytm_playlist_id,
-                            ytm_video_ids,
-                            batch_size=batch_size,  
-                            batch_delay=5,
-                            verification_delay=30,
-                            progress_callback=progress_callback,
-                            start_batch_index=0
-                        )
-                        
-                        if not self.progress_bar_state["paused"]:
-                            self.progressbar["value"] = len(ytm_video_ids)
-                        
-                        if len(actually_added) == len(ytm_video_ids):
-                            self.append_response(f"✅ Perfect success! All {len(actually_added)} liked songs added")
-                        elif len(actually_added) > 0:
-                            success_rate = (len(actually_added) / len(ytm_video_ids)) * 100
-                            self.append_response(f"⚠️ Partial success: {len(actually_added)}/{len(ytm_video_ids)} liked songs added ({success_rate:.1f}%)")
-                            self.append_response(f"   Missing {len(ytm_video_ids) - len(actually_added)} tracks may appear later due to YouTube Music delays")
-                        else:
-                            self.append_response(f"❌ No liked songs were successfully added")
-                        
-                    except copy_playlists.HeaderExpiredError as e:
-                        expired_batch_index = getattr(e, "batch_index", 0)
-                        self.append_response(f"🔑 Headers expired during batch {expired_batch_index + 1}")
-                        
-                        progress_file = copy_playlists.save_progress(
-                            playlist_name, len(liked_songs), len(liked_songs), ytm_video_ids, not_found_tracks, "liked_songs", 
-                            current_batch_index=expired_batch_index
-                        )
-                        self.show_header_expired_dialog(playlist_name, progress_file, "liked_songs")
-                        return
-                else:
-                    self.append_response("ℹ️ No new liked songs to add")
-                    if not self.progress_bar_state["paused"]:
-                        self.progressbar["maximum"] = 1
-                        self.progressbar["value"] = 1
-            
-            if not_found_tracks:
-                self.append_response(f"⚠️ {len(not_found_tracks)} songs not found on YouTube Music")
-                for track in not_found_tracks[:10]:  
-                    self.append_response(f"   • {track}")
-                if len(not_found_tracks) > 10:
-                    self.append_response(f"   ... and {len(not_found_tracks) - 10} more")
-                        
-            copy_playlists.delete_progress(playlist_name)
-            self.reset_progress_bar()
-                
-        except copy_playlists.HeaderExpiredError:
-            progress_file = copy_playlists.save_progress(
-                playlist_name, idx, len(liked_songs), ytm_video_ids, not_found_tracks, "liked_songs"
+            result = copy_playlists.transfer_tracks_to_ytm(
+                playlist_name,
+                liked_songs,
+                "liked_songs",
+                batch_size=settings["batch_size"],
+                auto_batch=settings["auto_batch"],
+                max_workers=settings["max_workers"],
+                config_data=self.config_data,
+                log=self.append_response,
+                search_progress_callback=search_progress_callback,
+                progress_callback=progress_callback,
+                checkpoint=job.checkpoint
             )
-            self.show_header_expired_dialog(playlist_name, progress_file, "liked_songs")
-            return
-            
-        self.progress.set("✅ Liked songs transfer completed")
+        except copy_playlists.HeaderExpiredError as e:
+            self._headers_expired(job, e.progress_file, "liked_songs")
+            return None
+
+        if result["status"] == "failed" and not result["attempted"]:
+            self.report_job_progress(job, "Failed to create playlist")
+            return result
         self.append_response("🎉 Finished copying liked songs!")
-        messagebox.showinfo("Success", "Liked songs transferred successfully!")
+        return result
 
     def copy_liked_songs(self):
         if not self.check_configuration():
             return
         if not self.check_api_quotas():
             return
-        threading.Thread(target=self._copy_liked_songs).start()
+        settings = self._transfer_settings()
+        self.scheduler.submit(TransferJob(
+            "liked_songs", "Liked Songs from Spotify", self._profiled(lambda job: self._copy_liked_songs(job, settings))
+        ))
 
     def copy_followed_artists(self):
         if not self.check_configuration():
             return
-        threading.Thread(target=self._copy_followed_artists).start()
+        max_workers = copy_playlists.get_search_workers(self.config_data)
+        self.scheduler.submit(TransferJob(
+            "artists", "Followed artists", self._profiled(lambda job: self._copy_followed_artists(job, max_workers)), PRIORITY_LOW
+        ))
 
-    def _copy_followed_artists(self):
-        self.progress.set("Fetching followed artists...")
+    def _copy_followed_artists(self, job, max_workers):
+        self.report_job_progress(job, "Fetching followed artists...")
         self.append_response("👤 Fetching followed artists from Spotify...")
         artists = copy_playlists.get_spotify_followed_artists()
         if not artists:
-            self.progress.set("No followed artists found")
+            self.report_job_progress(job, "No followed artists found")
             self.append_response("⚠️ No followed artists found on Spotify")
-            messagebox.showinfo("No Artists", "No followed artists found on Spotify.")
-            return
+            self.call_in_ui(messagebox.showinfo, "No Artists", "No followed artists found on Spotify.")
+            return None
         
         self.append_response(f"🔄 Subscribing to {len(artists)} artists...")
-        copy_playlists.subscribe_to_ytm_artists(artists)
-        self.progress.set("✅ Artist subscription completed")
-        self.append_response("🎉 Finished subscribing to artists!")
-        messagebox.showinfo("Success", "Artists followed successfully!")
+
+        def progress_callback(done, total, artist_name):
+            self.report_job_progress(job, f"Resolving artists: {done}/{total} - {artist_name[:50]}", done, total)
+
+        try:
+            outcome = copy_playlists.subscribe_to_ytm_artists(
+                artists,
+                max_workers=max_workers,
+                progress_callback=progress_callback,
+                checkpoint=job.checkpoint
+            )
+        except copy_playlists.HeaderExpiredError:
+            self.append_response("🔑 Headers expired while subscribing to artists")
+            # Subscribing again is harmless, so after new headers the whole job simply runs again
+            self._headers_expired(job, None, "artists")
+            return None
+        failed = outcome["failed"]
+        if failed:
+            self.append_response(f"⚠️ {len(failed)} artists could not be subscribed")
+            for artist_name in failed[:10]:
+                self.append_response(f"   • {artist_name}")
+            if len(failed) > 10:
+                self.append_response(f"   ... and {len(failed) - 10} more")
+        self.append_response(
+            f"🎉 Finished subscribing to artists: {outcome['subscribed']} subscribed, "
+            f"{outcome['skipped']} already followed"
+        )
+        return outcome
 
     def open_settings(self):
         def on_save(new_config):
@@ -1176,15 +1150,9 @@ class Spotify2YTMUI(tk.Tk):
 
     def update_copy_playlists_config(self):
         try:
-            if self.config_data.get("youtube_headers"):
-                with open("raw_headers.txt", "w", encoding="utf-8") as f:
-                    f.write(self.config_data["youtube_headers"])
-            
-            from ytmusicapi import setup
-            if self.config_data.get("youtube_headers"):
-                setup(filepath="browser.json", headers_raw=self.config_data["youtube_headers"])
-            
-            copy_playlists.initialize_clients(self.config_data)
+            # Clients are rebuilt from the new settings on their next use
+            copy_playlists.configure_clients(self.config_data)
+            self.scheduler.set_max_workers(copy_playlists.get_worker_setting("transfer_jobs", 1, self.config_data))
             
             self.append_response("✅ Configuration updated successfully!")
             
@@ -1233,15 +1201,27 @@ class Spotify2YTMUI(tk.Tk):
             messagebox.showerror("Quota Check Failed", f"Failed to check API quotas:\n{e}")
             return False
 
-    def update_verification_progress(self, current_batch, total_batches, added_count, total_tracks):
-        self.progress.set(f"Verifying batch {current_batch}/{total_batches} - {added_count}/{total_tracks} tracks added")
-        self.update_idletasks()
+    def test_api_quota(self):
+        if not self.check_configuration():
+            return
+        if not messagebox.askyesno(
+            "Test API Quota",
+            "This creates a temporary playlist, adds one song and deletes it again.\n"
+            "It uses a few write requests of your YouTube Music quota.\n\n"
+            "Run the write test now?"
+        ):
+            return
+        threading.Thread(target=self._test_api_quota).start()
+
+    def _test_api_quota(self):
+        self.append_response("🧪 Running YouTube Music write probe...")
+        try:
+            ok, feedback = copy_playlists.perform_quota_check(probe=True)
+            self.append_response(feedback)
+            self.append_response("✅ Write probe succeeded" if ok else "❌ Write probe failed")
+        except Exception as e:
+            self.append_response(f"❌ Quota check error: {e}")
 
-    def update_batch_progress(self, current, total):
-        self.progressbar["value"] = current
-        self.progress.set(f"Adding tracks: {current}/{total}")
-        self.update_idletasks()
-        
 if __name__ == "__main__":
     config = load_config()
     app = Spotify2YTMUI()
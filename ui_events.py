@@ -0,0 +1,82 @@
+import logging
+import logging.handlers
+import queue
+
+UI_TICK_MS = 100
+MAX_EVENTS_PER_TICK = 5000
+# Only the latest value of these matters; older ones are dropped when a newer one is queued
+STATE_KINDS = ("status", "progress")
+DEFAULT_LOG_MAX_LINES = 2000
+DEFAULT_LOG_PATH = "transfer.log"
+DEFAULT_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 3
+
+def coalesce_events(events):
+    coalesced = []
+    latest = {}
+    for kind, payload in events:
+        if kind in STATE_KINDS:
+            if kind in latest:
+                coalesced[latest[kind]] = None
+            latest[kind] = len(coalesced)
+        elif kind == "call":
+            # A UI callback may reset the widgets, so state queued before it must not jump past it
+            latest = {}
+        coalesced.append((kind, payload))
+    return [event for event in coalesced if event is not None]
+
+class UIEventQueue:
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def post(self, kind, *payload):
+        self._queue.put((kind, payload))
+
+    def drain(self, limit=MAX_EVENTS_PER_TICK):
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return coalesce_events(events)
+
+class OutputLog:
+    def __init__(self, max_lines=DEFAULT_LOG_MAX_LINES, path=DEFAULT_LOG_PATH,
+                 max_bytes=DEFAULT_LOG_MAX_BYTES, backup_count=DEFAULT_LOG_BACKUPS):
+        self.max_lines = max(1, int(max_lines))
+        self.path = path
+        self._logger = logging.getLogger(f"spotify2ytm.output.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._handler = None
+        if path:
+            try:
+                self._handler = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+                )
+                self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self._logger.addHandler(self._handler)
+            except Exception as e:
+                print(f"Log file disabled: {e}")
+
+    def write(self, lines):
+        for line in lines:
+            self._logger.info(line)
+        # Lines that would be trimmed from the view right away are never rendered
+        return lines[-self.max_lines:]
+
+    def close(self):
+        if self._handler:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+def open_output_log(config_data=None):
+    config_data = config_data or {}
+    return OutputLog(
+        max_lines=config_data.get("log_max_lines", DEFAULT_LOG_MAX_LINES),
+        path=config_data.get("log_path", DEFAULT_LOG_PATH),
+        max_bytes=int(config_data.get("log_max_bytes", DEFAULT_LOG_MAX_BYTES)),
+        backup_count=int(config_data.get("log_backups", DEFAULT_LOG_BACKUPS))
+    )